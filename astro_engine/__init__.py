@@ -1,16 +1,94 @@
-from astro_engine.astro import HouseSystem, get_chart
-from astro_engine.chart_render import render_astrological_chart
-from astro_engine.geo import get_place_coordinates
-from astro_engine.tables import aspects_table, houses_table, planets_table
-from astro_engine.timezone import get_IANA_tz
+import importlib
+
+from astro_engine.aio import (
+    AsyncAstro,
+    configure_async,
+    get_chart_async,
+    get_chart_for_place_async,
+    get_IANA_tz_async,
+    get_place_coordinates_async,
+)
+from astro_engine.aspects import AspectPolicy, AspectType, chart_aspects
+from astro_engine.astro import ChartBackend, HouseSystem, get_chart, get_charts
+from astro_engine.batch import ChartBatch
+from astro_engine.cache import configure_chart_cache
+from astro_engine.engine import compute_chart_series
+from astro_engine.geo import (
+    configure_geocoder,
+    get_place_coordinates,
+    get_places_coordinates,
+)
+from astro_engine.instrument import configure_instrumentation, get_instrumentation
+from astro_engine.pool import WorkerPool, configure_pool
+from astro_engine.render_batch import render_batch
+from astro_engine.svg_render import render_chart_svg, write_chart_svg
+from astro_engine.timezone import get_IANA_tz, get_IANA_tzs
+from astro_engine.transits import find_stations, find_transits
 
 __all__ = [
+    "AspectPolicy",
+    "AspectType",
+    "AsyncAstro",
+    "ChartAnimator",
+    "ChartBackend",
+    "ChartBatch",
+    "ChartBatcher",
+    "ChartServer",
     "HouseSystem",
+    "WheelCache",
+    "WorkerPool",
+    "chart_aspects",
+    "compute_chart_series",
+    "configure_async",
+    "configure_chart_cache",
+    "configure_geocoder",
+    "configure_instrumentation",
+    "configure_pool",
+    "find_stations",
+    "find_transits",
     "get_chart",
+    "get_charts",
+    "get_chart_async",
+    "get_chart_for_place_async",
+    "get_instrumentation",
     "render_astrological_chart",
+    "render_batch",
+    "render_to_bytes",
+    "render_chart_svg",
+    "write_chart_svg",
     "get_place_coordinates",
+    "get_places_coordinates",
+    "get_place_coordinates_async",
     "get_IANA_tz",
+    "get_IANA_tzs",
+    "get_IANA_tz_async",
     "aspects_table",
+    "aspects_tables",
     "houses_table",
+    "houses_tables",
     "planets_table",
+    "planets_tables",
 ]
+
+# Imported on first use, so the package does not pull in matplotlib and pandas
+_LAZY = {
+    "ChartAnimator": "astro_engine.animation",
+    "WheelCache": "astro_engine.chart_render",
+    "render_astrological_chart": "astro_engine.chart_render",
+    "render_to_bytes": "astro_engine.chart_render",
+    "ChartBatcher": "astro_engine.service",
+    "ChartServer": "astro_engine.service",
+    "aspects_table": "astro_engine.tables",
+    "aspects_tables": "astro_engine.tables",
+    "houses_table": "astro_engine.tables",
+    "houses_tables": "astro_engine.tables",
+    "planets_table": "astro_engine.tables",
+    "planets_tables": "astro_engine.tables",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
@@ -0,0 +1,404 @@
+"""
+asyncio API: place -> coordinates -> timezone -> chart without blocking the
+event loop.
+
+    async with AsyncAstro() as astro:
+        chart = await astro.chart_for_place(
+            "2025-12-28", "18:30", "Gdynia, Poland", HouseSystem.REGIOMONTANUS
+        )
+
+or the module functions (get_chart_async, ...), which use one AsyncAstro
+per event loop, set up by configure_async().
+
+  - swecli charts run as asyncio subprocesses, returning their JSON through
+    a pipe like get_chart. The in-process engine, the worker pool, geocoder
+    calls and timezone lookups run in a thread pool.
+  - Semaphores bound how many binaries, threads and geocoder requests run
+    at once. Requests over the limits wait without holding a thread.
+  - Identical requests in flight at the same time share one computation;
+    each chart caller gets its own copy of the result.
+  - Cancelling a caller cancels the shared work only when no other caller is
+    waiting for it. A cancelled binary is killed. Work already running in a
+    thread finishes, and its result is dropped.
+
+The chart and geocode caches are the ones get_chart and
+get_place_coordinates use, so both APIs can be mixed.
+"""
+
+import asyncio
+import functools
+import os
+import tempfile
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from astro_engine import astro
+from astro_engine.astro import (
+    JSON_PIPE,
+    backend_version,
+    check_exit,
+    check_json,
+    log_command,
+    swecli_command,
+)
+from astro_engine.cache import get_chart_cache
+from astro_engine.geo import get_resolver, normalize_place
+from astro_engine.ingest import parse_chart
+from astro_engine.instrument import span
+from astro_engine.models import AstrologicalData, ChartBackend, GeoLocation, HouseSystem
+from astro_engine.timezone import get_IANA_tz
+
+DEFAULT_MAX_PROCESSES = os.cpu_count() or 2
+DEFAULT_MAX_THREADS = 4
+# Nominatim serves one request per second anyway
+DEFAULT_MAX_GEOCODES = 1
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class InFlight:
+    """
+    Merges identical concurrent calls: run(key, start) awaits the call
+    already running under key, or starts one with start(). The call is
+    cancelled when its last waiter is.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, start: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(start()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1:
+                # a caller arriving before the task finishes must start anew
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+async def _spawn(
+    cmd: List[str], pass_fds: Tuple[int, ...] = ()
+) -> asyncio.subprocess.Process:
+    log_command(cmd)
+    return await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        pass_fds=pass_fds,
+    )
+
+
+async def _wait(
+    process: asyncio.subprocess.Process, cmd: List[str], *reads: Awaitable[bytes]
+) -> List[bytes]:
+    """Wait for the binary (killing it if cancelled), check its exit status."""
+    try:
+        stdout, stderr, *results = await asyncio.gather(
+            process.stdout.read(), process.stderr.read(), *reads  # type: ignore
+        )
+        await process.wait()
+    except asyncio.CancelledError:
+        process.kill()
+        raise
+    check_exit(cmd, process.returncode or 0, stdout.decode(), stderr.decode())
+    return results
+
+
+async def run_swecli(cmd: List[str]) -> bytes:
+    """Async astro._run_swecli: the JSON the binary wrote to --json PATH."""
+    if not JSON_PIPE:
+        fd, out_path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            with span("swecli.spawn"):
+                full = cmd + ["--json", out_path]
+                await _wait(await _spawn(full), full)
+            with span("swecli.read_json"), open(out_path, "rb") as f:
+                return check_json(f.read())
+        finally:
+            try:
+                os.remove(out_path)
+            except OSError:
+                pass
+
+    loop = asyncio.get_running_loop()
+    read_fd, write_fd = os.pipe()
+    reader = asyncio.StreamReader()
+    pipe = os.fdopen(read_fd, "rb", buffering=0)
+    transport = None
+    try:
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), pipe
+        )
+        with span("swecli.spawn"):
+            full = cmd + ["--json", f"/dev/fd/{write_fd}"]
+            try:
+                process = await _spawn(full, pass_fds=(write_fd,))
+            finally:
+                # only the binary may hold the write end, or the read never ends
+                os.close(write_fd)
+                write_fd = -1
+            # read while the binary writes, a chart can outgrow the pipe buffer
+            (raw,) = await _wait(process, full, reader.read())
+    finally:
+        if write_fd >= 0:
+            os.close(write_fd)
+        if transport is not None:
+            transport.close()
+        else:
+            pipe.close()
+    return check_json(raw)
+
+
+class AsyncAstro:
+    """
+    Async front end to charts, geocoding and timezones; see the module
+    docstring. Use one instance per event loop, and close() it (or use
+    `async with`) to stop its threads.
+    """
+
+    def __init__(
+        self,
+        max_processes: int = DEFAULT_MAX_PROCESSES,
+        max_threads: int = DEFAULT_MAX_THREADS,
+        max_geocodes: int = DEFAULT_MAX_GEOCODES,
+        executor: Optional[Executor] = None,
+    ):
+        self._processes = asyncio.Semaphore(max_processes)
+        self._threads = asyncio.Semaphore(max_threads)
+        self._geocodes = asyncio.Semaphore(max_geocodes)
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_threads, thread_name_prefix="astro-engine"
+        )
+        self._charts = InFlight()
+        self._places = InFlight()
+        self._zones = InFlight()
+
+    async def __aenter__(self) -> "AsyncAstro":
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _in_thread(self, func: Callable[..., T], *args: Any) -> T:
+        async with self._threads:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def chart(
+        self,
+        date: str,
+        time: str,
+        latitude: float,
+        longitude: float,
+        house_system: HouseSystem,
+        timezone_IANA_id: str,
+        backend: ChartBackend = ChartBackend.SWECLI,
+        use_cache: bool = False,
+    ) -> AstrologicalData:
+        """Async get_chart."""
+        args = (
+            date,
+            time,
+            float(latitude),
+            float(longitude),
+            HouseSystem(house_system),
+            timezone_IANA_id,
+        )
+        chart = await self._charts.run(
+            (*args, backend, use_cache),
+            lambda: self._chart(*args, backend=backend, use_cache=use_cache),
+        )
+        # merged callers get the same object; each gets a chart of its own
+        return chart.model_copy(deep=True)
+
+    async def _chart(
+        self,
+        *args: Any,
+        backend: ChartBackend,
+        use_cache: bool,
+    ) -> AstrologicalData:
+        with span("get_chart", backend=backend.value):
+            if not use_cache:
+                return await self._compute(args, backend)
+            cache = get_chart_cache()
+            # the disk tier reads SQLite; keep it off the event loop
+            key, cached = await self._in_thread(
+                functools.partial(
+                    cache.lookup,
+                    *args,
+                    backend=backend.value,
+                    version=backend_version(backend),
+                )
+            )
+            if cached is not None:
+                return cached
+            chart = await self._compute(args, backend)
+            await self._in_thread(cache.put, key, backend.value, chart)
+            return chart
+
+    async def _compute(self, args: tuple, backend: ChartBackend) -> AstrologicalData:
+        if backend != ChartBackend.SWECLI:
+            return await self._in_thread(astro._get_chart, *args, backend)
+        async with self._processes:
+            raw = await run_swecli(swecli_command(*args))
+        return parse_chart(raw)
+
+    async def place_coordinates(self, location: str) -> GeoLocation:
+        """Async get_place_coordinates."""
+        if not location.strip():
+            raise ValueError("Location cannot be empty string")
+        resolver = get_resolver()
+        key = normalize_place(location)
+        if key not in resolver.cache:
+            await self._places.run(key, lambda: self._geocode(location))
+        # cached now, so this does not block
+        return resolver.coordinates([location])[0]
+
+    async def _geocode(self, location: str):
+        async with self._geocodes:
+            await self._in_thread(get_resolver().resolve, [location])
+
+    async def timezone(self, latitude: float, longitude: float) -> str:
+        """Async get_IANA_tz."""
+        point = (float(latitude), float(longitude))
+        return await self._zones.run(
+            point, lambda: self._in_thread(get_IANA_tz, *point)
+        )
+
+    async def chart_for_place(
+        self,
+        date: str,
+        time: str,
+        location: str,
+        house_system: HouseSystem,
+        backend: ChartBackend = ChartBackend.SWECLI,
+        use_cache: bool = False,
+    ) -> AstrologicalData:
+        """The chart of a birth at a named place, geocoded and with its zone."""
+        place = await self.place_coordinates(location)
+        tzid = await self.timezone(place.latitude, place.longitude)
+        return await self.chart(
+            date,
+            time,
+            place.latitude,
+            place.longitude,
+            house_system,
+            tzid,
+            backend=backend,
+            use_cache=use_cache,
+        )
+
+
+_options: Dict[str, Any] = {}
+_instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAstro]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def configure_async(
+    max_processes: int = DEFAULT_MAX_PROCESSES,
+    max_threads: int = DEFAULT_MAX_THREADS,
+    max_geocodes: int = DEFAULT_MAX_GEOCODES,
+):
+    """Limits of the AsyncAstro behind the module functions, from now on."""
+    global _options
+    _options = {
+        "max_processes": max_processes,
+        "max_threads": max_threads,
+        "max_geocodes": max_geocodes,
+    }
+    for instance in list(_instances.values()):
+        instance.close()
+    _instances.clear()
+
+
+def get_async_astro() -> AsyncAstro:
+    """The AsyncAstro of the running event loop."""
+    loop = asyncio.get_running_loop()
+    instance = _instances.get(loop)
+    if instance is None:
+        instance = _instances[loop] = AsyncAstro(**_options)
+    return instance
+
+
+async def get_chart_async(
+    date: str,
+    time: str,
+    latitude: float,
+    longitude: float,
+    house_system: HouseSystem,
+    timezone_IANA_id: str,
+    backend: ChartBackend = ChartBackend.SWECLI,
+    use_cache: bool = False,
+) -> AstrologicalData:
+    return await get_async_astro().chart(
+        date,
+        time,
+        latitude,
+        longitude,
+        house_system,
+        timezone_IANA_id,
+        backend=backend,
+        use_cache=use_cache,
+    )
+
+
+async def get_place_coordinates_async(location: str) -> GeoLocation:
+    return await get_async_astro().place_coordinates(location)
+
+
+async def get_IANA_tz_async(latitude: float, longitude: float) -> str:
+    return await get_async_astro().timezone(latitude, longitude)
+
+
+async def get_chart_for_place_async(
+    date: str,
+    time: str,
+    location: str,
+    house_system: HouseSystem,
+    backend: ChartBackend = ChartBackend.SWECLI,
+    use_cache: bool = False,
+) -> AstrologicalData:
+    return await get_async_astro().chart_for_place(
+        date, time, location, house_system, backend=backend, use_cache=use_cache
+    )
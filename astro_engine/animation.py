@@ -0,0 +1,212 @@
+"""
+Chart animations and time scrubbing on one figure.
+
+    frames = compute_chart_series(
+        "2026-01-01", "00:00", 52.2297, 21.0122, HouseSystem.PLACIDUS,
+        "Europe/Warsaw", step=timedelta(hours=6), count=240,
+    )
+    ChartAnimator().save(frames, "transits.mp4", fps=24)
+
+The figure is built once. Each frame rotates the sign ring, moves the ASC
+and MC, cusps, planets and aspect chords of the previous frame in place
+(ChartLayers) and draws them over a cached raster of the static wheel, so
+no artist is created per frame. frame() returns the pixels of one chart,
+for a time slider; save() streams frames to a GIF (Pillow), a video
+(ffmpeg: .mp4, .webm, .mov, .mkv, ...) or numbered PNG files.
+"""
+
+import itertools
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple, Union
+
+import matplotlib
+import matplotlib.image as mpl_image
+import numpy as np
+from matplotlib.figure import Figure
+from PIL import Image
+
+from astro_engine.chart_render import _WheelTemplate
+from astro_engine.instrument import span
+from astro_engine.models import AstrologicalData
+
+TITLE = "Astrological Chart"
+DEFAULT_FPS = 12
+
+
+def local_time_caption(data: AstrologicalData) -> str:
+    """The chart's local time to the minute, and its zone."""
+    return f"{data.meta.local[:16]} {data.meta.tz.tzid or ''}".rstrip()
+
+
+class ChartAnimator:
+    """
+    Renders a sequence of charts on one figure; see the module docstring.
+    caption(chart) is written in a corner of every frame (None for no
+    caption). Frames have the pixels render_astrological_chart would draw,
+    plus the caption. Not thread-safe: use one animator per thread.
+    """
+
+    def __init__(
+        self,
+        title: str = TITLE,
+        figsize: Tuple[float, float] = (8, 8),
+        dpi: float = 100,
+        caption: Optional[Callable[[AstrologicalData], str]] = local_time_caption,
+    ):
+        self.dpi = dpi
+        self.caption = caption
+        self._wheel = _WheelTemplate(figsize, dpi, title)
+        # in the bottom left corner, which the round wheel leaves free
+        self._caption = self._wheel.ax.text(
+            0.02,
+            0.02,
+            "",
+            transform=self._wheel.fig.transFigure,
+            ha="left",
+            va="bottom",
+            fontsize=11,
+        )
+
+    @property
+    def figure(self) -> Figure:
+        """The figure, showing the last frame's chart after a full draw."""
+        return self._wheel.fig
+
+    def frame(self, data: AstrologicalData) -> np.ndarray:
+        """RGBA pixels (height, width, 4) of one chart."""
+        if self.caption is None:
+            return self._wheel.render(data)
+        self._caption.set_text(self.caption(data))
+        return self._wheel.render(data, overlay=[self._caption])
+
+    def frames(self, charts: Iterable[AstrologicalData]) -> Iterator[np.ndarray]:
+        """RGBA pixels of each chart, one at a time (a ChartBatch works too)."""
+        for data in charts:
+            yield self.frame(data)
+
+    def save(
+        self,
+        charts: Iterable[AstrologicalData],
+        path: Union[str, Path],
+        fps: float = DEFAULT_FPS,
+    ) -> int:
+        """
+        Stream the frames of the charts to path; the suffix picks the
+        format. A .png path is a pattern for one file per frame, with a
+        str.format field for the frame number ("frames/{:05d}.png"). Returns
+        the number of frames written.
+        """
+        path = str(path)
+        suffix = Path(path).suffix.lower()
+        frames = self.frames(charts)
+        if suffix == ".gif":
+            return _save_gif(frames, path, fps)
+        if suffix == ".png":
+            return _save_pngs(frames, path, self.dpi)
+        return _save_video(frames, path, fps)
+
+
+def _save_pngs(frames: Iterator[np.ndarray], pattern: str, dpi: float) -> int:
+    if pattern.format(0) == pattern.format(1):
+        raise ValueError(
+            f'PNG frames need a frame number field in the path, e.g. "{{:05d}}.png", '
+            f"got {pattern!r}"
+        )
+    count = 0
+    for i, rgba in enumerate(frames):
+        name = Path(pattern.format(i))
+        name.parent.mkdir(parents=True, exist_ok=True)
+        with span("render.encode", format="png"):
+            mpl_image.imsave(name, rgba, format="png", dpi=dpi)
+        count += 1
+    return count
+
+
+def _save_gif(frames: Iterator[np.ndarray], path: str, fps: float) -> int:
+    count = 0
+
+    def images() -> Iterator[Image.Image]:
+        nonlocal count
+        for rgba in frames:
+            count += 1
+            # the figure is opaque; GIF has no alpha channel to keep it in
+            yield Image.fromarray(np.ascontiguousarray(rgba[..., :3]))
+
+    stream = images()
+    first = next(stream, None)
+    if first is None:
+        raise ValueError("No charts to animate")
+    # Pillow keeps the frames it has palettized until the file is complete
+    with span("render.encode", format="gif"):
+        first.save(
+            path,
+            save_all=True,
+            append_images=stream,
+            duration=round(1000 / fps),
+            loop=0,
+        )
+    return count
+
+
+def _ffmpeg() -> str:
+    command = matplotlib.rcParams["animation.ffmpeg_path"]
+    found = shutil.which(command)
+    if found is None:
+        raise RuntimeError(
+            f"ffmpeg ({command}) not found, set matplotlib's "
+            'rcParams["animation.ffmpeg_path"] or save a .gif or .png frames'
+        )
+    return found
+
+
+def _save_video(frames: Iterator[np.ndarray], path: str, fps: float) -> int:
+    first = next(frames, None)
+    if first is None:
+        raise ValueError("No charts to animate")
+    height, width = first.shape[:2]
+    cmd = [
+        _ffmpeg(),
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgba",
+        "-s",
+        f"{width}x{height}",
+        "-r",
+        str(fps),
+        "-i",
+        "pipe:",
+        # most codecs want even dimensions with yuv420p, the widely playable one
+        "-vf",
+        "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        "-pix_fmt",
+        "yuv420p",
+        path,
+    ]
+    process = subprocess.Popen(
+        cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    count = 0
+    try:
+        with span("render.encode", format=Path(path).suffix.lstrip(".")):
+            for rgba in itertools.chain([first], frames):
+                process.stdin.write(rgba.tobytes())  # type: ignore
+                count += 1
+    except BrokenPipeError:
+        pass  # ffmpeg stopped early; its error is reported below
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg failed to write {path} (exit {process.returncode}): "
+            f"{stderr.decode(errors='replace').strip()}"
+        )
+    return count
@@ -0,0 +1,193 @@
+"""
+Aspect engine.
+
+Computes aspects from body longitudes and speeds alone, so a new orb policy
+can be applied to charts that are already computed (see
+ChartBatch.with_aspects and chart_aspects) without another ephemeris run.
+
+The separations of every pair of bodies are one NumPy array per batch; the
+policy becomes an orb table (body, body, aspect) that is compared with the
+distance of each separation to each aspect angle.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from astro_engine.models import Aspect, AspectDefinition, AstrologicalData
+
+
+@dataclass(frozen=True)
+class AspectType:
+    name: str
+    symbol: str
+    angle: int
+    orb: float  # default orb, for bodies without their own
+
+
+# The binary's aspects and orbs
+MAJOR_ASPECTS: List[AspectType] = [
+    AspectType("Conjunction", "☌", 0, 9.0),
+    AspectType("Sextile", "✶", 60, 6.0),
+    AspectType("Square", "☐", 90, 8.0),
+    AspectType("Trine", "△", 120, 8.0),
+    AspectType("Opposition", "☍", 180, 9.0),
+]
+
+MINOR_ASPECTS: List[AspectType] = [
+    AspectType("Semi-sextile", "⚺", 30, 2.0),
+    AspectType("Semi-square", "∠", 45, 2.0),
+    AspectType("Quintile", "Q", 72, 2.0),
+    AspectType("Biquintile", "bQ", 144, 2.0),
+    AspectType("Sesquiquadrate", "⚼", 135, 2.0),
+    AspectType("Quincunx", "⚻", 150, 3.0),
+]
+
+ASPECT_TYPES: Dict[str, AspectType] = {
+    aspect.name: aspect for aspect in MAJOR_ASPECTS + MINOR_ASPECTS
+}
+
+# The binary looks for aspects between the planets only, not the lunar nodes
+PLANET_NAMES = [
+    "Sun",
+    "Moon",
+    "Mercury",
+    "Venus",
+    "Mars",
+    "Jupiter",
+    "Saturn",
+    "Uranus",
+    "Neptune",
+    "Pluto",
+]
+
+PHASES = ["APPLY", "SEPAR", "EXACT"]
+
+BodyOrb = Union[float, Dict[str, float]]
+
+_COMBINE = {"max": np.maximum, "min": np.minimum, "mean": lambda a, b: (a + b) / 2}
+
+
+@dataclass
+class AspectPolicy:
+    """
+    Which aspects to look for, between which bodies, and with which orbs.
+
+    body_orbs gives a body its own orb, either for every aspect (a number) or
+    per aspect name (a dict); aspects missing from it keep the aspect's orb.
+    The orb of a pair is the `combine` ("max", "min" or "mean") of the orbs
+    of its two bodies. bodies=None means every body of the chart.
+
+    When several aspects are within orb, the tightest one is kept.
+    """
+
+    aspects: Sequence[AspectType] = field(default_factory=lambda: list(MAJOR_ASPECTS))
+    bodies: Optional[Sequence[str]] = field(default_factory=lambda: list(PLANET_NAMES))
+    body_orbs: Dict[str, BodyOrb] = field(default_factory=dict)
+    combine: Literal["max", "min", "mean"] = "max"
+
+    def __post_init__(self):
+        if self.combine not in _COMBINE:
+            raise ValueError(f'Unknown orb combination "{self.combine}"')
+        self.aspects = [
+            ASPECT_TYPES[a] if isinstance(a, str) else a for a in self.aspects
+        ]
+
+    def definitions(self) -> List[AspectDefinition]:
+        return [
+            AspectDefinition(name=a.name, symbol=a.symbol, angle=a.angle)
+            for a in self.aspects
+        ]
+
+    def columns(self, body_names: Sequence[str]) -> np.ndarray:
+        """Indexes of the policy's bodies in body_names, in body_names order."""
+        if self.bodies is None:
+            return np.arange(len(body_names))
+        wanted = set(self.bodies)
+        return np.array(
+            [j for j, name in enumerate(body_names) if name in wanted], dtype=int
+        )
+
+    def orb_table(self, names: Sequence[str]) -> np.ndarray:
+        """Orbs (len(names), len(names), len(aspects)) of every pair and aspect."""
+        own = np.empty((len(names), len(self.aspects)))
+        for i, name in enumerate(names):
+            orb = self.body_orbs.get(name, {})
+            for k, aspect in enumerate(self.aspects):
+                if isinstance(orb, dict):
+                    own[i, k] = orb.get(aspect.name, aspect.orb)
+                else:
+                    own[i, k] = orb
+        return _COMBINE[self.combine](own[:, None, :], own[None, :, :])
+
+
+DEFAULT_POLICY = AspectPolicy()
+
+
+def separations(lon: np.ndarray) -> np.ndarray:
+    """
+    Signed separations lon[..., i] - lon[..., j] in [-180, 180) of every pair
+    of columns: (..., bodies, bodies).
+    """
+    return (lon[..., :, None] - lon[..., None, :] + 180.0) % 360.0 - 180.0
+
+
+def find_aspects(
+    lon: np.ndarray,
+    speed: np.ndarray,
+    body_names: Sequence[str],
+    policy: AspectPolicy = DEFAULT_POLICY,
+) -> Tuple[np.ndarray, ...]:
+    """
+    Aspects of every chart under the policy. lon and speed are (n, bodies)
+    with columns in body_names order.
+    Returns the edge arrays (chart, body1, body2, kind, orb, phase), in chart
+    order and then pair order; body1 < body2 index body_names, kind indexes
+    policy.aspects and phase indexes PHASES.
+    """
+    columns = policy.columns(body_names)
+    if not policy.aspects or columns.size < 2:
+        none = np.empty(0, dtype=int)
+        return none, none, none, none, np.empty(0), none
+    first, second = np.triu_indices(columns.size, 1)
+    diff = separations(lon[:, columns])[:, first, second]
+    separation = np.abs(diff)
+
+    angles = np.array([a.angle for a in policy.aspects], dtype=float)
+    allowed = policy.orb_table([body_names[j] for j in columns])[first, second]
+    orbs = np.abs(separation[..., None] - angles)
+    within = orbs <= allowed
+
+    chart, pair = np.nonzero(within.any(axis=-1))
+    kind = np.where(within[chart, pair], orbs[chart, pair], np.inf).argmin(axis=-1)
+    body1, body2 = columns[first[pair]], columns[second[pair]]
+
+    rate = np.sign(diff[chart, pair]) * (speed[chart, body1] - speed[chart, body2])
+    orb_rate = np.sign(separation[chart, pair] - angles[kind]) * rate
+    phase = np.where(orb_rate < 0, 0, np.where(orb_rate > 0, 1, 2))
+
+    orb = np.round(orbs[chart, pair, kind], 2)
+    return chart, body1, body2, kind, orb, phase
+
+
+def chart_aspects(
+    chart: AstrologicalData, policy: AspectPolicy = DEFAULT_POLICY
+) -> List[Aspect]:
+    """The aspects of one chart under the policy, from its body positions."""
+    names = list(chart.planets.bodies)
+    bodies = chart.planets.bodies.values()
+    lon = np.array([[b.lon for b in bodies]])
+    speed = np.array([[b.speed_lon_deg_per_day for b in bodies]])
+    definitions = policy.definitions()
+    _, body1, body2, kind, orb, phase = find_aspects(lon, speed, names, policy)
+    return [
+        Aspect(
+            body1=names[b1],
+            body2=names[b2],
+            aspect=definitions[k],
+            orb=float(o),
+            phase=PHASES[p],
+        )
+        for b1, b2, k, o, p in zip(body1, body2, kind, orb, phase)
+    ]
@@ -1,13 +1,49 @@
-import json
+import logging
 import os
+import shlex
 import subprocess
 import tempfile
+import threading
 from pathlib import Path
+from typing import Dict, List, Sequence, Tuple, Union
 
-from astro_engine.models import AstrologicalData, HouseSystem
+from astro_engine.batch import ChartBatch
+from astro_engine.cache import fingerprint, get_chart_cache
+from astro_engine.engine import ENGINE_VERSION, compute_chart, compute_charts
+from astro_engine.ephemeris import EPHE_DIR, EPHEMERIS_ENV
+from astro_engine.ingest import parse_chart
+from astro_engine.instrument import span
+from astro_engine.localtime import Ambiguous, Nonexistent
+from astro_engine.models import AstrologicalData, ChartBackend, HouseSystem
+from astro_engine.pool import get_pool
 
 MODULE_DIR = Path(__file__).resolve().parent
 SWISS_BIN = MODULE_DIR / "swecli" / "main"
+# The binary's JSON comes back through a pipe instead of a temporary file
+JSON_PIPE = os.name == "posix" and os.path.isdir("/dev/fd")
+
+logger = logging.getLogger(__name__)
+
+
+_versions: Dict[Tuple[str, ...], str] = {}
+
+
+def backend_version(backend: ChartBackend) -> str:
+    """
+    What a backend's results depend on, for the chart cache. The files are
+    fingerprinted once per process and ephemeris setting.
+    """
+    if backend == ChartBackend.SWECLI:
+        files: Tuple[str, ...] = (str(SWISS_BIN), str(EPHE_DIR))
+    else:
+        files = (str(os.environ.get(EPHEMERIS_ENV) or EPHE_DIR),)
+    key = (backend.value, *files)
+    if backend == ChartBackend.POOL:
+        key += tuple(get_pool().command)
+    version = _versions.get(key)
+    if version is None:
+        version = _versions[key] = f"{ENGINE_VERSION}:{fingerprint(*files)}"
+    return version
 
 
 def get_chart(
@@ -17,12 +53,78 @@ def get_chart(
     longitude: float,
     house_system: HouseSystem,
     timezone_IANA_id: str,
+    backend: ChartBackend = ChartBackend.SWECLI,
+    use_cache: bool = False,
+) -> AstrologicalData:
+    """
+    The chart of one record. With use_cache, repeated inputs are answered by
+    the chart cache (astro_engine.cache) instead of the backend, and share
+    one AstrologicalData; without it every call returns a new chart.
+    """
+    with span("get_chart", backend=backend.value):
+        if not use_cache:
+            return _get_chart(
+                date, time, latitude, longitude, house_system, timezone_IANA_id, backend
+            )
+        return get_chart_cache().chart(
+            date,
+            time,
+            latitude,
+            longitude,
+            house_system,
+            timezone_IANA_id,
+            backend=backend.value,
+            version=backend_version(backend),
+            compute=lambda: _get_chart(
+                date, time, latitude, longitude, house_system, timezone_IANA_id, backend
+            ),
+        )
+
+
+def _get_chart(
+    date: str,
+    time: str,
+    latitude: float,
+    longitude: float,
+    house_system: HouseSystem,
+    timezone_IANA_id: str,
+    backend: ChartBackend,
 ) -> AstrologicalData:
-    # Make an output file path
-    fd, out_path = tempfile.mkstemp(suffix=".json")
-    os.close(fd)
+    if backend == ChartBackend.PYTHON:
+        return compute_chart(
+            date=date,
+            time=time,
+            latitude=latitude,
+            longitude=longitude,
+            house_system=house_system,
+            timezone_IANA_id=timezone_IANA_id,
+        )
+    if backend == ChartBackend.POOL:
+        return get_pool().chart(
+            date=date,
+            time=time,
+            latitude=latitude,
+            longitude=longitude,
+            house_system=house_system,
+            timezone_IANA_id=timezone_IANA_id,
+        )
+
+    cmd = swecli_command(
+        date, time, latitude, longitude, house_system, timezone_IANA_id
+    )
+    return parse_chart(_run_swecli(cmd))
+
 
-    cmd = [
+def swecli_command(
+    date: str,
+    time: str,
+    latitude: float,
+    longitude: float,
+    house_system: HouseSystem,
+    timezone_IANA_id: str,
+) -> List[str]:
+    """The binary's command line for one chart, without --json."""
+    return [
         str(SWISS_BIN),
         "--date",
         date,
@@ -36,30 +138,102 @@ def get_chart(
         house_system.value,
         "--tzid",
         timezone_IANA_id,
-        "--json",
-        out_path,
     ]
 
-    print("Running:", " ".join(cmd))
-    res = subprocess.run(cmd, capture_output=True, text=True)
 
-    print("Exit code:", res.returncode)
-    if res.stdout:
-        print("STDOUT:\n", res.stdout)
-    if res.stderr:
-        print("STDERR:\n", res.stderr)
+def _run_swecli(cmd: List[str]) -> bytes:
+    """
+    Run the binary and return the JSON it wrote to --json PATH. PATH is the
+    write end of a pipe (/dev/fd/N) where the platform has one, so nothing
+    touches the disk; a temporary file otherwise.
+    """
+    if not JSON_PIPE:
+        fd, out_path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            _run(cmd + ["--json", out_path])
+            with span("swecli.read_json"), open(out_path, "rb") as f:
+                raw = f.read()
+        finally:
+            try:
+                os.remove(out_path)
+            except OSError:
+                pass
+    else:
+        read_fd, write_fd = os.pipe()
+        chunks: List[bytes] = []
+        with os.fdopen(read_fd, "rb") as pipe:
+            # read while the binary writes, a chart can outgrow the pipe buffer
+            reader = threading.Thread(target=lambda: chunks.append(pipe.read()))
+            reader.start()
+            try:
+                _run(cmd + ["--json", f"/dev/fd/{write_fd}"], pass_fds=(write_fd,))
+            finally:
+                os.close(write_fd)
+                reader.join()
+        raw = b"".join(chunks)
+    return check_json(raw)
 
-    if res.returncode != 0:
-        raise RuntimeError("C binary failed (see output above)")
 
-    if os.path.getsize(out_path) == 0:
+def check_json(raw: bytes) -> bytes:
+    if not raw.strip():
         raise RuntimeError("JSON output file is empty (did you pass --json PATH?)")
+    return raw
 
-    try:
-        with open(out_path, "r", encoding="utf-8") as f:
-            return AstrologicalData.model_validate(json.load(f))
-    finally:
-        try:
-            os.remove(out_path)
-        except OSError:
-            pass
+
+def _run(cmd: List[str], pass_fds: Tuple[int, ...] = ()):
+    log_command(cmd)
+    with span("swecli.spawn"):
+        res = subprocess.run(cmd, capture_output=True, text=True, pass_fds=pass_fds)
+    check_exit(cmd, res.returncode, res.stdout, res.stderr)
+
+
+def log_command(cmd: List[str]):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Running: %s", shlex.join(cmd))
+
+
+def check_exit(cmd: List[str], returncode: int, stdout: str, stderr: str):
+    """Log the binary's output; raise RuntimeError if it failed."""
+    if returncode != 0:
+        logger.error(
+            "%s exited with %d\nstdout: %s\nstderr: %s",
+            cmd[0],
+            returncode,
+            stdout,
+            stderr,
+        )
+        lines = stderr.strip().splitlines()
+        reason = lines[-1] if lines else "no output on stderr"
+        raise RuntimeError(f"C binary failed with exit code {returncode}: {reason}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Exit code 0\nstdout: %s\nstderr: %s", stdout, stderr)
+
+
+def get_charts(
+    dates: Sequence[str],
+    times: Sequence[str],
+    latitudes: Union[Sequence[float], float],
+    longitudes: Union[Sequence[float], float],
+    house_systems: Union[Sequence[HouseSystem], HouseSystem],
+    timezone_IANA_ids: Union[Sequence[str], str],
+    ambiguous: Ambiguous = "earlier",
+    nonexistent: Nonexistent = "forward",
+) -> ChartBatch:
+    """
+    Batch version of get_chart, one value per chart in each argument (all but
+    dates may be a single shared value). Always uses the in-process engine;
+    batch[i] is the AstrologicalData of record i and batch.charts_per_second
+    reports the throughput. ambiguous/nonexistent choose how local times in
+    DST overlaps and gaps convert (see localtime.local_to_utc).
+    """
+    return compute_charts(
+        dates=dates,
+        times=times,
+        latitudes=latitudes,
+        longitudes=longitudes,
+        house_systems=house_systems,
+        timezone_IANA_ids=timezone_IANA_ids,
+        ambiguous=ambiguous,
+        nonexistent=nonexistent,
+    )
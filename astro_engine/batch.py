@@ -0,0 +1,374 @@
+"""
+Columnar chart results.
+
+A ChartBatch holds many charts as NumPy columns (one row per chart, one column
+per body) plus the aspects as a flat edge list. Indexing a batch builds the
+usual AstrologicalData for that row, so code written for get_chart keeps
+working on batch results.
+"""
+
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from astro_engine.aspects import PHASES, AspectPolicy, find_aspects
+from astro_engine.models import (
+    DMS,
+    Aspect,
+    AspectDefinition,
+    AstrologicalData,
+    Body,
+    GeoCoordinates,
+    Houses,
+    HouseSystem,
+    MetaData,
+    PlanetaryBody,
+    Planets,
+    TZInfo,
+)
+
+SIGNS = [
+    "Aries",
+    "Taurus",
+    "Gemini",
+    "Cancer",
+    "Leo",
+    "Virgo",
+    "Libra",
+    "Scorpio",
+    "Sagittarius",
+    "Capricorn",
+    "Aquarius",
+    "Pisces",
+]
+
+MOTIONS = ["DIRECT", "RETRO", "STATION"]
+
+STATION_THRESHOLD = 0.0001
+
+
+def sign_dms(lon: float) -> Tuple[int, int, int, float]:
+    """Sign index and degrees, minutes, seconds within the sign, as the binary."""
+    sign = int(lon // 30.0)
+    arcsec = round((lon - 30.0 * sign) * 3600.0, 2)
+    deg, rest = divmod(arcsec, 3600.0)
+    minutes, sec = divmod(rest, 60.0)
+    return sign, int(deg), int(minutes), round(sec, 2)
+
+
+def _body(lon: float) -> Body:
+    lon = round(float(lon) % 360.0, 6) % 360.0
+    sign, deg, minutes, sec = sign_dms(lon)
+    return Body(sign=SIGNS[sign], pos=DMS(deg=deg, min=minutes, sec=sec), lon=lon)
+
+
+def motion_codes(
+    speed: np.ndarray, threshold: float = STATION_THRESHOLD
+) -> np.ndarray:
+    """Index into MOTIONS for each (unrounded) speed."""
+    return np.where(np.abs(speed) <= threshold, 2, np.where(speed < 0, 1, 0))
+
+
+@dataclass
+class ChartBatch:
+    """
+    n charts as columns. Body columns are (n, len(body_names)), cusps are
+    (n, 12); motion indexes MOTIONS. Aspects are an edge list sorted by
+    chart: aspect_chart[k] is the row, aspect_body1/2[k] index body_names,
+    aspect_kind[k] indexes aspect_definitions and aspect_phase[k] indexes
+    PHASES.
+
+    Values are stored at the precision of the binary's JSON output, so a row
+    converts to exactly the AstrologicalData get_chart would return.
+    """
+
+    body_names: List[str]
+    aspect_definitions: List[AspectDefinition]
+
+    local: np.ndarray
+    ut: np.ndarray
+    jd_ut: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    house_system: np.ndarray  # HouseSystem values ("P", "R", ...)
+    tzid: np.ndarray
+
+    lon: np.ndarray
+    lat: np.ndarray
+    dist: np.ndarray
+    speed: np.ndarray
+    motion: np.ndarray
+    house: np.ndarray
+
+    asc: np.ndarray
+    mc: np.ndarray
+    cusps: np.ndarray
+
+    aspect_chart: np.ndarray
+    aspect_body1: np.ndarray
+    aspect_body2: np.ndarray
+    aspect_kind: np.ndarray
+    aspect_orb: np.ndarray
+    aspect_phase: np.ndarray
+
+    station_threshold: float = STATION_THRESHOLD
+    elapsed: float = 0.0  # seconds spent computing the batch
+    # localtime.LOCAL_* code of each local time, when converted from local time
+    local_status: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.jd_ut)
+
+    def __iter__(self) -> Iterator[AstrologicalData]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> AstrologicalData:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"chart index {i} out of range for batch of {n}")
+
+        meta = MetaData(
+            local=str(self.local[i]),
+            ut=str(self.ut[i]),
+            jd_ut=float(self.jd_ut[i]),
+            geo=GeoCoordinates(
+                lat=float(self.latitude[i]), lon=float(self.longitude[i])
+            ),
+            hsys=HouseSystem(self.house_system[i]),
+            tz=TZInfo(mode="tzid", tzid=str(self.tzid[i])),
+        )
+
+        bodies = {}
+        for j, name in enumerate(self.body_names):
+            body = _body(self.lon[i, j])
+            bodies[name] = PlanetaryBody(
+                sign=body.sign,
+                pos=body.pos,
+                lon=body.lon,
+                lat=float(self.lat[i, j]),
+                dist_au=float(self.dist[i, j]),
+                speed_lon_deg_per_day=float(self.speed[i, j]),
+                motion=MOTIONS[self.motion[i, j]],
+                house=int(self.house[i, j]),
+            )
+
+        start, stop = np.searchsorted(self.aspect_chart, [i, i + 1])
+        aspects = [
+            Aspect(
+                body1=self.body_names[self.aspect_body1[k]],
+                body2=self.body_names[self.aspect_body2[k]],
+                aspect=self.aspect_definitions[self.aspect_kind[k]],
+                orb=float(self.aspect_orb[k]),
+                phase=PHASES[self.aspect_phase[k]],
+            )
+            for k in range(start, stop)
+        ]
+
+        return AstrologicalData(
+            meta=meta,
+            planets=Planets(
+                station_threshold_speed_lon_deg_per_day=self.station_threshold,
+                bodies=bodies,
+            ),
+            houses=Houses(
+                asc=_body(self.asc[i]),
+                mc=_body(self.mc[i]),
+                cusps={str(h + 1): _body(self.cusps[i, h]) for h in range(12)},
+            ),
+            aspects=aspects,
+        )
+
+    @classmethod
+    def from_charts(cls, charts: Iterable[AstrologicalData]) -> "ChartBatch":
+        """
+        The batch of some charts, the inverse of indexing:
+        ChartBatch.from_charts(charts)[i] == charts[i]. The charts must share
+        their bodies and station threshold, have cusps "1" to "12" and a tzid
+        time zone. Signs and DMS positions are not stored; they follow from
+        lon, as in the binary's output. The charts are read one at a time and
+        not kept, so a generator of charts never has to be held in memory.
+        """
+        body_names: List[str] = []
+        threshold = STATION_THRESHOLD
+        cusp_names = [str(h + 1) for h in range(12)]
+        index: Dict[str, int] = {}
+
+        metas, bodies, cusps, edges = [], [], [], []
+        definitions: Dict[Tuple[str, str, int], int] = {}
+        for i, chart in enumerate(charts):
+            if i == 0:
+                body_names = list(chart.planets.bodies)
+                threshold = chart.planets.station_threshold_speed_lon_deg_per_day
+                index = {name: j for j, name in enumerate(body_names)}
+            meta, houses = chart.meta, chart.houses
+            if set(chart.planets.bodies) != set(body_names):
+                raise ValueError(f"Chart {i} has other bodies than chart 0")
+            if chart.planets.station_threshold_speed_lon_deg_per_day != threshold:
+                raise ValueError(f"Chart {i} has another station threshold")
+            if sorted(houses.cusps) != sorted(cusp_names):
+                raise ValueError(f'Chart {i} does not have cusps "1" to "12"')
+            if meta.tz.mode != "tzid" or meta.tz.tzid is None:
+                raise ValueError(f"Chart {i} has no tzid time zone")
+
+            metas.append(
+                (
+                    meta.local,
+                    meta.ut,
+                    meta.jd_ut,
+                    meta.geo.lat,
+                    meta.geo.lon,
+                    meta.hsys.value,
+                    meta.tz.tzid,
+                    houses.asc.lon,
+                    houses.mc.lon,
+                )
+            )
+            row = []
+            for name in body_names:
+                body = chart.planets.bodies[name]
+                if body.motion not in MOTIONS:
+                    raise ValueError(f'Chart {i}: unknown motion "{body.motion}"')
+                motion = MOTIONS.index(body.motion)
+                row.append(
+                    (body.lon, body.lat, body.dist_au, body.speed_lon_deg_per_day)
+                    + (motion, body.house)
+                )
+            bodies.append(row)
+            cusps.append([houses.cusps[h].lon for h in cusp_names])
+
+            for aspect in chart.aspects:
+                if aspect.phase not in PHASES:
+                    raise ValueError(f'Chart {i}: unknown phase "{aspect.phase}"')
+                d = aspect.aspect
+                key = (d.name, d.symbol, d.angle)
+                kind = definitions.setdefault(key, len(definitions))
+                edges.append(
+                    (i, index[aspect.body1], index[aspect.body2], kind, aspect.orb)
+                    + (PHASES.index(aspect.phase),)
+                )
+
+        if not metas:
+            raise ValueError("Expected at least one chart")
+        return cls._from_rows(
+            body_names, list(definitions), metas, bodies, cusps, edges, threshold
+        )
+
+    @classmethod
+    def _from_rows(
+        cls,
+        body_names: List[str],
+        definitions: List[Tuple[str, str, int]],
+        metas: list,
+        bodies: list,
+        cusps: list,
+        edges: list,
+        threshold: float,
+    ) -> "ChartBatch":
+        """
+        A batch from plain per-chart rows: metas of (local, ut, jd_ut, lat,
+        lon, hsys, tzid, asc, mc), bodies of (lon, lat, dist, speed, motion,
+        house) per body, 12 cusp longitudes, and the aspect edges as (chart,
+        body1, body2, kind, orb, phase).
+        """
+        n, b = len(metas), len(body_names)
+        local, ut, jd_ut, lat, lon, hsys, tzid, asc, mc = zip(*metas)
+        values = np.array(bodies, dtype=float).reshape(n, b, 6)
+        chart, body1, body2, kind, orb, phase = list(zip(*edges)) or [()] * 6
+        return cls(
+            body_names=body_names,
+            aspect_definitions=[
+                AspectDefinition(name=name, symbol=symbol, angle=angle)
+                for name, symbol, angle in definitions
+            ],
+            local=np.array(local, dtype=str),
+            ut=np.array(ut, dtype=str),
+            jd_ut=np.array(jd_ut, dtype=float),
+            latitude=np.array(lat, dtype=float),
+            longitude=np.array(lon, dtype=float),
+            house_system=np.array(hsys, dtype=str),
+            tzid=np.array(tzid, dtype=str),
+            lon=values[..., 0].copy(),
+            lat=values[..., 1].copy(),
+            dist=values[..., 2].copy(),
+            speed=values[..., 3].copy(),
+            motion=values[..., 4].astype(np.int8),
+            house=values[..., 5].astype(np.int8),
+            asc=np.array(asc, dtype=float),
+            mc=np.array(mc, dtype=float),
+            cusps=np.array(cusps, dtype=float).reshape(n, 12),
+            aspect_chart=np.array(chart, dtype=np.int64),
+            aspect_body1=np.array(body1, dtype=np.int64),
+            aspect_body2=np.array(body2, dtype=np.int64),
+            aspect_kind=np.array(kind, dtype=np.int64),
+            aspect_orb=np.array(orb, dtype=float),
+            aspect_phase=np.array(phase, dtype=np.int64),
+            station_threshold=threshold,
+        )
+
+    def to_arrow(self):
+        """One row per chart as a pyarrow Table; see astro_engine.batch_io."""
+        from astro_engine.batch_io import batch_to_arrow
+
+        return batch_to_arrow(self)
+
+    @classmethod
+    def from_arrow(cls, table) -> "ChartBatch":
+        from astro_engine.batch_io import batch_from_arrow
+
+        return batch_from_arrow(table)
+
+    def write(self, path: Union[str, Path]):
+        """Save as Parquet (a .parquet path) or as an Arrow IPC file."""
+        from astro_engine.batch_io import write_batch
+
+        write_batch(self, path)
+
+    @classmethod
+    def read(cls, path: Union[str, Path], memory_map: bool = True) -> "ChartBatch":
+        """Load a batch saved by write(); Arrow IPC files are mapped, not read."""
+        from astro_engine.batch_io import read_batch
+
+        return read_batch(path, memory_map=memory_map)
+
+    def with_aspects(
+        self, policy: AspectPolicy, chunk_size: int = 16384
+    ) -> "ChartBatch":
+        """
+        The same charts with their aspects recomputed under another policy,
+        from the stored positions (no ephemeris evaluation).
+        """
+        edges = [tuple(np.empty(0, dtype=int) for _ in range(6))]
+        for start in range(0, len(self), chunk_size):
+            rows = slice(start, start + chunk_size)
+            chart, *rest = find_aspects(
+                self.lon[rows], self.speed[rows], self.body_names, policy
+            )
+            edges.append((chart + start, *rest))
+        chart, body1, body2, kind, orb, phase = (
+            np.concatenate(column) for column in zip(*edges)
+        )
+        return replace(
+            self,
+            aspect_definitions=policy.definitions(),
+            aspect_chart=chart,
+            aspect_body1=body1,
+            aspect_body2=body2,
+            aspect_kind=kind,
+            aspect_orb=orb,
+            aspect_phase=phase,
+        )
+
+    @property
+    def charts_per_second(self) -> float:
+        return len(self) / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def __repr__(self) -> str:
+        return (
+            f"ChartBatch({len(self)} charts, {len(self.aspect_chart)} aspects, "
+            f"{self.charts_per_second:,.0f} charts/s)"
+        )
@@ -0,0 +1,142 @@
+"""
+ChartBatch <-> Apache Arrow.
+
+A batch becomes one table row per chart. Body columns are fixed-size lists
+of len(body_names) values, cusps fixed-size lists of 12, and each chart's
+aspects a list of (body1, body2, kind, orb, phase) structs. Body names,
+aspect definitions and the station threshold go in the schema metadata.
+Numeric columns are handed over without copying in both directions; only
+the string columns (local, ut, house_system, tzid) are converted.
+
+    batch.write("charts.arrow")       # Arrow IPC file, uncompressed
+    batch = ChartBatch.read("charts.arrow")
+
+Reading an IPC file memory-maps it: the batch's arrays point into the page
+cache and charts are only paged in when touched. A .parquet path writes
+Parquet instead, which is smaller but has to be decoded when read.
+"""
+
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from astro_engine.batch import ChartBatch
+from astro_engine.models import AspectDefinition
+
+METADATA_KEY = b"astro_engine.chart_batch"
+FORMAT_VERSION = 1
+
+_STRING_COLUMNS = ["local", "ut", "house_system", "tzid"]
+_SCALAR_COLUMNS = ["jd_ut", "latitude", "longitude", "asc", "mc"]
+_BODY_COLUMNS = ["lon", "lat", "dist", "speed", "motion", "house"]
+_ASPECT_FIELDS = ["body1", "body2", "kind", "orb", "phase"]
+
+
+def _fixed_size(values: np.ndarray, width: int) -> pa.Array:
+    flat = pa.array(np.ascontiguousarray(values).reshape(-1))
+    return pa.FixedSizeListArray.from_arrays(flat, width)
+
+
+def batch_to_arrow(batch: ChartBatch) -> pa.Table:
+    n = len(batch)
+    columns = {name: pa.array(getattr(batch, name)) for name in _STRING_COLUMNS}
+    columns.update({name: pa.array(getattr(batch, name)) for name in _SCALAR_COLUMNS})
+    width = len(batch.body_names)
+    for name in _BODY_COLUMNS:
+        columns[name] = _fixed_size(getattr(batch, name), width)
+    columns["cusps"] = _fixed_size(batch.cusps, 12)
+
+    # aspects are sorted by chart, so each chart's are one slice of the edges
+    offsets = np.searchsorted(batch.aspect_chart, np.arange(n + 1)).astype(np.int64)
+    edges = pa.StructArray.from_arrays(
+        [pa.array(getattr(batch, f"aspect_{name}")) for name in _ASPECT_FIELDS],
+        names=_ASPECT_FIELDS,
+    )
+    columns["aspects"] = pa.LargeListArray.from_arrays(pa.array(offsets), edges)
+    if batch.local_status is not None:
+        columns["local_status"] = pa.array(batch.local_status)
+
+    metadata = {
+        "version": FORMAT_VERSION,
+        "body_names": batch.body_names,
+        "aspect_definitions": [d.model_dump() for d in batch.aspect_definitions],
+        "station_threshold": batch.station_threshold,
+        "elapsed": batch.elapsed,
+    }
+    table = pa.table(columns)
+    return table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata)})
+
+
+def _array(table: pa.Table, name: str) -> pa.Array:
+    column = table.column(name)
+    # a single chunk is used as is; several (e.g. Parquet row groups) are joined
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+def _numpy(array: pa.Array) -> np.ndarray:
+    return array.to_numpy(zero_copy_only=False)
+
+
+def batch_from_arrow(table: pa.Table) -> ChartBatch:
+    """The ChartBatch of a table made by batch_to_arrow."""
+    raw = (table.schema.metadata or {}).get(METADATA_KEY)
+    if raw is None:
+        raise ValueError("Not a chart batch table (no astro_engine metadata)")
+    metadata = json.loads(raw)
+    if metadata["version"] > FORMAT_VERSION:
+        raise ValueError(f"Unsupported chart batch version {metadata['version']}")
+
+    n = table.num_rows
+    width = len(metadata["body_names"])
+    columns = {
+        name: _numpy(_array(table, name)).astype(str) for name in _STRING_COLUMNS
+    }
+    columns.update({name: _numpy(_array(table, name)) for name in _SCALAR_COLUMNS})
+    for name in _BODY_COLUMNS:
+        columns[name] = _numpy(_array(table, name).flatten()).reshape(n, width)
+    columns["cusps"] = _numpy(_array(table, "cusps").flatten()).reshape(n, 12)
+
+    aspects = _array(table, "aspects")
+    edges = aspects.flatten()
+    for name in _ASPECT_FIELDS:
+        columns[f"aspect_{name}"] = _numpy(edges.field(name))
+    counts = np.diff(_numpy(aspects.offsets))
+    columns["aspect_chart"] = np.repeat(np.arange(n), counts)
+
+    local_status: Optional[np.ndarray] = None
+    if "local_status" in table.column_names:
+        local_status = _numpy(_array(table, "local_status"))
+
+    return ChartBatch(
+        body_names=metadata["body_names"],
+        aspect_definitions=[
+            AspectDefinition(**d) for d in metadata["aspect_definitions"]
+        ],
+        **columns,
+        station_threshold=metadata["station_threshold"],
+        elapsed=metadata["elapsed"],
+        local_status=local_status,
+    )
+
+
+def write_batch(batch: ChartBatch, path: Union[str, Path]):
+    """Parquet for a .parquet path, an uncompressed Arrow IPC file otherwise."""
+    table = batch_to_arrow(batch)
+    if Path(path).suffix == ".parquet":
+        pq.write_table(table, str(path))
+        return
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_batch(path: Union[str, Path], memory_map: bool = True) -> ChartBatch:
+    if Path(path).suffix == ".parquet":
+        return batch_from_arrow(pq.read_table(str(path), memory_map=memory_map))
+    source = pa.memory_map(str(path)) if memory_map else pa.OSFile(str(path))
+    # the arrays keep the mapping alive after the reader is gone
+    return batch_from_arrow(pa.ipc.open_file(source).read_all())
@@ -0,0 +1,171 @@
+"""
+Compact ephemeris bundles.
+
+build_bundle() copies the coefficient segments that cover a date range out of
+the .se1 files into one indexed file (see BundleEphemeris for the layout).
+The chart engine loads it like the ephemeris directory:
+
+    python -m astro_engine.bundle --start 1900 --end 2100 -o ephe-1900-2100.bundle
+    ASTRO_ENGINE_EPHEMERIS=ephe-1900-2100.bundle python main.py
+
+or ChartEngine(load_ephemeris("ephe-1900-2100.bundle")) in code.
+"""
+
+import argparse
+import json
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from astro_engine.engine import BODY_NAMES, PLANETS, julian_day
+from astro_engine.ephemeris import (
+    BUNDLE_MAGIC,
+    BUNDLE_VERSION,
+    EPHE_DIR,
+    MOON_FILE_PREFIX,
+    PLANET_FILE_PREFIX,
+    SEI_EMB,
+    SEI_MOON,
+    SEI_SUNBARY,
+    Ephemeris,
+)
+
+# Extra days kept on both sides of the range: Delta T, light-time, the speed
+# step and local time zones all reach slightly outside the calendar dates
+BUNDLE_MARGIN_DAYS = 10.0
+
+# Geocentric positions always need the Earth (EMB and Moon) and the Sun
+_ALWAYS = [SEI_EMB, SEI_MOON, SEI_SUNBARY]
+
+
+def required_bodies(names: Optional[Iterable[str]] = None) -> List[int]:
+    """File body numbers needed to compute the named bodies (all by default)."""
+    needed = set(_ALWAYS)
+    for name in BODY_NAMES if names is None else names:
+        if name in PLANETS:
+            needed.add(PLANETS[name])
+        elif name in BODY_NAMES:
+            needed.add(SEI_MOON)  # the lunar nodes come from the Moon's orbit
+        else:
+            raise ValueError(f'Unknown body "{name}"')
+    return sorted(needed)
+
+
+def build_bundle(
+    output: Union[str, Path],
+    jd_start: float,
+    jd_end: float,
+    bodies: Optional[Sequence[str]] = None,
+    ephe_dir: Path = EPHE_DIR,
+    margin_days: float = BUNDLE_MARGIN_DAYS,
+) -> Path:
+    """Write the segments covering [jd_start, jd_end] of the given bodies."""
+    if jd_end <= jd_start:
+        raise ValueError("Bundle end must be after its start")
+    lo, hi = jd_start - margin_days, jd_end + margin_days
+    ephem = Ephemeris(ephe_dir)
+
+    header: Dict = {
+        "jd_start": lo,
+        "jd_end": hi,
+        "emrat": ephem.emrat(),
+        "sources": [],
+        "bodies": {},
+    }
+    arrays: List[np.ndarray] = []
+    offset = 0
+
+    def add(values: np.ndarray) -> int:
+        nonlocal offset
+        start = offset
+        arrays.append(np.ascontiguousarray(values, dtype="<f8"))
+        offset += values.size * 8
+        return start
+
+    try:
+        for ipl in required_bodies(bodies):
+            prefix = MOON_FILE_PREFIX if ipl == SEI_MOON else PLANET_FILE_PREFIX
+            starts, ends, tseg0, coeffs = [], [], [], []
+            for file in ephem._files_for(prefix):
+                if file.tfend <= lo or file.tfstart >= hi:
+                    continue
+                if file.path.name not in header["sources"]:
+                    header["sources"].append(file.path.name)
+                body = file.bodies[ipl]
+                nseg = int(np.ceil((body.tfend - body.tfstart) / body.dseg))
+                for iseg in range(nseg):
+                    t0 = body.tfstart + iseg * body.dseg
+                    # the part of the segment this file is actually used for
+                    first = max(t0, file.tfstart)
+                    last = min(t0 + body.dseg, file.tfend)
+                    if last <= first or last <= lo or first >= hi:
+                        continue
+                    starts.append(first)
+                    ends.append(last)
+                    tseg0.append(t0)
+                    coeffs.append(file.read_segment(ipl, iseg))
+            if not coeffs:
+                raise ValueError(
+                    f"The ephemeris files in {ephe_dir} do not cover the bundle range"
+                )
+
+            ncoe = max(c.shape[-1] for c in coeffs)
+            stacked = np.zeros((len(coeffs), 3, ncoe))
+            for i, c in enumerate(coeffs):
+                stacked[i, :, : c.shape[-1]] = c
+            header["bodies"][str(ipl)] = {
+                "flags": body.flags,
+                "dseg": float(body.dseg),
+                "nseg": len(coeffs),
+                "ncoe": ncoe,
+                "starts": add(np.array(starts)),
+                "ends": add(np.array(ends)),
+                "tseg0": add(np.array(tseg0)),
+                "coeffs": add(stacked),
+            }
+    finally:
+        ephem.close()
+
+    # data offsets are relative to the end of the header, padded to 8 bytes
+    text = json.dumps(header).encode("utf-8")
+    text += b" " * (-(16 + len(text)) % 8)
+
+    output = Path(output)
+    with open(output, "wb") as fp:
+        fp.write(struct.pack("<8sII", BUNDLE_MAGIC, BUNDLE_VERSION, len(text)))
+        fp.write(text)
+        for values in arrays:
+            fp.write(values.tobytes())
+    return output
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Build a compact ephemeris bundle for a range of years."
+    )
+    parser.add_argument("--start", type=int, required=True, help="first year")
+    parser.add_argument("--end", type=int, required=True, help="last year")
+    parser.add_argument(
+        "--bodies",
+        help="comma-separated body names (default: every chart body)",
+    )
+    parser.add_argument("--ephe-dir", type=Path, default=EPHE_DIR)
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    bodies = args.bodies.split(",") if args.bodies else None
+    path = build_bundle(
+        args.output,
+        julian_day(datetime(args.start, 1, 1)),
+        julian_day(datetime(args.end + 1, 1, 1)),
+        bodies=bodies,
+        ephe_dir=args.ephe_dir,
+    )
+    print(f"Wrote {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
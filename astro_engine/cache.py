@@ -0,0 +1,422 @@
+"""
+Chart result cache.
+
+get_chart(..., use_cache=True) results are memoized on normalized inputs:
+the Julian day UT and the coordinates rounded to a configurable number of
+decimals, the house system, and the version of the backend that computed
+them (engine version plus a fingerprint of the binary and ephemeris files).
+Two tiers:
+
+  - an in-memory LRU of AstrologicalData, bounded by entry count
+  - an SQLite file of chart JSON keyed by the hash of the normalized inputs
+    (ASTRO_ENGINE_CHART_CACHE, or ~/.cache/astro_engine/charts.sqlite3),
+    bounded by entry count with the oldest entries dropped first; a chart
+    takes about 6 KB, so the default bound is about 300 MB
+
+If the SQLite file cannot be opened or created (a read-only home directory,
+a corrupt file), get_chart_cache logs a warning and keeps the memory tier
+only.
+
+Entries older than ttl seconds count as misses. When a backend's version
+changes, its stored entries are dropped the first time it is used.
+
+Cached charts are shared: treat them as read-only.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+from astro_engine.engine import _format_moment, julian_day
+from astro_engine.localtime import parse_local_datetime
+from astro_engine.models import (
+    AstrologicalData,
+    GeoCoordinates,
+    HouseSystem,
+    MetaData,
+    TZInfo,
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENV = "ASTRO_ENGINE_CHART_CACHE"
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "astro_engine" / "charts.sqlite3"
+
+DEFAULT_MEMORY_SIZE = 4096
+DEFAULT_DISK_SIZE = 50_000
+# 1e-8 days is under a millisecond, 1e-6 degrees about 10 cm
+JD_DECIMALS = 8
+COORD_DECIMALS = 6
+
+
+class ChartCacheStats(NamedTuple):
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    evictions: int  # entries dropped from either tier to respect its size
+    expired: int  # entries found older than the ttl
+    memory_size: int
+    disk_size: int
+
+
+def fingerprint(*paths: Union[str, Path]) -> str:
+    """Hash of the names, sizes and modification times of files and directories."""
+    digest = hashlib.sha1()
+    for path in map(Path, paths):
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file in files:
+            try:
+                stat = file.stat()
+            except OSError:
+                digest.update(f"{file}:missing;".encode())
+                continue
+            if file.is_file():
+                digest.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """Two-tier chart memo; see the module docstring. path=None: memory only."""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        memory_size: int = DEFAULT_MEMORY_SIZE,
+        disk_size: int = DEFAULT_DISK_SIZE,
+        ttl: Optional[float] = None,
+        jd_decimals: int = JD_DECIMALS,
+        coord_decimals: int = COORD_DECIMALS,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttl = ttl
+        self.jd_decimals = jd_decimals
+        self.coord_decimals = coord_decimals
+
+        self._lock = threading.Lock()
+        # key -> (created, backend, chart)
+        self._memory: "OrderedDict[str, Tuple[float, str, AstrologicalData]]" = (
+            OrderedDict()
+        )
+        self._checked: Dict[str, str] = {}  # backend -> version seen this run
+        self._memory_hits = self._disk_hits = self._misses = 0
+        self._evictions = self._expired = 0
+
+        self._db = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            try:
+                self._disk_count = self._open_tables()
+            except sqlite3.Error:
+                self._db.close()
+                raise
+        else:
+            self._disk_count = 0
+
+    def _open_tables(self) -> int:
+        """Create the tables if needed; the number of stored charts."""
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS charts (key TEXT PRIMARY KEY, "
+                "backend TEXT, created REAL, chart TEXT)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS charts_created ON charts (created)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS versions "
+                "(backend TEXT PRIMARY KEY, version TEXT)"
+            )
+        return self._db.execute("SELECT COUNT(*) FROM charts").fetchone()[0]
+
+    def key(
+        self,
+        jd_ut: float,
+        latitude: float,
+        longitude: float,
+        house_system: HouseSystem,
+        version: str,
+    ) -> str:
+        """Content hash of the normalized inputs."""
+        c = self.coord_decimals
+        text = (
+            f"{version}|{jd_ut:.{self.jd_decimals}f}|{latitude:.{c}f}|"
+            f"{longitude:.{c}f}|{HouseSystem(house_system).value}"
+        )
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _check_version(self, backend: str, version: str):
+        if self._checked.get(backend) == version:
+            return
+        stale = [key for key, entry in self._memory.items() if entry[1] == backend]
+        for key in stale:
+            del self._memory[key]
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT version FROM versions WHERE backend = ?", (backend,)
+            ).fetchone()
+            if row is None or row[0] != version:
+                with self._db:
+                    cursor = self._db.execute(
+                        "DELETE FROM charts WHERE backend = ?", (backend,)
+                    )
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO versions VALUES (?, ?)",
+                        (backend, version),
+                    )
+                self._disk_count -= cursor.rowcount
+        self._checked[backend] = version
+
+    def _fresh(self, created: float) -> bool:
+        return self.ttl is None or time.time() - created <= self.ttl
+
+    def _remember(
+        self, key: str, backend: str, created: float, chart: AstrologicalData
+    ):
+        self._memory[key] = (created, backend, chart)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, key: str) -> Optional[AstrologicalData]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._fresh(entry[0]):
+                    self._memory.move_to_end(key)
+                    self._memory_hits += 1
+                    return entry[2]
+                self._drop(key)
+                self._expired += 1
+                self._misses += 1
+                return None
+
+            row = None
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT backend, created, chart FROM charts WHERE key = ?",
+                    (key,),
+                ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            backend, created, text = row
+            if not self._fresh(created):
+                self._drop(key)
+                self._expired += 1
+                self._misses += 1
+                return None
+            chart = AstrologicalData.model_validate_json(text)
+            self._remember(key, backend, created, chart)
+            self._disk_hits += 1
+            return chart
+
+    def put(self, key: str, backend: str, chart: AstrologicalData):
+        created = time.time()
+        with self._lock:
+            self._remember(key, backend, created, chart)
+            if self._db is None:
+                return
+            with self._db:
+                replaced = self._db.execute(
+                    "SELECT 1 FROM charts WHERE key = ?", (key,)
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO charts VALUES (?, ?, ?, ?)",
+                    (key, backend, created, chart.model_dump_json()),
+                )
+                if replaced is None:
+                    self._disk_count += 1
+                excess = self._disk_count - self.disk_size
+                if excess > 0:
+                    self._db.execute(
+                        "DELETE FROM charts WHERE key IN "
+                        "(SELECT key FROM charts ORDER BY created LIMIT ?)",
+                        (excess,),
+                    )
+                    self._disk_count -= excess
+                    self._evictions += excess
+
+    def _drop(self, key: str):
+        self._memory.pop(key, None)
+        if self._db is not None:
+            with self._db:
+                cursor = self._db.execute("DELETE FROM charts WHERE key = ?", (key,))
+            self._disk_count -= cursor.rowcount
+
+    def chart(
+        self,
+        date: str,
+        time: str,
+        latitude: float,
+        longitude: float,
+        house_system: HouseSystem,
+        timezone_IANA_id: str,
+        backend: str,
+        version: str,
+        compute: Callable[[], AstrologicalData],
+    ) -> AstrologicalData:
+        """
+        The cached chart of these inputs, or compute() stored under them.
+        A chart cached for other inputs that normalize the same (another
+        zone, a time within the rounding) comes back with this call's meta.
+        """
+        key, cached = self.lookup(
+            date,
+            time,
+            latitude,
+            longitude,
+            house_system,
+            timezone_IANA_id,
+            backend,
+            version,
+        )
+        if cached is None:
+            chart = compute()
+            self.put(key, backend, chart)
+            return chart
+        return cached
+
+    def lookup(
+        self,
+        date: str,
+        time: str,
+        latitude: float,
+        longitude: float,
+        house_system: HouseSystem,
+        timezone_IANA_id: str,
+        backend: str,
+        version: str,
+    ) -> Tuple[str, Optional[AstrologicalData]]:
+        """
+        The key of these inputs and the chart cached under it (None if there
+        is none), with this call's meta; see chart(). put() stores a miss.
+        """
+        local = parse_local_datetime(date, time)
+        ut = (
+            local.replace(tzinfo=ZoneInfo(timezone_IANA_id))
+            .astimezone(timezone.utc)
+            .replace(tzinfo=None)
+        )
+        jd_ut = julian_day(ut)
+        with self._lock:
+            self._check_version(backend, version)
+        key = self.key(jd_ut, latitude, longitude, house_system, version)
+
+        cached = self.get(key)
+        if cached is None:
+            return key, None
+
+        meta = cached.meta
+        local_text = _format_moment(local)
+        if (
+            meta.local == local_text
+            and meta.tz.tzid == timezone_IANA_id
+            and (meta.geo.lat, meta.geo.lon) == (latitude, longitude)
+        ):
+            return key, cached
+        meta = MetaData(
+            local=local_text,
+            ut=_format_moment(ut),
+            jd_ut=round(jd_ut, 8),
+            geo=GeoCoordinates(lat=latitude, lon=longitude),
+            hsys=HouseSystem(house_system),
+            tz=TZInfo(mode="tzid", tzid=timezone_IANA_id),
+        )
+        return key, cached.model_copy(update={"meta": meta})
+
+    def stats(self) -> ChartCacheStats:
+        with self._lock:
+            return ChartCacheStats(
+                memory_hits=self._memory_hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expired=self._expired,
+                memory_size=len(self._memory),
+                disk_size=self._disk_count,
+            )
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_hits = self._disk_hits = self._misses = 0
+            self._evictions = self._expired = 0
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM charts")
+                self._disk_count = 0
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+
+
+_cache: Optional[ChartCache] = None
+_cache_lock = threading.Lock()
+
+
+def configure_chart_cache(
+    cache_path: Optional[Union[str, Path]] = None,
+    persist: bool = True,
+    memory_size: int = DEFAULT_MEMORY_SIZE,
+    disk_size: int = DEFAULT_DISK_SIZE,
+    ttl: Optional[float] = None,
+    jd_decimals: int = JD_DECIMALS,
+    coord_decimals: int = COORD_DECIMALS,
+) -> ChartCache:
+    """
+    Replace the cache used by get_chart: cache_path defaults to
+    ASTRO_ENGINE_CHART_CACHE or the user cache directory, persist=False keeps
+    only the memory tier.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = _make_cache(
+            cache_path,
+            persist,
+            memory_size=memory_size,
+            disk_size=disk_size,
+            ttl=ttl,
+            jd_decimals=jd_decimals,
+            coord_decimals=coord_decimals,
+        )
+        return _cache
+
+
+def _make_cache(
+    cache_path: Optional[Union[str, Path]], persist: bool, **options
+) -> ChartCache:
+    if not persist:
+        return ChartCache(None, **options)
+    cache_path = Path(cache_path or os.environ.get(CACHE_ENV) or DEFAULT_CACHE_PATH)
+    try:
+        return ChartCache(cache_path, **options)
+    except (OSError, sqlite3.Error) as error:
+        logger.warning(
+            "Chart cache %s unavailable (%s), caching in memory only",
+            cache_path,
+            error,
+        )
+        return ChartCache(None, **options)
+
+
+def get_chart_cache() -> ChartCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = _make_cache(None, True)
+        return _cache
@@ -1,365 +1,447 @@
+import io
+import threading
 from copy import deepcopy
-from typing import List
+from typing import Dict, Optional, Sequence, Tuple, Union
 
-import matplotlib.pyplot as plt
+import matplotlib.image as mpl_image
 import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
 
+from astro_engine import wheel
+from astro_engine.instrument import span, traced
 from astro_engine.models import AstrologicalData, Body
-
-SIGN_GLYPHS = ["♈", "♉", "♊", "♋", "♌", "♍", "♎", "♏", "♐", "♑", "♒", "♓"]
-
-
-def render_zodiac_wheel(*, title: str = "Zodiac Wheel", asc_lon: float = 0.0):
-    outer_r = 1.0
-    inner_r = 0.72
-    """
-    Draw zodiac wheel (sign ring only), oriented so the Ascendant is at 9 o'clock.
-
-    Fixed convention:
-      - 0° in our polar plot is at 9 o'clock (we use theta_zero_location('W'))
-      - angles increase counter-clockwise
-
-    asc_lon:
-      Ascendant longitude in absolute zodiac degrees (0..360, 0=Aries).
-      We rotate the entire sign ring by -asc_lon so ASC appears at 9 o'clock.
-    """
-    fig = plt.figure(figsize=(8, 8))
-    ax = plt.subplot(111, projection="polar")
-
+from astro_engine.wheel import (
+    ASPECT_R,
+    CUSP_LABEL_R,
+    HIDDEN_BODIES,
+    MARKER_LABEL_R,
+    PLANET_GLYPH_R,
+    PLANET_GLYPHS,
+    PLANET_LINE_R,
+    PLANET_STACK_STEP,
+    SIGN_BOUNDARY_LW,
+    SIGN_GLYPHS,
+    SIGN_LABEL_R,
+    WHEEL_INNER_R,
+    WHEEL_LIMIT_R,
+    WHEEL_OUTER_R,
+    WHEEL_RING_LW,
+    RotatedChart,
+    stack_levels,
+)
+
+# moved to astro_engine.wheel, still importable from here
+PLANET_ORDER = wheel.PLANET_ORDER
+cluster_by_longitude = wheel.cluster_by_longitude
+get_planet_index_in_cluster = wheel.get_planet_index_in_cluster
+
+
+def _radial_segments(theta: np.ndarray, r0: float, r1: float) -> np.ndarray:
+    """(n, 2, 2) segments from (theta, r0) to (theta, r1)."""
+    segments = np.empty((theta.size, 2, 2))
+    segments[:, :, 0] = theta[:, None]
+    segments[:, 0, 1] = r0
+    segments[:, 1, 1] = r1
+    return segments
+
+
+def _thetas(lons: Sequence[float]) -> np.ndarray:
+    return np.deg2rad(np.asarray(lons, dtype=float) % 360.0)
+
+
+def _setup_wheel_axes(ax, title: str):
+    """The rotation-independent part of the wheel: axes setup, rings and title."""
     # Your fixed wheel convention
     ax.set_theta_zero_location("W")  # 0° at 9 o'clock
     ax.set_theta_direction(1)  # counter-clockwise
 
-    label_r = 0.86
-    boundary_lw = 1.2
-    ring_lw = 2.0
-
-    ax.set_ylim(0, outer_r * 1.3)
+    ax.set_ylim(0, WHEEL_LIMIT_R)
     ax.spines["polar"].set_visible(False)
     ax.set_xticks([])
     ax.set_yticks([])
     ax.grid(False)
-    ax.spines["polar"].set_linewidth(ring_lw)
+    ax.spines["polar"].set_linewidth(WHEEL_RING_LW)
 
     thetas = np.linspace(0, 2 * np.pi, 720)
-    ax.plot(thetas, np.full_like(thetas, outer_r), color="black", lw=ring_lw)
-    ax.plot(thetas, np.full_like(thetas, inner_r), color="black", lw=boundary_lw)
+    for r, lw in ((WHEEL_OUTER_R, WHEEL_RING_LW), (WHEEL_INNER_R, SIGN_BOUNDARY_LW)):
+        ax.plot(thetas, np.full_like(thetas, r), color="black", lw=lw)
+    ax.set_title(title, pad=20, fontsize=14)
 
+
+def _draw_sign_ring(ax, asc_lon: float):
+    """
+    Sign boundaries (one line collection) and glyphs, rotated so asc_lon sits
+    at 9 o'clock.
+    """
+    boundaries = LineCollection(
+        [], colors="black", linewidths=SIGN_BOUNDARY_LW, capstyle="projecting"
+    )
+    ax.add_collection(boundaries, autolim=False)
+    glyphs = [
+        ax.text(0.0, SIGN_LABEL_R, glyph, fontsize=22, ha="center", va="center")
+        for glyph in SIGN_GLYPHS
+    ]
+    _rotate_sign_ring(boundaries, glyphs, asc_lon)
+    return boundaries, glyphs
+
+
+def _rotate_sign_ring(boundaries: LineCollection, glyphs, asc_lon: float):
     # Rotation offset: rotate the whole zodiac ring so ASC becomes 0° at 9 o'clock
     offset = (-float(asc_lon)) % 360.0
+    sign_starts = np.arange(12) * 30.0
+    boundaries.set_segments(
+        _radial_segments(
+            np.deg2rad((sign_starts + offset) % 360.0), WHEEL_INNER_R, WHEEL_OUTER_R
+        )
+    )
+    for glyph, theta in zip(glyphs, np.deg2rad((sign_starts + 15.0 + offset) % 360.0)):
+        glyph.set_x(theta)
 
-    def theta_deg(lon_deg: float) -> float:
-        """Convert a zodiac longitude to polar theta (radians), including wheel rotation."""
-        return np.deg2rad((lon_deg + offset) % 360.0)
 
-    # Draw sign boundaries + labels, rotated
-    for i in range(12):
-        boundary_lon = i * 30.0
-        mid_lon = i * 30.0 + 15.0
+def _new_figure(figsize: Tuple[float, float], dpi: Optional[float]) -> Figure:
+    """
+    A figure on its own Agg canvas. pyplot never sees it, so nothing global is
+    touched and it is freed with the last reference.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
 
-        th_b = theta_deg(boundary_lon)
-        ax.plot([th_b, th_b], [inner_r, outer_r], color="black", lw=boundary_lw)
 
-        th_m = theta_deg(mid_lon)
-        ax.text(th_m, label_r, SIGN_GLYPHS[i], fontsize=22, ha="center", va="center")
+def render_zodiac_wheel(
+    *,
+    title: str = "Zodiac Wheel",
+    asc_lon: float = 0.0,
+    figsize: Tuple[float, float] = (8, 8),
+    dpi: Optional[float] = None,
+):
+    """
+    Draw zodiac wheel (sign ring only), oriented so the Ascendant is at 9 o'clock.
 
-    ax.set_title(title, pad=20, fontsize=14)
-    plt.tight_layout()
+    Fixed convention:
+      - 0° in our polar plot is at 9 o'clock (we use theta_zero_location('W'))
+      - angles increase counter-clockwise
+
+    asc_lon:
+      Ascendant longitude in absolute zodiac degrees (0..360, 0=Aries).
+      We rotate the entire sign ring by -asc_lon so ASC appears at 9 o'clock.
+    """
+    fig = _new_figure(figsize, dpi)
+    ax = fig.add_subplot(111, projection="polar")
+    _setup_wheel_axes(ax, title)
+    _draw_sign_ring(ax, asc_lon)
+    fig.tight_layout()
+    _aspect_axes(ax)  # after the layout, so it covers the wheel
     return fig, ax
 
 
-def draw_marker(
+def draw_markers(
     ax,
-    marker: Body,
-    marker_name: str,
+    lons: Sequence[float],
+    names: Sequence[str],
     *,
-    inner_r: float = 0.72,
-    outer_r: float = 1.0,
-    label_r: float = 0.85,
+    inner_r: float = WHEEL_INNER_R,
+    outer_r: float = WHEEL_OUTER_R,
+    label_r: float = MARKER_LABEL_R,
     color: str = "crimson",
     lw: float = 2.5,
 ):
     """
-    Draw marker on an existing polar axis.
-    Expects rising like:
-      {'sign':'Leo', 'pos': {...}, 'lon': 128.669126}
+    Draw markers (ASC, MC, ...) on an existing polar axis: one collection of
+    lines, one of triangles, and a label per marker. Returns the three.
 
     Assumes the axis has already been configured with the desired orientation
     (theta zero location and direction). We only need theta = radians(lon).
     """
-    lon = float(marker.lon) % 360.0
-    theta = np.deg2rad(lon)
+    theta = _thetas(lons)
+
+    # Main marker lines
+    lines = ax.add_collection(
+        LineCollection(
+            _radial_segments(theta, inner_r, outer_r),
+            colors=color,
+            linewidths=lw,
+            capstyle="projecting",
+            zorder=20,
+        )
+    )
 
-    # Main marker line
-    ax.plot([theta, theta], [inner_r, outer_r], color=color, lw=lw, zorder=20)
+    # A small arrow-ish triangle near the outer ring
+    triangles = ax.add_collection(
+        PolyCollection(
+            _marker_triangles(theta, outer_r),
+            facecolors=color,
+            edgecolors=color,
+            alpha=0.9,
+            joinstyle="miter",
+            zorder=21,
+        )
+    )
 
-    # A small arrow-ish triangle near the outer ring (optional flair)
-    # You can remove this block if you want it simpler.
+    # Labels
+    labels = [
+        ax.text(
+            th,
+            label_r,
+            f"{name}",
+            ha="center",
+            va="center",
+            fontsize=10,
+            fontweight="bold",
+            color=color,
+            bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.85),
+            zorder=22,
+        )
+        for th, name in zip(theta, names)
+    ]
+    return lines, triangles, labels
+
+
+def _marker_triangles(theta: np.ndarray, outer_r: float) -> np.ndarray:
     tip_r = outer_r + 0.1
     base_r = outer_r - 0.05
     spread = np.deg2rad(1.2)  # angle spread for the triangle
-    ax.fill(
-        [theta, theta - spread, theta + spread],
-        [tip_r, base_r, base_r],
-        color=color,
-        alpha=0.9,
-        zorder=21,
-    )
-
-    # Label
-    label = f"{marker_name}"
-    ax.text(
-        theta,
-        label_r,
-        label,
-        ha="center",
-        va="center",
-        fontsize=10,
-        fontweight="bold",
-        color=color,
-        bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.85),
-        zorder=22,
-    )
+    triangles = np.empty((theta.size, 3, 2))
+    triangles[:, :, 0] = theta[:, None] + [0.0, -spread, spread]
+    triangles[:, :, 1] = [tip_r, base_r, base_r]
+    return triangles
 
 
-import numpy as np
+def draw_marker(ax, marker: Body, marker_name: str, **kwargs):
+    """Draw one marker; see draw_markers."""
+    return draw_markers(ax, [marker.lon], [marker_name], **kwargs)
 
 
-def draw_cusp(
+def draw_cusps(
     ax,
-    cusp: Body,
-    cusp_name: str,
+    lons: Sequence[float],
+    names: Sequence[str],
     *,
-    inner_r: float = 0.72,
-    label_r: float = 0.42,
+    inner_r: float = WHEEL_INNER_R,
+    label_r: float = CUSP_LABEL_R,
     color: str = "black",
     lw: float = 0.9,
     show_label: bool = True,
 ):
     """
-    Draw a house cusp (thin black line) on an existing polar axis.
-
-    - Line goes from center (r=0) to outer ring (r=outer_r)
-    - No arrow head
-    - Uses same theta logic as draw_marker(): theta = radians(lon)
+    Draw house cusps (thin black lines from the center to the inner ring) on
+    an existing polar axis, as one line collection plus a label per cusp.
+    Returns the collection and the labels.
 
-    cusp: Body with .lon (degrees), optionally .sign/.pos if you want labels
-    cusp_name: e.g. "1", "2", ..., "12" or "I"..."XII"
+    names: e.g. "1", "2", ..., "12" or "I"..."XII"
     """
-    lon = float(cusp.lon) % 360.0
-    theta = np.deg2rad(lon)
-
-    # Thin cusp line from center to inner ring
-    ax.plot([theta, theta], [0.0, inner_r], color=color, lw=lw, zorder=10)
-
-    if show_label:
-        ax.text(
-            theta,
-            label_r,
-            str(cusp_name),
-            ha="center",
-            va="center",
-            fontsize=9,
-            color=color,
-            bbox=dict(boxstyle="round,pad=0.12", fc="white", ec="none", alpha=0.75),
-            zorder=11,
+    theta = _thetas(lons)
+
+    lines = ax.add_collection(
+        LineCollection(
+            _radial_segments(theta, 0.0, inner_r),
+            colors=color,
+            linewidths=lw,
+            capstyle="projecting",
+            zorder=10,
         )
+    )
 
+    labels = []
+    if show_label:
+        for th, name in zip(theta, names):
+            label = ax.text(
+                th,
+                label_r,
+                str(name),
+                ha="center",
+                va="center",
+                fontsize=9,
+                color=color,
+                bbox=dict(boxstyle="round,pad=0.12", fc="white", ec="none", alpha=0.75),
+                zorder=11,
+            )
+            labels.append(label)
+    return lines, labels
 
-## To resolve issues with conjunct planets ##
-def cluster_by_longitude(
-    planet_names: List[str], planets: List[Body], threshold_deg=3.0
-) -> List[List[str]]:
-    """
-    items: list of Planets
-    Returns list of clusters, each a list of Planets.
-    Handles wrap-around at 0/360.
-    """
-    # create list of key, value pairs for planet names and longitudes
-    k_v_pairs = [
-        {"planet": planet_names[i], "longitude": planets[i].lon}
-        for i in range(0, len(planet_names))
-    ]
-
-    # sort by longitude
-    sorted_pairs = sorted(k_v_pairs, key=lambda p: p["longitude"])
 
-    clusters = []
+def draw_cusp(ax, cusp: Body, cusp_name: str, **kwargs):
+    """Draw one house cusp; see draw_cusps."""
+    return draw_cusps(ax, [cusp.lon], [cusp_name], **kwargs)
 
-    curr = [sorted_pairs[0]]
 
-    for prev, item in zip(sorted_pairs, sorted_pairs[1:]):
-        if (item["longitude"] - prev["longitude"]) <= threshold_deg:
-            curr.append(item)
-        else:
-            clusters.append(curr)
-            curr = [item]
-
-    clusters.append(curr)
-
-    # merge first and last if they wrap around near 0/360
-    if len(clusters) > 1:
-        first = clusters[0]
-        last = clusters[-1]
-        if (first[0]["longitude"] + 360.0) - last[-1]["longitude"] <= threshold_deg:
-            clusters[0] = last + first
-            clusters.pop()
-
-    return clusters
-
-
-PLANET_ORDER = [
-    "Sun",
-    "Moon",
-    "Mercury",
-    "Venus",
-    "Mars",
-    "Jupiter",
-    "Saturn",
-    "Uranus",
-    "Neptune",
-    "Pluto",
-    "True N.Node",
-    "True S.Node",
-]
-
-PLANET_GLYPHS = {
-    "Sun": "☉",
-    "Moon": "☽",
-    "Mercury": "☿",
-    "Venus": "♀",
-    "Mars": "♂",
-    "Jupiter": "♃",
-    "Saturn": "♄",
-    "Uranus": "♅",
-    "Neptune": "♆",
-    "Pluto": "♇",
-    "True N.Node": "☊",
-    "True S.Node": "☋",
-}
-
-
-def draw_planet(
+def draw_planets(
     ax,
-    planet: Body,
-    planet_name: str,
+    lons: Sequence[float],
+    names: Sequence[str],
     *,
-    glyph_theta_offset_deg: float = 0.0,
-    line_start_r: float = 1.0,  # start at wheel edge
-    line_end_r: float = 1.12,  # extend outside the wheel
-    glyph_r: float = 1.18,  # glyph position (outside)
-    color: str = "black",
+    glyph_theta_offset_deg: Union[float, Sequence[float]] = 0.0,
+    line_start_r: float = WHEEL_OUTER_R,  # start at wheel edge
+    line_end_r: float = PLANET_LINE_R,  # extend outside the wheel
+    glyph_r: Union[float, Sequence[float]] = PLANET_GLYPH_R,  # glyph position
+    colors: Union[str, Sequence[str]] = "black",
     lw: float = 1.0,
     fontsize: int = 16,
 ):
     """
-    Draw a planet outside the wheel with a leader line from the wheel edge.
+    Draw planets outside the wheel, each with a leader line from the wheel
+    edge: one line collection plus a glyph per planet, which are returned.
+    glyph_r, the glyph offset and colors may be one value or one per planet.
 
-    Assumes planet.lon is already in the same rotated coordinate system as the wheel.
+    Assumes the longitudes are already in the same rotated coordinate system
+    as the wheel.
     """
-    lon = float(planet.lon) % 360.0
+    lon = np.asarray(lons, dtype=float) % 360.0
     theta = np.deg2rad(lon)
+    n = theta.size
+    colors = [colors] * n if isinstance(colors, str) else list(colors)
+
+    # Leader lines from the wheel edge outward, at TRUE longitude
+    lines = ax.add_collection(
+        LineCollection(
+            _radial_segments(theta, line_start_r, line_end_r),
+            colors=colors,
+            linewidths=lw,
+            capstyle="projecting",
+            zorder=30,
+        )
+    )
 
-    # Leader line from the wheel edge outward, at TRUE longitude
-    ax.plot([theta, theta], [line_start_r, line_end_r], color=color, lw=lw, zorder=30)
-
-    # glyph offset tangentially (only the glyph position changes)
+    # glyphs offset tangentially (only the glyph position changes)
     theta_glyph = np.deg2rad((lon + glyph_theta_offset_deg) % 360.0)
+    glyph_rs = np.broadcast_to(np.asarray(glyph_r, dtype=float), (n,))
 
-    # Glyph at the end (outside the wheel)
-    glyph = PLANET_GLYPHS.get(planet_name, planet_name[:2])
+    # Glyphs at the end (outside the wheel)
+    glyphs = [
+        ax.text(
+            th,
+            r,
+            PLANET_GLYPHS.get(name, name[:2]),
+            fontsize=fontsize,
+            ha="center",
+            va="center",
+            color=color,
+            zorder=31,
+        )
+        for th, r, name, color in zip(theta_glyph, glyph_rs, names, colors)
+    ]
+    return lines, glyphs
 
-    ax.text(
-        theta_glyph,
-        glyph_r,
-        glyph,
-        fontsize=fontsize,
-        ha="center",
-        va="center",
-        color=color,
-        zorder=31,
-    )
+
+def draw_planet(ax, planet: Body, planet_name: str, *, color: str = "black", **kwargs):
+    """Draw one planet; see draw_planets."""
+    return draw_planets(ax, [planet.lon], [planet_name], colors=color, **kwargs)
 
 
-def _lon_to_xy_for_wheel(lon_deg: float, r: float) -> tuple[float, float]:
+def _lon_to_xy_for_wheel(lon_deg, r: float):
     """
-    Convert longitude to x,y for YOUR wheel convention:
+    Convert longitudes to x,y for YOUR wheel convention:
       - 0° at 9 o'clock (W)
       - increases counter-clockwise
     """
-    ang = np.deg2rad(lon_deg % 360.0) + np.pi
+    ang = np.deg2rad(np.asarray(lon_deg) % 360.0) + np.pi
     return r * np.cos(ang), r * np.sin(ang)
 
 
-def draw_aspect_line(
+def _aspect_axes(ax):
+    """
+    The transparent Cartesian overlay of a wheel axis, where aspect chords
+    are drawn. The wheel functions create it up front, once the layout is set.
+    """
+    if not hasattr(ax, "_aspect_ax"):
+        aspect_ax = ax.figure.add_axes(ax.get_position(), frameon=False)
+        aspect_ax.set_xlim(-WHEEL_LIMIT_R, WHEEL_LIMIT_R)
+        aspect_ax.set_ylim(-WHEEL_LIMIT_R, WHEEL_LIMIT_R)
+        aspect_ax.set_aspect("equal", adjustable="box")
+        aspect_ax.axis("off")
+        ax._aspect_ax = aspect_ax
+    return ax._aspect_ax
+
+
+def draw_aspect_lines(
     ax,
-    planet1,
-    planet2,
+    lons1: Sequence[float],
+    lons2: Sequence[float],
     *,
-    aspect_r: float = 0.72,  # radius where aspect endpoints sit (near/inside inner ring)
-    color: str = "red",
+    aspect_r: float = ASPECT_R,  # radius where aspect endpoints sit (the inner ring)
+    colors: Union[str, Sequence[str]] = "red",
     lw: float = 1.2,
     alpha: float = 0.7,
-    label: str | None = None,
+    labels: Optional[Sequence[Optional[str]]] = None,
     label_color: str = "black",
     label_fontsize: int = 9,
 ):
     """
-    Draw a straight aspect chord between two longitudes on the inner circle
-    and optionally place a label at the midpoint.
+    Draw straight aspect chords between pairs of longitudes on the inner
+    circle, as one line collection, and optionally a label at each midpoint.
+    Returns the collection and the labels.
 
-    IMPORTANT: This draws on a transparent Cartesian overlay axis so the chord is truly straight.
-    Assumes planet.lon values are already rotated into your wheel coordinates.
+    IMPORTANT: This draws on a transparent Cartesian overlay axis so the chords are truly straight.
+    Assumes the longitudes are already rotated into your wheel coordinates.
     """
-    lon1 = float(planet1.lon) % 360.0
-    lon2 = float(planet2.lon) % 360.0
+    aspect_ax = _aspect_axes(ax)
+
+    # Draw the chords
+    chords, midpoints = _chords(lons1, lons2, aspect_r)
+    lines = aspect_ax.add_collection(
+        LineCollection(
+            chords,
+            colors=colors,
+            linewidths=lw,
+            alpha=alpha,
+            capstyle="projecting",
+            zorder=5,
+        )
+    )
 
-    x1, y1 = _lon_to_xy_for_wheel(lon1, aspect_r)
-    x2, y2 = _lon_to_xy_for_wheel(lon2, aspect_r)
+    # --- Labels at midpoints ---------------------------------
+    texts = [
+        _aspect_label(aspect_ax, x, y, label, label_color, label_fontsize)
+        for (x, y), label in zip(midpoints, labels or [])
+        if label
+    ]
+    return lines, texts
 
-    # Create (or reuse) a transparent overlay cartesian axis
-    fig = ax.figure
-    if not hasattr(ax, "_aspect_ax"):
-        aspect_ax = fig.add_axes(ax.get_position(), frameon=False)
-        aspect_ax.set_xlim(-1.3, 1.3)
-        aspect_ax.set_ylim(-1.3, 1.3)
-        aspect_ax.set_aspect("equal", adjustable="box")
-        aspect_ax.axis("off")
-        ax._aspect_ax = aspect_ax
-    else:
-        aspect_ax = ax._aspect_ax
 
-    # Draw the chord
-    aspect_ax.plot([x1, x2], [y1, y2], color=color, lw=lw, alpha=alpha, zorder=5)
+def _chords(
+    lons1: Sequence[float], lons2: Sequence[float], aspect_r: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, 2, 2) chord segments on the overlay axis, and their (n, 2) midpoints."""
+    x1, y1 = _lon_to_xy_for_wheel(np.asarray(lons1, dtype=float), aspect_r)
+    x2, y2 = _lon_to_xy_for_wheel(np.asarray(lons2, dtype=float), aspect_r)
+    chords = np.stack([np.column_stack([x1, y1]), np.column_stack([x2, y2])], axis=1)
+    return chords, chords.mean(axis=1)
 
-    # --- Label at midpoint ---------------------------------
-    if label:
-        mx = (x1 + x2) / 2.0
-        my = (y1 + y2) / 2.0
 
-        aspect_ax.text(
-            mx,
-            my,
-            label,
-            ha="center",
-            va="center",
-            fontsize=label_fontsize,
-            color=label_color,
-            zorder=6,
-            bbox=dict(
-                boxstyle="round,pad=0.15",
-                fc="white",
-                ec="none",
-                alpha=0.8,
-            ),
-        )
+def _aspect_label(aspect_ax, x: float, y: float, label: str, color: str, fontsize):
+    return aspect_ax.text(
+        x,
+        y,
+        label,
+        ha="center",
+        va="center",
+        fontsize=fontsize,
+        color=color,
+        zorder=6,
+        bbox=dict(
+            boxstyle="round,pad=0.15",
+            fc="white",
+            ec="none",
+            alpha=0.8,
+        ),
+    )
 
 
-def get_planet_index_in_cluster(clusters, planet_name: str):
-    for cluster in clusters:
-        for i, item in enumerate(cluster):
-            if item["planet"] == planet_name:
-                return i
+def draw_aspect_line(
+    ax,
+    planet1,
+    planet2,
+    *,
+    color: str = "red",
+    label: str | None = None,
+    **kwargs,
+):
+    """Draw one aspect chord; see draw_aspect_lines."""
+    return draw_aspect_lines(
+        ax, [planet1.lon], [planet2.lon], colors=color, labels=[label], **kwargs
+    )
 
 
 def _rotate_lon(lon: float, asc_lon: float) -> float:
@@ -370,7 +452,8 @@ def _rotate_lon(lon: float, asc_lon: float) -> float:
 def rotate_chart_data_to_asc(astro_data: AstrologicalData) -> AstrologicalData:
     """
     Returns a deep-copied dict where all longitudes are rotated so ASC is 0°.
-    Adjust the places we iterate if your schema differs.
+    Adjust the places we iterate if your schema differs. The renderers use
+    RotatedChart, which reads the rotated longitudes without copying.
     """
     d = deepcopy(astro_data)
     asc_lon = d.houses.asc.lon
@@ -391,53 +474,237 @@ def rotate_chart_data_to_asc(astro_data: AstrologicalData) -> AstrologicalData:
     return d
 
 
+def _planet_styles(view: RotatedChart, shown: Sequence[str]):
+    """Colors (retrograde in red) and stacked glyph radii of the shown planets."""
+    bodies = view.data.planets.bodies
+    levels = stack_levels(view.body_names, view.body_lons)
+    colors = ["red" if bodies[p].motion == "RETRO" else "black" for p in shown]
+    return colors, [PLANET_GLYPH_R + levels[p] * PLANET_STACK_STEP for p in shown]
+
+
+def _aspect_styles(view: RotatedChart):
+    """Endpoint longitudes, colors and symbols of the drawn aspects."""
+    aspects = [a for a in view.data.aspects if a.aspect.name != "Conjunction"]
+    return (
+        view.lons([a.body1 for a in aspects]),
+        view.lons([a.body2 for a in aspects]),
+        ["blue" if a.aspect.name in ["Trine", "Sextile"] else "red" for a in aspects],
+        [a.aspect.symbol for a in aspects],
+    )
+
+
+class ChartLayers:
+    """
+    Markers, cusps, planets and aspects of a chart, rotated to its ASC, as
+    drawn on a wheel axis. update() moves them to another chart with the
+    same bodies and cusps in place: segments, positions, colors and texts
+    change, and aspect labels are only added when a chart has more aspects
+    than any before it.
+    """
+
+    def __init__(self, ax, view: RotatedChart):
+        self.ax = ax
+        self.aspect_ax = _aspect_axes(ax)
+        self.body_names = view.body_names
+        self.cusp_names = view.cusp_names
+        self.shown = [p for p in view.body_names if p not in HIDDEN_BODIES]
+
+        self.markers = draw_markers(ax, view.marker_lons, ["ASC", "MC"])
+        self.cusps = draw_cusps(ax, view.cusp_lons, view.cusp_names)
+        colors, glyph_r = _planet_styles(view, self.shown)
+        self.planets = draw_planets(
+            ax, view.lons(self.shown), self.shown, colors=colors, glyph_r=glyph_r
+        )
+        lons1, lons2, colors, labels = _aspect_styles(view)
+        self.aspects = draw_aspect_lines(
+            ax, lons1, lons2, colors=colors, labels=labels
+        )
+
+    def fits(self, view: RotatedChart) -> bool:
+        """Whether update() can move these layers to view's chart."""
+        return view.body_names == self.body_names and view.cusp_names == self.cusp_names
+
+    def update(self, view: RotatedChart):
+        lines, triangles, labels = self.markers
+        theta = _thetas(view.marker_lons)
+        lines.set_segments(_radial_segments(theta, WHEEL_INNER_R, WHEEL_OUTER_R))
+        triangles.set_verts(_marker_triangles(theta, WHEEL_OUTER_R))
+        for label, th in zip(labels, theta):
+            label.set_x(th)
+
+        lines, labels = self.cusps
+        theta = _thetas(view.cusp_lons)
+        lines.set_segments(_radial_segments(theta, 0.0, WHEEL_INNER_R))
+        for label, th in zip(labels, theta):
+            label.set_x(th)
+
+        lines, glyphs = self.planets
+        theta = _thetas(view.lons(self.shown))
+        colors, glyph_r = _planet_styles(view, self.shown)
+        lines.set_segments(_radial_segments(theta, WHEEL_OUTER_R, PLANET_LINE_R))
+        lines.set_color(colors)
+        for glyph, th, r, color in zip(glyphs, theta, glyph_r, colors):
+            glyph.set_position((th, r))
+            glyph.set_color(color)
+
+        lines, labels = self.aspects
+        lons1, lons2, colors, symbols = _aspect_styles(view)
+        chords, midpoints = _chords(lons1, lons2, ASPECT_R)
+        lines.set_segments(chords)
+        lines.set_color(colors)
+        while len(labels) < len(symbols):
+            labels.append(_aspect_label(self.aspect_ax, 0.0, 0.0, "", "black", 9))
+        for i, label in enumerate(labels):
+            shown = i < len(symbols) and bool(symbols[i])
+            label.set_visible(shown)
+            if shown:
+                label.set_position(midpoints[i])
+                label.set_text(symbols[i])
+
+    def artists(self) -> Tuple[list, list]:
+        """The artists on the wheel axis and on its aspect overlay, in draw order."""
+        markers = [self.markers[0], self.markers[1], *self.markers[2]]
+        cusps = [self.cusps[0], *self.cusps[1]]
+        planets = [self.planets[0], *self.planets[1]]
+        return [*markers, *cusps, *planets], [self.aspects[0], *self.aspects[1]]
+
+    def remove(self):
+        for artists in self.artists():
+            for artist in artists:
+                artist.remove()
+
+
+@traced("render.draw")
 def render_astrological_chart(
     data: AstrologicalData,
     title: str = "Astrological Chart",
+    figsize: Tuple[float, float] = (8, 8),
+    dpi: Optional[float] = None,
 ):
-    # Rotate the wheel so rising is now 0° and rotate the chart data to align
-    rotated_data = rotate_chart_data_to_asc(data)
-
-    rotated_rising = rotated_data.houses.asc
-    rotated_midheaven = rotated_data.houses.mc
-
+    """
+    The chart as a matplotlib Figure on an Agg canvas, independent of pyplot:
+    save it with fig.savefig(), or display it where figures are shown.
+    """
     fig, ax = render_zodiac_wheel(
         title=title,
         asc_lon=data.houses.asc.lon,
+        figsize=figsize,
+        dpi=dpi,
     )
+    # the wheel is rotated so rising is at 0°; the view rotates the chart to match
+    ChartLayers(ax, RotatedChart(data))
+    return fig
 
-    draw_marker(ax, rotated_rising, "ASC", inner_r=0.72, outer_r=1.0)
-    draw_marker(ax, rotated_midheaven, "MC", inner_r=0.72, outer_r=1.0)
-    for house in rotated_data.houses.cusps.keys():
-        draw_cusp(ax, rotated_data.houses.cusps[house], house)
 
-    planetary_clusters = cluster_by_longitude(
-        planet_names=list(rotated_data.planets.bodies.keys()),
-        planets=list(rotated_data.planets.bodies.values()),
-    )
+def render_to_bytes(
+    data: AstrologicalData,
+    fmt: str = "png",
+    title: str = "Astrological Chart",
+    figsize: Tuple[float, float] = (8, 8),
+    dpi: Optional[float] = None,
+) -> bytes:
+    """
+    The chart as an image file (any savefig format: png, svg, pdf, ...).
+    Every call has its own figure, so threads can render concurrently.
+    """
+    fig = render_astrological_chart(data, title, figsize=figsize, dpi=dpi)
+    buf = io.BytesIO()
+    with span("render.encode", format=fmt):
+        fig.savefig(buf, format=fmt)
+    return buf.getvalue()
 
-    for planet in rotated_data.planets.bodies.keys():
-        if planet not in ["Mean N.Node", "Mean S.Node"]:
-            planet_index_in_cluster = get_planet_index_in_cluster(
-                planetary_clusters, planet
-            )
 
-            draw_planet(
-                ax,
-                rotated_data.planets.bodies[planet],
-                planet,
-                color=f"{'red' if rotated_data.planets.bodies[planet].motion == 'RETRO' else 'black'}",
-                glyph_r=1.18 + planet_index_in_cluster * 0.05,
-            )
+class _WheelTemplate:
+    """
+    One figure with the wheel set up, plus an Agg snapshot of everything that
+    does not depend on the chart: background, rings and title. The chart
+    layers are drawn once and moved to each next chart in place.
+    """
 
-    for aspect in rotated_data.aspects:
-        if aspect.aspect.name != "Conjunction":
-            draw_aspect_line(
-                ax,
-                rotated_data.planets.bodies[aspect.body1],
-                rotated_data.planets.bodies[aspect.body2],
-                color=f"{'blue' if aspect.aspect.name in ['Trine', 'Sextile'] else 'red'}",
-                label=aspect.aspect.symbol,
-            )
+    def __init__(self, figsize: Tuple[float, float], dpi: float, title: str):
+        self.fig = _new_figure(figsize, dpi)
+        self.ax = self.fig.add_subplot(111, projection="polar")
+        _setup_wheel_axes(self.ax, title)
+        self.boundaries, self.glyphs = _draw_sign_ring(self.ax, 0.0)
+        self.fig.tight_layout()
+        self.aspect_ax = _aspect_axes(self.ax)
+
+        rotating = [self.boundaries, *self.glyphs]
+        for artist in rotating:
+            artist.set_visible(False)
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in rotating:
+            artist.set_visible(True)
+        self.layers: Optional[ChartLayers] = None
+
+    def update(self, data: AstrologicalData) -> ChartLayers:
+        """Move the sign ring and the chart layers to data's chart."""
+        _rotate_sign_ring(self.boundaries, self.glyphs, data.houses.asc.lon)
+        view = RotatedChart(data)
+        if self.layers is not None and self.layers.fits(view):
+            self.layers.update(view)
+        else:
+            if self.layers is not None:
+                self.layers.remove()
+            self.layers = ChartLayers(self.ax, view)
+        return self.layers
+
+    @traced("render.wheel")
+    def render(self, data: AstrologicalData, overlay: Sequence = ()) -> np.ndarray:
+        """
+        RGBA pixels (height, width, 4) of the chart on this wheel, with the
+        overlay artists of the wheel axis drawn on top.
+        """
+        on_wheel, on_aspects = self.update(data).artists()
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        # the order a full draw would use: axes in order, artists by zorder
+        layers = [
+            [self.boundaries, *self.glyphs, *on_wheel, *overlay],
+            on_aspects,
+        ]
+        for artists in layers:
+            for artist in sorted(artists, key=lambda a: a.get_zorder()):
+                if artist.get_visible():
+                    artist.axes.draw_artist(artist)
+        return np.array(canvas.buffer_rgba())
+
+
+class WheelCache:
+    """
+    Bulk chart rendering on a cached wheel. The sign ring is set up and its
+    static part rasterized once per (title, figsize, dpi) and thread; each
+    chart then only rotates the sign boundaries and glyphs, moves the chart
+    layers of the previous one (see ChartLayers) and draws them on top of
+    the cached pixels, with the same result as render_astrological_chart.
+    """
 
-    return fig
+    def __init__(self, figsize: Tuple[float, float] = (8, 8), dpi: float = 100):
+        self.figsize = figsize
+        self.dpi = dpi
+        self._local = threading.local()
+
+    def _template(self, title: str) -> _WheelTemplate:
+        templates: Dict[str, _WheelTemplate] = self._local.__dict__.setdefault(
+            "templates", {}
+        )
+        template = templates.get(title)
+        if template is None:
+            template = templates[title] = _WheelTemplate(self.figsize, self.dpi, title)
+        return template
+
+    def render_rgba(
+        self, data: AstrologicalData, title: str = "Astrological Chart"
+    ) -> np.ndarray:
+        return self._template(title).render(data)
+
+    def render(
+        self, data: AstrologicalData, title: str = "Astrological Chart"
+    ) -> bytes:
+        """PNG bytes of the chart."""
+        rgba = self.render_rgba(data, title)
+        buf = io.BytesIO()
+        with span("render.encode", format="png"):
+            mpl_image.imsave(buf, rgba, format="png", dpi=self.dpi)
+        return buf.getvalue()
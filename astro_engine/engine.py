@@ -0,0 +1,1057 @@
+"""
+In-process chart engine.
+
+Computes the same AstrologicalData as the swecli binary, directly from the
+bundled .se1 ephemeris files:
+
+  - apparent geocentric positions (light-time, light deflection, annual
+    aberration, IAU 2006 precession, IAU 1980 nutation), tropical ecliptic of date
+  - true and mean lunar nodes
+  - ASC, MC and house cusps for every HouseSystem
+  - major aspects with the binary's orbs and APPLY/SEPAR phase
+
+All astronomy is written on NumPy arrays, so the same functions evaluate one
+chart or a whole batch of times.
+"""
+
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from astro_engine.aspects import DEFAULT_POLICY, AspectPolicy, find_aspects
+from astro_engine.batch import STATION_THRESHOLD, ChartBatch, motion_codes
+from astro_engine.ephemeris import (
+    EARTH,
+    SEI_JUPITER,
+    SEI_MARS,
+    SEI_MERCURY,
+    SEI_MOON,
+    SEI_NEPTUNE,
+    SEI_PLUTO,
+    SEI_SATURN,
+    SEI_SUNBARY,
+    SEI_URANUS,
+    SEI_VENUS,
+    Ephemeris,
+    load_ephemeris,
+)
+from astro_engine.instrument import span
+from astro_engine.localtime import (
+    Ambiguous,
+    Nonexistent,
+    format_moments,
+    julian_days,
+    local_to_utc,
+    parse_local_datetimes,
+    utc_to_local,
+)
+from astro_engine.models import AstrologicalData, HouseSystem
+
+J2000 = 2451545.0
+DAYS_PER_CENTURY = 36525.0
+ARCSEC = np.pi / (180.0 * 3600.0)
+
+C_AU_PER_DAY = 173.1446326846693
+# 2 * GM(sun) / c^2, in AU (gravitational light deflection)
+SUN_SCHWARZSCHILD_AU = 1.97412574336e-08
+# G * (M_earth + M_moon), AU^3/day^2
+GM_EARTH_MOON = 8.997011390199871e-10
+MEAN_MOON_DISTANCE_AU = 0.0025695552898
+
+SPEED_STEP_DAYS = 0.001
+
+# Bump when a change alters computed charts; part of cached results' keys
+ENGINE_VERSION = "2"
+
+# Bodies in the order the binary writes them
+PLANETS: Dict[str, int] = {
+    "Sun": SEI_SUNBARY,
+    "Moon": SEI_MOON,
+    "Mercury": SEI_MERCURY,
+    "Venus": SEI_VENUS,
+    "Mars": SEI_MARS,
+    "Jupiter": SEI_JUPITER,
+    "Saturn": SEI_SATURN,
+    "Uranus": SEI_URANUS,
+    "Neptune": SEI_NEPTUNE,
+    "Pluto": SEI_PLUTO,
+}
+
+# ---------- Time ----------
+
+# Delta T as swe_deltat computes it (Swiss Ephemeris 2.10, default model).
+#
+# Before 1955: the spline of Stephenson, Morrison & Hohenkerk (2016), with
+# their parabola outside it. Rows are (start, end, a0, a1, a2, a3) with start
+# and end as Julian days; within a row Delta T = a0 + a1 t + a2 t^2 + a3 t^3,
+# t running from 0 to 1.
+_SMH2016_SPLINE = np.array(
+    [
+        [1458085.5, 1867156.5, 20550.593, -21268.478, 11863.418, -4541.129],
+        [1867156.5, 2086302.5, 6604.404, -5981.266, -505.093, 1349.609],
+        [2086302.5, 2268923.5, 1467.654, -2452.187, 2460.927, -1183.759],
+        [2268923.5, 2305447.5, 292.635, -216.322, -43.614, 56.681],
+        [2305447.5, 2323710.5, 89.38, -66.754, 31.607, -10.497],
+        [2323710.5, 2349276.5, 43.736, -49.043, 0.227, 15.811],
+        [2349276.5, 2378496.5, 10.73, -1.321, 62.25, -52.946],
+        [2378496.5, 2382148.5, 18.714, -4.457, -1.509, 2.507],
+        [2382148.5, 2385800.5, 15.255, 0.046, 6.012, -4.634],
+        [2385800.5, 2389453.5, 16.679, -1.831, -7.889, 3.799],
+        [2389453.5, 2393105.5, 10.758, -6.211, 3.509, -0.388],
+        [2393105.5, 2396758.5, 7.668, -0.357, 2.345, -0.338],
+        [2396758.5, 2398584.5, 9.317, 1.659, 0.332, -0.932],
+        [2398584.5, 2400410.5, 10.376, -0.472, -2.463, 1.596],
+        [2400410.5, 2402237.5, 9.038, -0.61, 2.325, -2.497],
+        [2402237.5, 2404063.5, 8.256, -3.45, -5.166, 2.729],
+        [2404063.5, 2405889.5, 2.369, -5.596, 3.02, -0.919],
+        [2405889.5, 2407715.5, -1.126, -2.312, 0.264, -0.037],
+        [2407715.5, 2409542.5, -3.211, -1.894, 0.154, 0.562],
+        [2409542.5, 2411368.5, -4.388, 0.101, 1.841, -1.438],
+        [2411368.5, 2413194.5, -3.884, -0.531, -2.473, 1.87],
+        [2413194.5, 2415020.5, -5.017, 0.134, 3.138, -0.232],
+        [2415020.5, 2416846.5, -1.977, 5.715, 2.443, -1.257],
+        [2416846.5, 2418672.5, 4.923, 6.828, -1.329, 0.72],
+        [2418672.5, 2420498.5, 11.142, 6.33, 0.831, -0.825],
+        [2420498.5, 2422324.5, 17.479, 5.518, -1.643, 0.262],
+        [2422324.5, 2424151.5, 21.617, 3.02, -0.856, 0.008],
+        [2424151.5, 2425977.5, 23.789, 1.333, -0.831, 0.127],
+        [2425977.5, 2427803.5, 24.418, 0.052, -0.449, 0.142],
+        [2427803.5, 2429629.5, 24.164, -0.419, -0.022, 0.702],
+        [2429629.5, 2431456.5, 24.426, 1.645, 2.086, -1.106],
+        [2431456.5, 2433282.5, 27.05, 2.499, -1.232, 0.614],
+        [2433282.5, 2434378.5, 28.932, 1.127, 0.22, -0.277],
+        [2434378.5, 2435473.5, 30.002, 0.737, -0.61, 0.631],
+        [2435473.5, 2436569.5, 30.76, 1.409, 1.282, -0.799],
+        [2436569.5, 2437665.5, 32.652, 1.577, -1.115, 0.507],
+        [2437665.5, 2438761.5, 33.621, 0.868, 0.406, 0.199],
+        [2438761.5, 2439856.5, 35.093, 2.275, 1.002, -0.414],
+        [2439856.5, 2440952.5, 37.956, 3.035, -0.242, 0.202],
+        [2440952.5, 2442048.5, 40.951, 3.157, 0.364, -0.229],
+        [2442048.5, 2443144.5, 44.244, 3.198, -0.323, 0.172],
+        [2443144.5, 2444239.5, 47.291, 3.069, 0.193, -0.192],
+        [2444239.5, 2445335.5, 50.361, 2.878, -0.384, 0.081],
+        [2445335.5, 2446431.5, 52.936, 2.354, -0.14, -0.166],
+        [2446431.5, 2447527.5, 54.984, 1.577, -0.637, 0.448],
+        [2447527.5, 2448622.5, 56.373, 1.649, 0.709, -0.277],
+        [2448622.5, 2449718.5, 58.453, 2.235, -0.122, 0.111],
+        [2449718.5, 2450814.5, 60.677, 2.324, 0.212, -0.315],
+        [2450814.5, 2451910.5, 62.899, 1.804, -0.732, 0.112],
+        [2451910.5, 2453005.5, 64.082, 0.675, -0.396, 0.193],
+        [2453005.5, 2454101.5, 64.555, 0.463, 0.184, -0.008],
+        [2454101.5, 2455197.5, 65.194, 0.809, 0.161, -0.101],
+        [2455197.5, 2456293.5, 66.063, 0.828, -0.142, 0.168],
+        [2456293.5, 2457388.5, 66.917, 1.046, 0.36, -0.282],
+    ]
+)
+# The spline values assume a lunar tidal acceleration of -25.85"/cy^2; the
+# .se1 files (JPL DE431) have -25.8
+_SMH2016_TIDAL_ACCELERATION = -25.85
+_EPHEMERIS_TIDAL_ACCELERATION = -25.8
+_SPLINE_END_JD = 2435108.5  # 1955-01-01, where the yearly table takes over
+_SPLINE_BLEND_DAYS = 1000.0
+_SPLINE_BLEND_SECONDS = 0.6610218
+
+# From 1955: observed Delta T (seconds) at the start of each year, from
+# _DELTA_T_START on, with swe_deltat's Bessel interpolation
+_DELTA_T_START = 1953
+_DELTA_T_TABLE = np.array(
+    [
+        30.36, 30.72, 31.07, 31.35, 31.68, 32.18, 32.68, 33.15, 33.59, 34.0, 34.47,
+        35.03, 35.73, 36.54, 37.43, 38.29, 39.2, 40.18, 41.17, 42.23, 43.37, 44.4841,
+        45.4761, 46.4567, 47.5214, 48.5344, 49.5862, 50.5387, 51.3808, 52.1668, 52.9565,
+        53.7882, 54.3427, 54.8713, 55.3222, 55.8197, 56.3, 56.8553, 57.5653, 58.3092,
+        59.1218, 59.9845, 60.7854, 61.6287, 62.2951, 62.9659, 63.4673, 63.8285, 64.0908,
+        64.2998, 64.4734, 64.5736, 64.6876, 64.8452, 65.1464, 65.4574, 65.7768, 66.0699,
+        66.3246, 66.603, 66.9069, 67.281, 67.6439, 68.1024, 68.5927, 68.9676, 69.2202,
+        69.3612, 69.3593, 69.2945, 69.1833, 69.1, 69.0, 68.9, 68.8, 68.8,
+    ]
+)
+_DELTA_T_END = _DELTA_T_START + _DELTA_T_TABLE.size - 1
+# After the table the Stephenson et al. (2016) cubic until 2500, reached
+# from the last observed value over a century, then their parabola
+_FUTURE_CUBIC_END = 2500.0
+_FUTURE_BLEND_YEARS = 100.0
+
+
+def _smh2016_parabola(year: np.ndarray) -> np.ndarray:
+    u = (year - 1825.0) / 100.0
+    return -320.0 + 32.5 * u * u
+
+
+def _delta_t_spline(jd_ut: np.ndarray) -> np.ndarray:
+    spline = _SMH2016_SPLINE
+    year = 2000.0 + (jd_ut - J2000) / 365.2425
+    row = np.searchsorted(spline[:, 0], jd_ut, "right") - 1
+    row = np.clip(row, 0, len(spline) - 1)
+    start, end, a0, a1, a2, a3 = spline[row].T
+    t = (jd_ut - start) / (end - start)
+    result = a0 + t * (a1 + t * (a2 + t * a3))
+    # the parabola is shifted to join the spline at both ends
+    parabola = _smh2016_parabola(year)
+    result = np.where(jd_ut < spline[0, 0], parabola - 179.7337208, result)
+    result = np.where(jd_ut >= spline[-1, 1], parabola + 269.4790417, result)
+    # the ephemeris' Moon needs the Delta T of its own tidal acceleration
+    tidal = _EPHEMERIS_TIDAL_ACCELERATION - _SMH2016_TIDAL_ACCELERATION
+    result -= 0.000091 * tidal * (year - 1955.0) ** 2
+    # the last few years slide towards the table
+    blend = 1.0 - (_SPLINE_END_JD - jd_ut) / _SPLINE_BLEND_DAYS
+    return result + np.clip(blend, 0.0, None) * _SPLINE_BLEND_SECONDS
+
+
+def _delta_t_table(year: np.ndarray) -> np.ndarray:
+    table = _DELTA_T_TABLE
+    n = table.size
+    whole = np.floor(year)
+    p = year - whole
+    i = (whole - _DELTA_T_START).astype(int)
+    # first differences, zero past the end of the table
+    diffs = np.append(np.diff(table), [0.0, 0.0])
+    result = table[i] + p * diffs[i]
+    # Bessel's interpolation, up to fourth differences
+    d1 = np.stack([diffs[np.minimum(i + k, n)] for k in range(-2, 3)])
+    d2 = np.diff(d1, axis=0)
+    d3 = np.diff(d2, axis=0)
+    d4 = np.diff(d3, axis=0)
+    b2 = 0.25 * p * (p - 1.0)
+    b3 = 2.0 * b2 / 3.0
+    b4 = 0.125 * b3 * (p + 1.0) * (p - 2.0)
+    higher = b2 * (d2[1] + d2[2]) + (p - 0.5) * b3 * d3[1] + b4 * (d4[0] + d4[1])
+    # near the end there are not enough differences
+    return result + np.where(i <= n - 3, higher, 0.0)
+
+
+def _future_cubic(year):
+    b = year - 2000.0
+    return b * b * b * 121.0 / 30000000.0 + b * b / 1250.0 + b * 521.0 / 3000.0 + 64.0
+
+
+def _delta_t_future(year: np.ndarray) -> np.ndarray:
+    cubic = _future_cubic(year)
+    # the cubic misses the last observed value; the gap closes over a century
+    gap = _future_cubic(float(_DELTA_T_END)) - _DELTA_T_TABLE[-1]
+    remaining = np.clip(_DELTA_T_END + _FUTURE_BLEND_YEARS - year, 0.0, None)
+    cubic -= gap * remaining / _FUTURE_BLEND_YEARS
+    b = (year - 2000.0) / 100.0
+    return np.where(year < _FUTURE_CUBIC_END, cubic, 42.5 + 32.5 * b * b)
+
+
+def delta_t(jd_ut: np.ndarray) -> np.ndarray:
+    """
+    TT - UT in seconds, as swe_deltat computes it for the bundled ephemeris:
+    the Stephenson, Morrison & Hohenkerk (2016) spline before 1955, observed
+    yearly values until 2028, and their polynomials after that.
+    """
+    jd_ut = np.asarray(jd_ut, dtype=float)
+    year = 2000.0 + (jd_ut - (J2000 - 0.5)) / 365.25
+    past = jd_ut < _SPLINE_END_JD
+    future = year > _DELTA_T_END
+    table = np.clip(year, _DELTA_T_START + 2, _DELTA_T_END)
+    result = np.where(past, 0.0, _delta_t_table(table))
+    if past.any():
+        result = np.where(past, _delta_t_spline(jd_ut), result)
+    if future.any():
+        result = np.where(future, _delta_t_future(year), result)
+    return result
+
+
+def julian_day(moment: datetime) -> float:
+    """Julian day of a naive (proleptic Gregorian) date and time."""
+    day_fraction = (
+        moment.hour * 3600
+        + moment.minute * 60
+        + moment.second
+        + moment.microsecond / 1e6
+    ) / 86400.0
+    return moment.toordinal() + 1721424.5 + day_fraction
+
+
+def _format_moment(moment: datetime) -> str:
+    seconds = moment.second + moment.microsecond / 1e6
+    return (
+        f"{moment.year:04d}-{moment.month:02d}-{moment.day:02d} "
+        f"{moment.hour:02d}:{moment.minute:02d}:{seconds:06.3f}"
+    )
+
+
+# ---------- Precession and nutation ----------
+
+
+def _centuries(jd_tt: np.ndarray) -> np.ndarray:
+    return (np.asarray(jd_tt, dtype=float) - J2000) / DAYS_PER_CENTURY
+
+
+def mean_obliquity(jd_tt: np.ndarray) -> np.ndarray:
+    """Mean obliquity of the ecliptic (IAU 2006), radians."""
+    t = _centuries(jd_tt)
+    eps = 84381.406 + t * (
+        -46.836769
+        + t * (-0.0001831 + t * (0.00200340 + t * (-0.000000576 - 0.0000000434 * t)))
+    )
+    return eps * ARCSEC
+
+
+# Largest terms of the IAU 1980 nutation series:
+# multipliers of D, M, M', F, Omega; dpsi (A + B t), deps (C + D t) in 0.0001"
+_NUTATION_TERMS = np.array(
+    [
+        [0, 0, 0, 0, 1, -171996, -174.2, 92025, 8.9],
+        [-2, 0, 0, 2, 2, -13187, -1.6, 5736, -3.1],
+        [0, 0, 0, 2, 2, -2274, -0.2, 977, -0.5],
+        [0, 0, 0, 0, 2, 2062, 0.2, -895, 0.5],
+        [0, 1, 0, 0, 0, 1426, -3.4, 54, -0.1],
+        [0, 0, 1, 0, 0, 712, 0.1, -7, 0],
+        [-2, 1, 0, 2, 2, -517, 1.2, 224, -0.6],
+        [0, 0, 0, 2, 1, -386, -0.4, 200, 0],
+        [0, 0, 1, 2, 2, -301, 0, 129, -0.1],
+        [-2, -1, 0, 2, 2, 217, -0.5, -95, 0.3],
+        [-2, 0, 1, 0, 0, -158, 0, 0, 0],
+        [-2, 0, 0, 2, 1, 129, 0.1, -70, 0],
+        [0, 0, -1, 2, 2, 123, 0, -53, 0],
+        [2, 0, 0, 0, 0, 63, 0, 0, 0],
+        [0, 0, 1, 0, 1, 63, 0.1, -33, 0],
+        [2, 0, -1, 2, 2, -59, 0, 26, 0],
+        [0, 0, -1, 0, 1, -58, -0.1, 32, 0],
+        [0, 0, 1, 2, 1, -51, 0, 27, 0],
+        [-2, 0, 2, 0, 0, 48, 0, 0, 0],
+        [0, 0, -2, 2, 1, 46, 0, -24, 0],
+        [2, 0, 0, 2, 2, -38, 0, 16, 0],
+        [0, 0, 2, 2, 2, -31, 0, 13, 0],
+        [0, 0, 2, 0, 0, 29, 0, 0, 0],
+        [-2, 0, 1, 2, 2, 29, 0, -12, 0],
+        [0, 0, 0, 2, 0, 26, 0, 0, 0],
+        [-2, 0, 0, 2, 0, -22, 0, 0, 0],
+        [0, 0, -1, 2, 1, 21, 0, -10, 0],
+        [0, 2, 0, 0, 0, 17, -0.1, 0, 0],
+        [2, 0, -1, 0, 1, 16, 0, -8, 0],
+        [-2, 2, 0, 2, 2, -16, 0.1, 7, 0],
+        [0, 1, 0, 0, 1, -15, 0, 9, 0],
+        [-2, 0, 1, 0, 1, -13, 0, 7, 0],
+        [0, -1, 0, 0, 1, -12, 0, 6, 0],
+        [0, 0, 2, -2, 0, 11, 0, 0, 0],
+        [2, 0, -1, 2, 1, -10, 0, 5, 0],
+        [2, 0, 1, 2, 2, -8, 0, 3, 0],
+        [0, 1, 0, 2, 2, 7, 0, -3, 0],
+        [-2, 1, 1, 0, 0, -7, 0, 0, 0],
+        [0, -1, 0, 2, 2, -7, 0, 3, 0],
+        [2, 0, 0, 2, 1, -7, 0, 3, 0],
+        [2, 0, 1, 0, 0, 6, 0, 0, 0],
+        [-2, 0, 2, 2, 2, 6, 0, -3, 0],
+        [-2, 0, 1, 2, 1, 6, 0, -3, 0],
+        [2, 0, -2, 0, 1, -6, 0, 3, 0],
+        [2, 0, 0, 0, 1, -6, 0, 3, 0],
+    ]
+)
+
+
+def nutation(jd_tt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Nutation in longitude and in obliquity, radians."""
+    t = np.atleast_1d(_centuries(jd_tt))
+    d = 297.85036 + t * (445267.111480 + t * (-0.0019142 + t / 189474.0))
+    m = 357.52772 + t * (35999.050340 + t * (-0.0001603 - t / 300000.0))
+    mp = 134.96298 + t * (477198.867398 + t * (0.0086972 + t / 56250.0))
+    f = 93.27191 + t * (483202.017538 + t * (-0.0036825 + t / 327270.0))
+    om = 125.04452 + t * (-1934.136261 + t * (0.0020708 + t / 450000.0))
+    fundamental = np.deg2rad(np.stack([d, m, mp, f, om], axis=-1))
+
+    terms = _NUTATION_TERMS
+    arg = fundamental @ terms[:, :5].T
+    dpsi = np.sum((terms[:, 5] + terms[:, 6] * t[:, None]) * np.sin(arg), axis=-1)
+    deps = np.sum((terms[:, 7] + terms[:, 8] * t[:, None]) * np.cos(arg), axis=-1)
+    return dpsi * 1e-4 * ARCSEC, deps * 1e-4 * ARCSEC
+
+
+def _precession_angles(jd_tt: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Ecliptic precession angles p_A, pi_A, Pi_A (Capitaine et al. 2003), radians."""
+    t = _centuries(jd_tt)
+    p = t * (
+        5028.796195
+        + t * (1.1054348 + t * (0.00007964 + t * (-0.000023857 - 0.0000000383 * t)))
+    )
+    pi = t * (
+        46.998973
+        + t * (-0.0334926 + t * (-0.00012559 + t * (0.000000113 - 0.0000000022 * t)))
+    )
+    big_pi = 629546.7936 + t * (
+        -867.95758
+        + t * (0.157992 + t * (-0.0005371 + t * (-0.00004797 + 0.000000072 * t)))
+    )
+    return p * ARCSEC, pi * ARCSEC, big_pi * ARCSEC
+
+
+def equatorial_j2000_to_ecliptic_of_date(
+    xyz: np.ndarray, jd_tt: np.ndarray, dpsi: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    J2000 equatorial vectors (n, 3) -> true ecliptic longitude, latitude
+    (degrees) and distance.
+    """
+    ceps, seps = np.cos(_EPS_J2000), np.sin(_EPS_J2000)
+    x = xyz[:, 0]
+    y = ceps * xyz[:, 1] + seps * xyz[:, 2]
+    z = -seps * xyz[:, 1] + ceps * xyz[:, 2]
+    dist = np.sqrt(x * x + y * y + z * z)
+    lon0 = np.arctan2(y, x)
+    lat0 = np.arcsin(z / dist)
+
+    p, pi, big_pi = _precession_angles(jd_tt)
+    a = np.cos(pi) * np.cos(lat0) * np.sin(big_pi - lon0) - np.sin(pi) * np.sin(lat0)
+    b = np.cos(lat0) * np.cos(big_pi - lon0)
+    c = np.cos(pi) * np.sin(lat0) + np.sin(pi) * np.cos(lat0) * np.sin(big_pi - lon0)
+    lon = p + big_pi - np.arctan2(a, b) + dpsi
+    lat = np.arcsin(np.clip(c, -1.0, 1.0))
+    return np.rad2deg(lon) % 360.0, np.rad2deg(lat), dist
+
+
+_EPS_J2000 = 84381.406 * ARCSEC
+
+
+# ---------- Apparent positions ----------
+
+
+def _unit(v: np.ndarray) -> np.ndarray:
+    return v / np.linalg.norm(v, axis=-1, keepdims=True)
+
+
+def _aberration(u: np.ndarray, earth_vel: np.ndarray) -> np.ndarray:
+    """Relativistic annual aberration of unit vectors u."""
+    v = earth_vel / C_AU_PER_DAY
+    beta_inv = np.sqrt(1.0 - np.sum(v * v, axis=-1, keepdims=True))
+    f1 = np.sum(u * v, axis=-1, keepdims=True)
+    f2 = 1.0 + f1 / (1.0 + beta_inv)
+    return (beta_inv * u + f2 * v) / (1.0 + f1)
+
+
+def _deflection(u: np.ndarray, q: np.ndarray, e: np.ndarray, e_dist) -> np.ndarray:
+    """Light deflection by the Sun (u: observer->body, q: sun->body, e: sun->observer)."""
+    g1 = SUN_SCHWARZSCHILD_AU / e_dist
+    uq = np.sum(u * q, axis=-1, keepdims=True)
+    eu = np.sum(e * u, axis=-1, keepdims=True)
+    qe = np.sum(q * e, axis=-1, keepdims=True)
+    return u + g1 * (uq * e - eu * q) / (1.0 + qe)
+
+
+def apparent_geocentric(
+    ephem: Ephemeris,
+    ipl: int,
+    jd_tt: np.ndarray,
+    earth: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    sun: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apparent geocentric direction (unit vectors, J2000 equator) and
+    light-time corrected distance of a body. ipl SEI_SUNBARY means the Sun.
+    `earth` may carry the barycentric Earth (position, velocity) and `sun` the
+    barycentric Sun position at jd_tt when several bodies are computed for
+    the same times.
+    """
+    earth_pos, earth_vel = earth or ephem.barycentric(EARTH, jd_tt)
+
+    # light-time
+    pos, _ = ephem.barycentric(ipl, jd_tt, velocity=False)
+    for _ in range(2):
+        tau = np.linalg.norm(pos - earth_pos, axis=-1) / C_AU_PER_DAY
+        pos, _ = ephem.barycentric(ipl, jd_tt - tau, velocity=False)
+    dist = np.linalg.norm(pos - earth_pos, axis=-1)
+    u = _unit(pos - earth_pos)
+
+    if ipl not in (SEI_SUNBARY, SEI_MOON):
+        sun_then, _ = ephem.barycentric(SEI_SUNBARY, jd_tt - tau, velocity=False)
+        if sun is None:
+            sun, _ = ephem.barycentric(SEI_SUNBARY, jd_tt, velocity=False)
+        e = earth_pos - sun
+        e_dist = np.linalg.norm(e, axis=-1, keepdims=True)
+        u = _unit(_deflection(u, _unit(pos - sun_then), e / e_dist, e_dist))
+
+    u = _aberration(u, earth_vel)
+    return u, dist
+
+
+def _with_speed(jd_tt: np.ndarray) -> np.ndarray:
+    """Stack [t - h, t, t + h] so speeds come from one vectorized evaluation."""
+    jd_tt = np.atleast_1d(np.asarray(jd_tt, dtype=float))
+    return np.concatenate([jd_tt - SPEED_STEP_DAYS, jd_tt, jd_tt + SPEED_STEP_DAYS])
+
+
+def _split_speed(values: np.ndarray, n: int, angular: bool = False):
+    before, now, after = values[:n], values[n : 2 * n], values[2 * n :]
+    delta = after - before
+    if angular:
+        delta = (delta + 180.0) % 360.0 - 180.0
+    return now, delta / (2 * SPEED_STEP_DAYS)
+
+
+def planet_positions(
+    ephem: Ephemeris, jd_tt: np.ndarray, names: Optional[List[str]] = None
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Apparent tropical positions of the planets at each jd_tt.
+    Returns {name: {"lon", "lat", "dist", "speed"}} of arrays.
+    """
+    jd_tt = np.atleast_1d(np.asarray(jd_tt, dtype=float))
+    n = jd_tt.size
+    times = _with_speed(jd_tt)
+    dpsi, _ = nutation(times)
+    earth = ephem.barycentric(EARTH, times)
+    sun, _ = ephem.barycentric(SEI_SUNBARY, times, velocity=False)
+
+    result = {}
+    for name in names or list(PLANETS):
+        u, dist = apparent_geocentric(ephem, PLANETS[name], times, earth, sun)
+        lon, lat, _ = equatorial_j2000_to_ecliptic_of_date(u, times, dpsi)
+        lon, speed = _split_speed(lon, n, angular=True)
+        result[name] = {
+            "lon": lon,
+            "lat": lat[n : 2 * n],
+            "dist": dist[n : 2 * n],
+            "speed": speed,
+        }
+    return result
+
+
+# ---------- Lunar nodes ----------
+
+
+def mean_node(jd_tt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean ascending node of the Moon, true equinox of date: (lon, speed)."""
+    times = _with_speed(jd_tt)
+    t = _centuries(times)
+    om = 125.0445479 + t * (
+        -1934.1362891 + t * (0.0020754 + t * (1.0 / 467441.0 - t / 60616000.0))
+    )
+    dpsi, _ = nutation(times)
+    lon = (om + np.rad2deg(dpsi)) % 360.0
+    return _split_speed(lon, np.atleast_1d(jd_tt).size, angular=True)
+
+
+def true_node(
+    ephem: Ephemeris, jd_tt: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Osculating (true) ascending node of the lunar orbit, true equinox of date:
+    (lon, dist, speed). The distance is the radius of the osculating ellipse
+    at the node.
+    """
+    times = _with_speed(jd_tt)
+    n = np.atleast_1d(jd_tt).size
+    moon, moon_vel = ephem.raw(SEI_MOON, times)
+
+    # orbital elements from the J2000 state vector, then the angular momentum
+    # and eccentricity vectors rotated into the ecliptic of date
+    h = np.cross(moon, moon_vel)
+    ecc = np.cross(moon_vel, h) / GM_EARTH_MOON - _unit(moon)
+    p = np.sum(h * h, axis=-1) / GM_EARTH_MOON
+    dpsi, _ = nutation(times)
+    h_lon, _, _ = equatorial_j2000_to_ecliptic_of_date(h, times, dpsi)
+    node_lon = (h_lon + 90.0) % 360.0
+
+    # radius of the osculating ellipse at the node
+    e_lon, e_lat, e_norm = equatorial_j2000_to_ecliptic_of_date(ecc, times, dpsi)
+    e_along_node = e_norm * np.cos(np.deg2rad(e_lat)) * np.cos(
+        np.deg2rad(e_lon - node_lon)
+    )
+    node_dist = p / (1.0 + e_along_node)
+
+    node_lon, speed = _split_speed(node_lon, n, angular=True)
+    return node_lon, node_dist[n : 2 * n], speed
+
+
+# ---------- Houses ----------
+
+
+# Outside these dates (UT) swe_sidtime uses its long-term model, offset to
+# join the IERS 2010 expression at each end (degrees)
+_SIDEREAL_LONG_TERM_START = 2396758.5  # 1850-01-01
+_SIDEREAL_LONG_TERM_END = 2469807.5  # 2050-01-01
+_SIDEREAL_LONG_TERM_OFFSETS = (0.000378172, 0.001385646)
+
+
+def _sidereal_time_long_term(jd_ut: np.ndarray, jd_tt: np.ndarray) -> np.ndarray:
+    """
+    Greenwich mean sidereal time in degrees, as sidtime_long_term() in
+    swephlib.c: the mean Earth of Simon et al. (1994), seen one light time
+    late and precessed to the ecliptic of date, plus the hour angle.
+    """
+    t = (jd_tt - J2000) / (10.0 * DAYS_PER_CENTURY)
+    lon = 100.46645683 + t * (1295977422.83429 + t * (-2.04411 - 0.00523 * t)) / 3600.0
+    lon = np.deg2rad(lon - 360.0 / (C_AU_PER_DAY * 365.2425))
+    ceps, seps = np.cos(_EPS_J2000), np.sin(_EPS_J2000)
+    xyz = np.stack([np.cos(lon), ceps * np.sin(lon), seps * np.sin(lon)], axis=-1)
+    mean_lon, _, _ = equatorial_j2000_to_ecliptic_of_date(xyz, jd_tt, 0.0)
+    offset = np.where(
+        jd_ut <= _SIDEREAL_LONG_TERM_START, *_SIDEREAL_LONG_TERM_OFFSETS
+    )
+    return mean_lon + (jd_ut - 0.5) % 1.0 * 360.0 - offset
+
+
+def sidereal_time(jd_ut: np.ndarray, jd_tt: np.ndarray) -> np.ndarray:
+    """
+    Greenwich apparent sidereal time in degrees: IAU 2006, from the ERA,
+    between 1850 and 2050 and swe_sidtime's long-term model outside them.
+    """
+    jd_ut = np.asarray(jd_ut, dtype=float)
+    jd_tt = np.asarray(jd_tt, dtype=float)
+    du = jd_ut - J2000
+    era = 360.0 * (0.7790572732640 + 0.00273781191135448 * du + du % 1.0)
+    t = _centuries(jd_tt)
+    gmst = era + (
+        0.014506
+        + t
+        * (
+            4612.156534
+            + t * (1.3915817 + t * (-0.00000044 + t * (-0.000029956 - 0.0000000368 * t)))
+        )
+    ) / 3600.0
+    long_term = (jd_ut <= _SIDEREAL_LONG_TERM_START) | (
+        jd_ut >= _SIDEREAL_LONG_TERM_END
+    )
+    if long_term.any():
+        gmst = np.where(long_term, _sidereal_time_long_term(jd_ut, jd_tt), gmst)
+    dpsi, deps = nutation(jd_tt)
+    eps = mean_obliquity(jd_tt) + deps
+    return (gmst + np.rad2deg(dpsi * np.cos(eps))) % 360.0
+
+
+def _asc1(x: np.ndarray, pole: np.ndarray, eps: np.ndarray) -> np.ndarray:
+    """
+    Ecliptic longitude where the circle through the north and south points of
+    a horizon with pole height `pole` cuts the ecliptic, for the right
+    ascension x - 90 on the meridian (Asc1() in swehouse.c). Degrees.
+    """
+    x = np.deg2rad(x)
+    return (
+        np.rad2deg(
+            np.arctan2(
+                np.sin(x), np.cos(x) * np.cos(eps) - np.tan(pole) * np.sin(eps)
+            )
+        )
+        % 360.0
+    )
+
+
+def _mc(armc: np.ndarray, eps: np.ndarray) -> np.ndarray:
+    a = np.deg2rad(armc)
+    return np.rad2deg(np.arctan2(np.sin(a), np.cos(a) * np.cos(eps))) % 360.0
+
+
+def _opposite(cusps: Dict[int, np.ndarray]) -> Dict[int, np.ndarray]:
+    for house in range(1, 7):
+        cusps[house + 6] = (cusps[house] + 180.0) % 360.0
+    return cusps
+
+
+def _porphyry(asc: np.ndarray, mc: np.ndarray) -> Dict[int, np.ndarray]:
+    ic = (mc + 180.0) % 360.0
+    q1 = (asc - mc) % 360.0 / 3.0
+    q2 = (ic - asc) % 360.0 / 3.0
+    return _opposite(
+        {
+            1: asc,
+            2: (asc + q2) % 360.0,
+            3: (asc + 2 * q2) % 360.0,
+            4: ic,
+            5: (ic + q1) % 360.0,
+            6: (ic + 2 * q1) % 360.0,
+        }
+    )
+
+
+def _placidus_cusp(
+    ra: np.ndarray, fraction: float, lat: np.ndarray, eps: np.ndarray
+) -> np.ndarray:
+    """Iterate the pole height of a Placidus cusp until it settles."""
+    tan_lat = np.tan(lat)
+    sin_eps = np.sin(eps)
+    a = np.arcsin(np.clip(tan_lat * np.tan(eps), -1.0, 1.0))
+    pole = np.arctan(np.sin(a * fraction) / np.tan(eps))
+    cusp = _asc1(ra, pole, eps)
+    for _ in range(50):
+        tan_decl = np.tan(np.arcsin(sin_eps * np.sin(np.deg2rad(cusp))))
+        small = np.abs(tan_decl) < 1e-10
+        safe = np.where(small, 1.0, tan_decl)
+        pole = np.arctan(
+            np.sin(np.arcsin(np.clip(tan_lat * safe, -1.0, 1.0)) * fraction) / safe
+        )
+        new = np.where(small, ra % 360.0, _asc1(ra, pole, eps))
+        settled = np.abs((new - cusp + 180.0) % 360.0 - 180.0) < 1e-9
+        cusp = new
+        if np.all(settled):
+            break
+    return cusp
+
+
+def house_cusps(
+    hsys: HouseSystem,
+    armc: np.ndarray,
+    lat_deg: np.ndarray,
+    eps: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ASC, MC and the twelve cusps (n, 12) in degrees, following swehouse.c.
+    armc: right ascension of the MC in degrees, eps: true obliquity in radians.
+    """
+    armc = np.atleast_1d(np.asarray(armc, dtype=float))
+    lat = np.deg2rad(np.broadcast_to(lat_deg, armc.shape).astype(float))
+    eps = np.broadcast_to(eps, armc.shape)
+
+    mc = _mc(armc, eps)
+    asc = _asc1(armc + 90.0, lat, eps)
+
+    if hsys == HouseSystem.EQUAL_HOUSES:
+        cusps = {h: (asc + 30.0 * (h - 1)) % 360.0 for h in range(1, 13)}
+    elif hsys == HouseSystem.WHOLE_SIGN:
+        start = np.floor(asc / 30.0) * 30.0
+        cusps = {h: (start + 30.0 * (h - 1)) % 360.0 for h in range(1, 13)}
+    elif hsys == HouseSystem.MORINUS:
+        # equal divisions of the equator, projected through the ecliptic poles
+        cusps = {}
+        for h in range(1, 13):
+            a = np.deg2rad(armc + 30.0 * (h - 10))
+            cusps[h] = (
+                np.rad2deg(np.arctan2(np.sin(a) * np.cos(eps), np.cos(a))) % 360.0
+            )
+    elif hsys in (HouseSystem.REGIOMONTANUS, HouseSystem.TOPOCENTRIC):
+        if hsys == HouseSystem.REGIOMONTANUS:
+            pole1 = np.arctan(np.tan(lat) * 0.5)
+            pole2 = np.arctan(np.tan(lat) * np.cos(np.deg2rad(30.0)))
+        else:
+            pole1 = np.arctan(np.tan(lat) / 3.0)
+            pole2 = np.arctan(np.tan(lat) * 2.0 / 3.0)
+        cusps = _opposite(
+            {
+                1: asc,
+                2: _asc1(armc + 120.0, pole2, eps),
+                3: _asc1(armc + 150.0, pole1, eps),
+                4: (mc + 180.0) % 360.0,
+                5: (_asc1(armc + 30.0, pole1, eps) + 180.0) % 360.0,
+                6: (_asc1(armc + 60.0, pole2, eps) + 180.0) % 360.0,
+            }
+        )
+    elif hsys == HouseSystem.PLACIDUS:
+        cusps = _opposite(
+            {
+                1: asc,
+                2: _placidus_cusp(armc + 120.0, 2.0 / 3.0, lat, eps),
+                3: _placidus_cusp(armc + 150.0, 1.0 / 3.0, lat, eps),
+                4: (mc + 180.0) % 360.0,
+                5: (_placidus_cusp(armc + 30.0, 1.0 / 3.0, lat, eps) + 180.0) % 360.0,
+                6: (_placidus_cusp(armc + 60.0, 2.0 / 3.0, lat, eps) + 180.0) % 360.0,
+            }
+        )
+        # Placidus is undefined inside the polar circles: fall back to Porphyry
+        polar = np.abs(lat) >= np.pi / 2 - eps
+        if np.any(polar):
+            fallback = _porphyry(asc, mc)
+            cusps = {h: np.where(polar, fallback[h], cusps[h]) for h in cusps}
+    else:
+        raise ValueError(f"Unsupported house system: {hsys}")
+
+    return asc, mc, np.stack([cusps[h] for h in range(1, 13)], axis=-1)
+
+
+def house_of(lon: np.ndarray, cusps: np.ndarray) -> np.ndarray:
+    """1-based house containing each longitude. lon (n,), cusps (n, 12)."""
+    width = (np.roll(cusps, -1, axis=-1) - cusps) % 360.0
+    offset = (np.asarray(lon)[..., None] - cusps) % 360.0
+    inside = offset < width
+    return np.argmax(inside, axis=-1) + 1
+
+
+# ---------- Chart assembly ----------
+
+
+BODY_NAMES = list(PLANETS) + [
+    "True N.Node",
+    "True S.Node",
+    "Mean N.Node",
+    "Mean S.Node",
+]
+
+
+class ChartEngine:
+    """
+    Computes charts in-process. Keeps one Ephemeris (open files and cached
+    segments) for its lifetime, so repeated calls are cheap. By default that
+    is load_ephemeris(): the bundled .se1 files, or the directory or bundle
+    named by the ASTRO_ENGINE_EPHEMERIS environment variable.
+
+    Batches are evaluated in time order, chunk_size charts at a time, which
+    bounds the memory of the intermediate arrays; consecutive chunks reuse
+    the ephemeris segments cached by the previous ones. Aspects follow
+    aspect_policy, by default the binary's major aspects and orbs.
+    """
+
+    def __init__(
+        self,
+        ephemeris: Optional[Ephemeris] = None,
+        chunk_size: int = 16384,
+        aspect_policy: AspectPolicy = DEFAULT_POLICY,
+    ):
+        self.ephemeris = ephemeris or load_ephemeris()
+        self.chunk_size = chunk_size
+        self.aspect_policy = aspect_policy
+
+    def _evaluate(
+        self,
+        jd_ut: np.ndarray,
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        house_system: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Body columns (n, len(BODY_NAMES)) and houses of one chunk, rounded to
+        the binary's output precision.
+        """
+        n = jd_ut.size
+        jd_tt = jd_ut + delta_t(jd_ut) / 86400.0
+
+        dpsi, deps = nutation(jd_tt)
+        eps = mean_obliquity(jd_tt) + deps
+        armc = (sidereal_time(jd_ut, jd_tt) + longitude) % 360.0
+        asc, mc, cusps = np.empty(n), np.empty(n), np.empty((n, 12))
+        for hsys in np.unique(house_system):
+            rows = np.flatnonzero(house_system == hsys)
+            asc[rows], mc[rows], cusps[rows] = house_cusps(
+                HouseSystem(hsys), armc[rows], latitude[rows], eps[rows]
+            )
+
+        positions = planet_positions(self.ephemeris, jd_tt)
+        true_lon, true_dist, true_speed = true_node(self.ephemeris, jd_tt)
+        mean_lon, mean_speed = mean_node(jd_tt)
+
+        columns = [
+            (p["lon"], p["lat"], p["dist"], p["speed"]) for p in positions.values()
+        ]
+        zero = np.zeros(n)
+        for lon, dist, speed in (
+            (true_lon, true_dist, true_speed),
+            (mean_lon, np.full(n, MEAN_MOON_DISTANCE_AU), mean_speed),
+        ):
+            columns.append((lon, zero, dist, speed))
+            columns.append(((lon + 180.0) % 360.0, -zero, dist, speed))
+
+        lon, lat, dist, speed = (np.stack(c, axis=-1) for c in zip(*columns))
+        lon = np.round(lon % 360.0, 6) % 360.0
+        cusps = np.round(cusps % 360.0, 6) % 360.0
+        return dict(
+            lon=lon,
+            lat=np.round(lat, 6),
+            dist=np.round(dist, 6),
+            speed=np.round(speed, 6),
+            motion=motion_codes(speed, STATION_THRESHOLD),
+            house=house_of(lon, cusps[:, None, :]),
+            asc=np.round(asc % 360.0, 6) % 360.0,
+            mc=np.round(mc % 360.0, 6) % 360.0,
+            cusps=cusps,
+        )
+
+    def charts(
+        self,
+        jd_ut: np.ndarray,
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        house_system: np.ndarray,
+        local: np.ndarray,
+        ut: np.ndarray,
+        tzid: np.ndarray,
+    ) -> ChartBatch:
+        """
+        Evaluate a whole batch. house_system holds HouseSystem values; local,
+        ut and tzid only fill the meta columns.
+        """
+        jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+        latitude = np.atleast_1d(np.asarray(latitude, dtype=float))
+        longitude = np.atleast_1d(np.asarray(longitude, dtype=float))
+        house_system = np.atleast_1d(np.asarray(house_system, dtype=str))
+        n, bodies = jd_ut.size, len(BODY_NAMES)
+
+        out = dict(
+            lon=np.empty((n, bodies)),
+            lat=np.empty((n, bodies)),
+            dist=np.empty((n, bodies)),
+            speed=np.empty((n, bodies)),
+            motion=np.empty((n, bodies), dtype=np.int8),
+            house=np.empty((n, bodies), dtype=np.int8),
+            asc=np.empty(n),
+            mc=np.empty(n),
+            cusps=np.empty((n, 12)),
+        )
+        edges = [tuple(np.empty(0, dtype=int) for _ in range(6))]
+        order = np.argsort(jd_ut, kind="stable")
+        for start in range(0, n, self.chunk_size):
+            rows = order[start : start + self.chunk_size]
+            chunk = self._evaluate(
+                jd_ut[rows], latitude[rows], longitude[rows], house_system[rows]
+            )
+            for key, values in chunk.items():
+                out[key][rows] = values
+            chart, *rest = find_aspects(
+                chunk["lon"], chunk["speed"], BODY_NAMES, self.aspect_policy
+            )
+            edges.append((rows[chart], *rest))
+
+        # each chart's edges come from one chunk, already in pair order
+        chart, body1, body2, kind, orb, phase = (
+            np.concatenate(column) for column in zip(*edges)
+        )
+        by_chart = np.argsort(chart, kind="stable")
+
+        return ChartBatch(
+            body_names=list(BODY_NAMES),
+            aspect_definitions=self.aspect_policy.definitions(),
+            local=np.asarray(local, dtype=str),
+            ut=np.asarray(ut, dtype=str),
+            jd_ut=np.array([round(jd, 8) for jd in jd_ut.tolist()]),
+            latitude=np.round(latitude, 6),
+            longitude=np.round(longitude, 6),
+            house_system=house_system,
+            tzid=np.asarray(tzid, dtype=str),
+            **out,
+            aspect_chart=chart[by_chart],
+            aspect_body1=body1[by_chart],
+            aspect_body2=body2[by_chart],
+            aspect_kind=kind[by_chart],
+            aspect_orb=orb[by_chart],
+            aspect_phase=phase[by_chart],
+            station_threshold=STATION_THRESHOLD,
+        )
+
+
+_default_engine: Optional[ChartEngine] = None
+
+
+def get_engine() -> ChartEngine:
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = ChartEngine()
+    return _default_engine
+
+
+def _column(values, n: int) -> list:
+    """A per-chart column: sequences pass through, scalars are repeated."""
+    if isinstance(values, (str, HouseSystem)) or np.ndim(values) == 0:
+        return [values] * n
+    values = list(values)
+    if len(values) != n:
+        raise ValueError(f"Expected {n} values, got {len(values)}")
+    return values
+
+
+def compute_charts(
+    dates: Sequence[str],
+    times: Sequence[str],
+    latitudes: Union[Sequence[float], float],
+    longitudes: Union[Sequence[float], float],
+    house_systems: Union[Sequence[HouseSystem], HouseSystem],
+    timezone_IANA_ids: Union[Sequence[str], str],
+    engine: Optional[ChartEngine] = None,
+    ambiguous: Ambiguous = "earlier",
+    nonexistent: Nonexistent = "forward",
+) -> ChartBatch:
+    """
+    Many charts in one call. Every argument is one value per chart; all but
+    dates may also be a single value shared by the whole batch.
+
+    Local times are converted to UT with one table lookup per zone; see
+    localtime.local_to_utc for the ambiguous/nonexistent policies, and
+    batch.local_status for which local times they applied to.
+    """
+    start = perf_counter()
+    n = len(dates)
+    times = _column(times, n)
+    latitudes = _column(latitudes, n)
+    longitudes = _column(longitudes, n)
+    house_systems = [HouseSystem(h).value for h in _column(house_systems, n)]
+    tzids = _column(timezone_IANA_ids, n)
+
+    with span("chart.compute", charts=n):
+        local = parse_local_datetimes(list(dates), times)
+        ut, status = local_to_utc(local, tzids, ambiguous, nonexistent)
+
+        batch = (engine or get_engine()).charts(
+            julian_days(ut),
+            latitudes,
+            longitudes,
+            house_systems,
+            local=format_moments(local),
+            ut=format_moments(ut),
+            tzid=tzids,
+        )
+    batch.local_status = status
+    batch.elapsed = perf_counter() - start
+    return batch
+
+
+def compute_chart_series(
+    date: str,
+    time: str,
+    latitude: float,
+    longitude: float,
+    house_system: HouseSystem,
+    timezone_IANA_id: str,
+    step: timedelta,
+    count: int,
+    engine: Optional[ChartEngine] = None,
+    ambiguous: Ambiguous = "earlier",
+    nonexistent: Nonexistent = "forward",
+) -> ChartBatch:
+    """
+    count charts of one place, from the local date and time on, step apart
+    in real time: across a DST change the local times jump, but no chart is
+    repeated or skipped. The series is one batch, so nearby charts share
+    the ephemeris segments they need, decoded once.
+    """
+    if count < 1:
+        raise ValueError(f"count must be positive, got {count}")
+    start = perf_counter()
+    first, status = local_to_utc(
+        parse_local_datetimes([date], [time]),
+        [timezone_IANA_id],
+        ambiguous,
+        nonexistent,
+    )
+    step_us = np.timedelta64(step // timedelta(microseconds=1), "us")
+    ut = first[0] + np.arange(count) * step_us
+    local = utc_to_local(ut, timezone_IANA_id)
+
+    with span("chart.compute", charts=count):
+        batch = (engine or get_engine()).charts(
+            julian_days(ut),
+            np.full(count, float(latitude)),
+            np.full(count, float(longitude)),
+            np.full(count, HouseSystem(house_system).value),
+            local=format_moments(local),
+            ut=format_moments(ut),
+            tzid=[timezone_IANA_id] * count,
+        )
+    # only the first local time was given, the others are exact
+    batch.local_status = np.zeros(count, dtype=np.int8)
+    batch.local_status[0] = status[0]
+    batch.elapsed = perf_counter() - start
+    return batch
+
+
+def compute_chart(
+    date: str,
+    time: str,
+    latitude: float,
+    longitude: float,
+    house_system: HouseSystem,
+    timezone_IANA_id: str,
+    engine: Optional[ChartEngine] = None,
+    ambiguous: Ambiguous = "earlier",
+    nonexistent: Nonexistent = "forward",
+) -> AstrologicalData:
+    """In-process equivalent of running swecli/main with --tzid."""
+    return compute_charts(
+        [date],
+        [time],
+        [latitude],
+        [longitude],
+        [house_system],
+        [timezone_IANA_id],
+        engine=engine,
+        ambiguous=ambiguous,
+        nonexistent=nonexistent,
+    )[0]
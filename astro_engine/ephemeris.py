@@ -0,0 +1,674 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+MODULE_DIR = Path(__file__).resolve().parent
+EPHE_DIR = MODULE_DIR / "swecli" / "ephe"
+
+# ---------- Body numbers used inside the .se1 files ----------
+
+SEI_EMB = 0
+SEI_MOON = 1
+SEI_MERCURY = 2
+SEI_VENUS = 3
+SEI_MARS = 4
+SEI_JUPITER = 5
+SEI_SATURN = 6
+SEI_URANUS = 7
+SEI_NEPTUNE = 8
+SEI_PLUTO = 9
+SEI_SUNBARY = 10
+
+# Pseudo body: the geocentre, derived from the EMB and the Moon
+EARTH = -1
+
+PLANET_FILE_PREFIX = "sepl"
+MOON_FILE_PREFIX = "semo"
+
+# Compact bundles written by astro_engine.bundle
+BUNDLE_MAGIC = b"AEPHBNDL"
+BUNDLE_VERSION = 1
+# Points the default engine at another ephemeris directory or bundle file
+EPHEMERIS_ENV = "ASTRO_ENGINE_EPHEMERIS"
+
+_FLG_HELIO = 1  # body is stored heliocentric
+_FLG_ROTATE = 2  # coefficients are given relative to a mean orbital plane
+_FLG_ELLIPSE = 4  # a reference ellipse has been subtracted
+_FLG_EMBHEL = 8  # SUNBARY holds the heliocentric EMB instead of the barycentric Sun
+
+_TEST_ENDIAN = 0x616263
+_OBLIQUITY_J2000 = np.deg2rad(84381.406 / 3600.0)
+
+
+@dataclass
+class BodyHeader:
+    ipl: int
+    index_offset: int
+    flags: int
+    ncoe: int
+    rmax: float
+    tfstart: float
+    tfend: float
+    dseg: float
+    telem: float
+    prot: float
+    dprot: float
+    qrot: float
+    dqrot: float
+    peri: float
+    dperi: float
+    refep: Optional[np.ndarray] = None
+
+
+class SE1File:
+    """
+    One Swiss Ephemeris data file (sepl_*.se1, semo_*.se1, ...).
+
+    The file is memory-mapped once and only the header is parsed when it is
+    opened. Coefficients are unpacked one segment at a time, the same way
+    sweph.c does it, so only the pages of the segments actually used are ever
+    read from disk.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._pos = 0
+        self._read_header()
+
+    def close(self):
+        self._map.close()
+
+    def __repr__(self):
+        return f"SE1File({self.path.name!r}, {self.tfstart:.1f}..{self.tfend:.1f})"
+
+    # ---------- Header ----------
+
+    def _take(self, size: int) -> bytes:
+        buf = self._map[self._pos : self._pos + size]
+        if len(buf) != size:
+            raise RuntimeError(f"Ephemeris file {self.path.name} is damaged")
+        self._pos += size
+        return buf
+
+    def _read(self, fmt: str):
+        return struct.unpack(self._endian + fmt, self._take(struct.calcsize(fmt)))
+
+    def _read_header(self):
+        # version, file name and copyright lines
+        for _ in range(3):
+            end = self._map.find(b"\r\n", self._pos, self._pos + 512)
+            if end < 0:
+                raise RuntimeError(f"Ephemeris file {self.path.name} is damaged")
+            self._pos = end + 2
+
+        test = self._take(4)
+        if int.from_bytes(test, "little") == _TEST_ENDIAN:
+            self._endian, self._byteorder = "<", "little"
+        elif int.from_bytes(test, "big") == _TEST_ENDIAN:
+            self._endian, self._byteorder = ">", "big"
+        else:
+            raise RuntimeError(f"Ephemeris file {self.path.name} is damaged")
+
+        self.file_length, self.denum = self._read("ii")
+        self.tfstart, self.tfend = self._read("dd")
+
+        (nplan,) = self._read("h")
+        ipl_size = 2
+        if nplan > 256:
+            ipl_size = 4
+            nplan %= 256
+        ipl_fmt = "h" if ipl_size == 2 else "i"
+        ipls = self._read(ipl_fmt * nplan)
+
+        self._read("I")  # header CRC
+        self.clight, self.aunit, self.helgravconst, self.ratme, self.sunradius = (
+            self._read("5d")
+        )
+
+        self.bodies: Dict[int, BodyHeader] = {}
+        for ipl in ipls:
+            (index_offset,) = self._read("i")
+            flags, ncoe = self._read("BB")
+            (rmax,) = self._read("i")
+            d = self._read("10d")
+            body = BodyHeader(
+                ipl=ipl,
+                index_offset=index_offset,
+                flags=flags,
+                ncoe=ncoe,
+                rmax=rmax / 1000.0,
+                tfstart=d[0],
+                tfend=d[1],
+                dseg=d[2],
+                telem=d[3],
+                prot=d[4],
+                dprot=d[5],
+                qrot=d[6],
+                dqrot=d[7],
+                peri=d[8],
+                dperi=d[9],
+            )
+            if flags & _FLG_ELLIPSE:
+                body.refep = np.array(self._read(f"{2 * ncoe}d")).reshape(2, ncoe)
+            self.bodies[ipl] = body
+
+    # ---------- Segments ----------
+
+    def read_segment(self, ipl: int, iseg: int) -> np.ndarray:
+        """
+        Return the Chebyshev coefficients (3 x ncoe) of one segment of a body,
+        unpacked and rotated back to the J2000 equator.
+        """
+        body = self.bodies[ipl]
+        index = body.index_offset + iseg * 3
+        fpos = int.from_bytes(self._map[index : index + 3], self._byteorder)
+        # a segment is at most 3 * (4 header bytes + 4 bytes per coefficient)
+        buf = self._map[fpos : fpos + 3 * (4 + 4 * body.ncoe)]
+        coeffs = unpack_segment(buf, body.ncoe, body.rmax, self._byteorder)
+        if body.flags & _FLG_ROTATE:
+            tseg0 = body.tfstart + iseg * body.dseg
+            coeffs = rotate_back(body, coeffs, tseg0)
+        return coeffs
+
+
+def unpack_segment(buf: bytes, ncoe: int, rmax: float, byteorder: str) -> np.ndarray:
+    """
+    Unpack the packed integer coefficients of one segment (see
+    get_new_segment() in sweph.c). Each coordinate starts with a small header
+    giving how many coefficients are stored in 4, 3, 2 and 1 bytes, and
+    optionally in half and quarter bytes.
+    """
+    coeffs = np.zeros((3, ncoe))
+    scale = rmax / 2.0 / 1e9
+    pos = 0
+    for icoord in range(3):
+        c0, c1 = buf[pos], buf[pos + 1]
+        pos += 2
+        if c0 & 128:
+            c2, c3 = buf[pos], buf[pos + 1]
+            pos += 2
+            nsize = [c1 // 16, c1 % 16, c2 // 16, c2 % 16, c3 // 16, c3 % 16]
+        else:
+            nsize = [c0 // 16, c0 % 16, c1 // 16, c1 % 16]
+
+        if sum(nsize) > ncoe:
+            raise RuntimeError(
+                f"{sum(nsize)} coefficients instead of {ncoe} in ephemeris segment"
+            )
+
+        raw: List[int] = []
+        for i, n in enumerate(nsize):
+            if n == 0:
+                continue
+            if i < 4:
+                width = 4 - i
+                for _ in range(n):
+                    raw.append(int.from_bytes(buf[pos : pos + width], byteorder))
+                    pos += width
+            else:
+                # half byte (i == 4) or quarter byte (i == 5) packing
+                bits = 4 if i == 4 else 2
+                per_byte = 8 // bits
+                nbytes = (n + per_byte - 1) // per_byte
+                mask = (1 << bits) - 1
+                for k in range(nbytes):
+                    byte = buf[pos + k]
+                    for shift in range(8 - bits, -1, -bits):
+                        if len(raw) - sum(nsize[:i]) >= n:
+                            break
+                        raw.append((byte >> shift) & mask)
+                pos += nbytes
+
+        # lowest bit is the sign
+        for j, value in enumerate(raw):
+            if value & 1:
+                coeffs[icoord, j] = -((value + 1) // 2) * scale
+            else:
+                coeffs[icoord, j] = (value // 2) * scale
+    return coeffs
+
+
+def rotate_back(body: BodyHeader, coeffs: np.ndarray, tseg0: float) -> np.ndarray:
+    """
+    The coefficients are stored relative to the body's mean orbital plane
+    (and, optionally, a reference ellipse). Rotate them back to the J2000
+    equator (rot_back() in sweph.c).
+    """
+    t = tseg0 + body.dseg / 2.0
+    tdiff = (t - body.telem) / 365250.0
+    if body.ipl == SEI_MOON:
+        dn = np.fmod(body.prot + tdiff * body.dprot, 2 * np.pi)
+        q = body.qrot + tdiff * body.dqrot
+        qav, pav = q * np.cos(dn), q * np.sin(dn)
+    else:
+        qav = body.qrot + tdiff * body.dqrot
+        pav = body.prot + tdiff * body.dprot
+
+    x = coeffs.copy()
+    if body.flags & _FLG_ELLIPSE and body.refep is not None:
+        omtild = np.fmod(body.peri + tdiff * body.dperi, 2 * np.pi)
+        com, som = np.cos(omtild), np.sin(omtild)
+        refx, refy = body.refep
+        x[0] = coeffs[0] + com * refx - som * refy
+        x[1] = coeffs[1] + com * refy + som * refx
+
+    # orthonormal system with the first axis along the origin of longitudes and
+    # the third axis along the angular momentum (equinoctial variables)
+    cosih2 = 1.0 / (1.0 + qav * qav + pav * pav)
+    uiz = np.array([2.0 * pav, -2.0 * qav, 1.0 - qav * qav - pav * pav]) * cosih2
+    uix = np.array([1.0 + qav * qav - pav * pav, 2.0 * qav * pav, -2.0 * pav]) * cosih2
+    uiy = np.cross(uiz, uix)
+    rotated = np.stack([uix, uiy, uiz], axis=1) @ x
+
+    if body.ipl == SEI_MOON:
+        # the Moon is given relative to the ecliptic: rotate to the J2000 equator
+        ceps, seps = np.cos(_OBLIQUITY_J2000), np.sin(_OBLIQUITY_J2000)
+        y = ceps * rotated[1] - seps * rotated[2]
+        z = seps * rotated[1] + ceps * rotated[2]
+        rotated[1], rotated[2] = y, z
+    return rotated
+
+
+def chebyshev_derivative(coeffs: np.ndarray) -> np.ndarray:
+    """Coefficients of the derivative (with respect to x) of a (3 x ncoe) series."""
+    n = coeffs.shape[-1]
+    deriv = np.zeros_like(coeffs)
+    for k in range(n - 1, 0, -1):
+        deriv[..., k - 1] = 2.0 * k * coeffs[..., k]
+        if k + 1 < n:
+            deriv[..., k - 1] += deriv[..., k + 1]
+    return deriv
+
+
+# Below this many times cos(k * arccos(x)) beats the Python-level recurrence
+_DIRECT_BASIS_MAX = 64
+
+
+def _chebyshev_basis(x: np.ndarray, ncoe: int) -> np.ndarray:
+    """T_0(x) .. T_ncoe-1(x), (ncoe, len(x))."""
+    x = np.asarray(x, dtype=float)
+    if x.size <= _DIRECT_BASIS_MAX:
+        theta = np.arccos(np.clip(x, -1.0, 1.0))
+        basis = np.cos(np.multiply.outer(np.arange(ncoe), theta))
+        basis[0] = 0.5  # Swiss Ephemeris series carry c0 doubled (swi_echeb())
+        return basis
+    # three-term recurrence: no transcendental calls for long batches
+    two_x = 2.0 * x
+    basis = np.empty((ncoe, x.size))
+    basis[0] = 1.0
+    if ncoe > 1:
+        basis[1] = x
+    for k in range(2, ncoe):
+        np.multiply(two_x, basis[k - 1], out=basis[k])
+        basis[k] -= basis[k - 2]
+    basis[0] = 0.5  # Swiss Ephemeris series carry c0 doubled (swi_echeb())
+    return basis
+
+
+def evaluate_chebyshev(coeffs: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Evaluate (k x ncoe) Chebyshev series at x in [-1, 1]. Returns (len(x), k)."""
+    return (coeffs @ _chebyshev_basis(x, coeffs.shape[-1])).T
+
+
+# Rows per chunk when times span several segments (bounds the gathered copy)
+_GATHER_CHUNK = 8192
+
+
+def evaluate_chebyshev_segments(
+    coeffs: np.ndarray, which: np.ndarray, x: np.ndarray
+) -> np.ndarray:
+    """
+    Evaluate a stack of (m x k x ncoe) series, series which[i] at x[i].
+    Returns (len(x), k).
+    """
+    basis = _chebyshev_basis(x, coeffs.shape[-1])
+    out = np.empty((len(x), coeffs.shape[1]))
+    for start in range(0, len(x), _GATHER_CHUNK):
+        rows = slice(start, start + _GATHER_CHUNK)
+        out[rows] = np.einsum("cn,nkc->nk", basis[:, rows], coeffs[which[rows]])
+    return out
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class SegmentCache:
+    """
+    Bounded LRU of decoded segments, keyed by (body, file name, segment).
+    A segment is at most a few KB, so the default holds every segment a
+    century of charts touches in well under 10 MB.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._segments: "OrderedDict[Tuple[int, str, int], np.ndarray]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(
+        self, key: Tuple[int, str, int], load: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        with self._lock:
+            value = self._segments.get(key)
+            if value is not None:
+                self._segments.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = load()
+        with self._lock:
+            self._segments[key] = value
+            if len(self._segments) > self.maxsize:
+                self._segments.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._segments.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._segments))
+
+
+class Ephemeris:
+    """
+    Barycentric J2000 positions from a directory of .se1 files.
+
+    All methods take an array of Julian days (TT) and return arrays of shape
+    (n, 3): positions in AU and velocities in AU/day. Times that fall into the
+    same coefficient segment share one segment read, and decoded segments
+    stay in an LRU cache of cache_size segments, so workloads that move
+    forward in time decode each segment once.
+    """
+
+    def __init__(self, ephe_dir: Path = EPHE_DIR, cache_size: int = 4096):
+        self.ephe_dir = Path(ephe_dir)
+        self._files: Dict[str, List[SE1File]] = {}
+        self._starts: Dict[str, np.ndarray] = {}
+        # the engine is shared across threads: open and map each file once
+        self._lock = threading.Lock()
+        self.cache = SegmentCache(cache_size)
+
+    def close(self):
+        with self._lock:
+            for files in self._files.values():
+                for f in files:
+                    f.close()
+            self._files.clear()
+            self._starts.clear()
+        self.cache.clear()
+
+    def cache_info(self) -> CacheInfo:
+        return self.cache.info()
+
+    def _files_for(self, prefix: str) -> List[SE1File]:
+        with self._lock:
+            if prefix not in self._files:
+                paths = sorted(self.ephe_dir.glob(f"{prefix}*.se1"))
+                if not paths:
+                    raise RuntimeError(
+                        f"No {prefix}*.se1 ephemeris files found in {self.ephe_dir}"
+                    )
+                files = sorted((SE1File(p) for p in paths), key=lambda f: f.tfstart)
+                self._starts[prefix] = np.array([f.tfstart for f in files])
+                self._files[prefix] = files
+            return self._files[prefix]
+
+    def _evaluate(
+        self,
+        source: str,
+        ipl: int,
+        iseg: np.ndarray,
+        x: np.ndarray,
+        dseg: float,
+        velocity: bool,
+        read: Callable[[int], np.ndarray],
+    ) -> np.ndarray:
+        """
+        Evaluate segments iseg of one body of one source at x in [-1, 1].
+        read(iseg) returns the (3 x ncoe) coefficients of a segment; decoded
+        segments, stacked with their derivative, are kept in the cache.
+        """
+        rows = 6 if velocity else 3
+
+        def segment(s: int) -> np.ndarray:
+            def load() -> np.ndarray:
+                coeffs = read(s)
+                return np.concatenate([coeffs, chebyshev_derivative(coeffs)])
+
+            return self.cache.get((ipl, source, s), load)[:rows]
+
+        if iseg.min() == iseg.max():
+            result = evaluate_chebyshev(segment(int(iseg[0])), x)
+        else:
+            segments, which_segment = np.unique(iseg, return_inverse=True)
+            coeffs = np.stack([segment(int(s)) for s in segments])
+            result = evaluate_chebyshev_segments(coeffs, which_segment, x)
+        if velocity:
+            result[:, 3:] *= 2.0 / dseg
+        return result
+
+    def raw(
+        self, ipl: int, jd: np.ndarray, velocity: bool = True
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Evaluate a body exactly as it is stored in the files. With
+        velocity=False only the position series are evaluated (vel is None).
+        """
+        jd = np.atleast_1d(np.asarray(jd, dtype=float))
+        prefix = MOON_FILE_PREFIX if ipl == SEI_MOON else PLANET_FILE_PREFIX
+        files = self._files_for(prefix)
+        which = np.searchsorted(self._starts[prefix], jd, side="right") - 1
+        values = np.empty((jd.size, 6 if velocity else 3))
+
+        groups = [which[0]] if which.min() == which.max() else np.unique(which)
+        for ifile in groups:
+            idx = np.flatnonzero(which == ifile) if len(groups) > 1 else None
+            times = jd if idx is None else jd[idx]
+            if ifile < 0 or times.max() >= files[ifile].tfend:
+                bad = times.min() if ifile < 0 else times.max()
+                raise ValueError(f"JD {bad} is outside the range of the ephemeris files")
+
+            file = files[ifile]
+            body = file.bodies[ipl]
+            iseg = ((times - body.tfstart) // body.dseg).astype(int)
+            tseg0 = body.tfstart + iseg * body.dseg
+            x = 2.0 * (times - tseg0) / body.dseg - 1.0
+            values[slice(None) if idx is None else idx] = self._evaluate(
+                file.path.name,
+                ipl,
+                iseg,
+                x,
+                body.dseg,
+                velocity,
+                lambda s: file.read_segment(ipl, s),
+            )
+
+        if not velocity:
+            return values, None
+        return values[:, :3], values[:, 3:]
+
+    def emrat(self) -> float:
+        """Earth/Moon mass ratio of the underlying JPL ephemeris."""
+        return self._files_for(PLANET_FILE_PREFIX)[0].ratme
+
+    def flags(self, ipl: int) -> int:
+        """Storage flags of a planet-file body (heliocentric, EMB-helio Sun)."""
+        return self._files_for(PLANET_FILE_PREFIX)[0].bodies[ipl].flags
+
+    def barycentric(
+        self, ipl: int, jd: np.ndarray, velocity: bool = True
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Barycentric position and velocity of a body, J2000 equator.
+        ipl may also be EARTH or SEI_SUNBARY. vel is None with velocity=False.
+        """
+        if ipl in (EARTH, SEI_MOON):
+            emb, emb_v = self.raw(SEI_EMB, jd, velocity)
+            moon, moon_v = self.raw(SEI_MOON, jd, velocity)
+            ratio = 1.0 / (self.emrat() + 1.0)
+            earth = emb - moon * ratio
+            earth_v = emb_v - moon_v * ratio if velocity else None
+            if ipl == EARTH:
+                return earth, earth_v
+            return earth + moon, earth_v + moon_v if velocity else None
+
+        sun, sun_v = self._sun_barycentric(jd, velocity)
+        if ipl == SEI_SUNBARY:
+            return sun, sun_v
+
+        pos, vel = self.raw(ipl, jd, velocity)
+        if self.flags(ipl) & _FLG_HELIO:
+            pos = pos + sun
+            vel = vel + sun_v if velocity else None
+        return pos, vel
+
+    def _sun_barycentric(
+        self, jd: np.ndarray, velocity: bool = True
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        pos, vel = self.raw(SEI_SUNBARY, jd, velocity)
+        if self.flags(SEI_SUNBARY) & _FLG_EMBHEL:
+            # the file holds the heliocentric EMB: sun = EMB(bary) - EMB(helio)
+            emb, emb_v = self.raw(SEI_EMB, jd, velocity)
+            pos = emb - pos
+            vel = emb_v - vel if velocity else None
+        return pos, vel
+
+
+@dataclass
+class BundleBody:
+    flags: int
+    dseg: float
+    starts: np.ndarray  # first JD each segment is used for
+    ends: np.ndarray  # end of that range (exclusive)
+    tseg0: np.ndarray  # start of the segment's own interval
+    coeffs: np.ndarray  # (nseg, 3, ncoe), already rotated back to J2000
+
+
+class BundleEphemeris(Ephemeris):
+    """
+    Ephemeris read from one bundle file written by astro_engine.bundle.
+
+    The bundle holds the decoded coefficients of the segments that cover a
+    date range, so lookups are a binary search and evaluation is identical to
+    reading the .se1 files the bundle was built from.
+
+    Layout: BUNDLE_MAGIC, version and header length (uint32 LE), a JSON
+    header, then little-endian float64 arrays at the offsets it lists
+    (relative to the end of the header).
+    """
+
+    def __init__(self, path: Path, cache_size: int = 4096):
+        super().__init__(Path(path).parent, cache_size)
+        self.path = Path(path)
+        with open(self.path, "rb") as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = struct.unpack_from("<8sII", self._map, 0)
+        if magic != BUNDLE_MAGIC:
+            raise RuntimeError(f"{self.path.name} is not an ephemeris bundle")
+        if version != BUNDLE_VERSION:
+            raise RuntimeError(
+                f"Ephemeris bundle {self.path.name} has version {version}, "
+                f"expected {BUNDLE_VERSION}"
+            )
+        header = json.loads(self._map[16 : 16 + header_len])
+        self.jd_start: float = header["jd_start"]
+        self.jd_end: float = header["jd_end"]
+        self._emrat: float = header["emrat"]
+
+        base = 16 + header_len
+
+        def array(offset: int, count: int) -> np.ndarray:
+            return np.frombuffer(
+                self._map, dtype="<f8", count=count, offset=base + offset
+            )
+
+        self._bodies: Dict[int, BundleBody] = {}
+        for ipl, b in header["bodies"].items():
+            nseg, ncoe = b["nseg"], b["ncoe"]
+            self._bodies[int(ipl)] = BundleBody(
+                flags=b["flags"],
+                dseg=b["dseg"],
+                starts=array(b["starts"], nseg),
+                ends=array(b["ends"], nseg),
+                tseg0=array(b["tseg0"], nseg),
+                coeffs=array(b["coeffs"], nseg * 3 * ncoe).reshape(nseg, 3, ncoe),
+            )
+
+    def close(self):
+        self._bodies.clear()  # release the views before unmapping
+        self.cache.clear()
+        self._map.close()
+
+    def _body(self, ipl: int) -> BundleBody:
+        body = self._bodies.get(ipl)
+        if body is None:
+            raise ValueError(
+                f"Body {ipl} is not in the ephemeris bundle {self.path.name}"
+            )
+        return body
+
+    def raw(
+        self, ipl: int, jd: np.ndarray, velocity: bool = True
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        jd = np.atleast_1d(np.asarray(jd, dtype=float))
+        body = self._body(ipl)
+        iseg = np.searchsorted(body.starts, jd, side="right") - 1
+        outside = (iseg < 0) | (jd >= body.ends[iseg])
+        if np.any(outside):
+            raise ValueError(
+                f"JD {jd[outside][0]} is outside the range of the ephemeris bundle "
+                f"{self.path.name} ({self.jd_start:.1f}..{self.jd_end:.1f})"
+            )
+        x = 2.0 * (jd - body.tseg0[iseg]) / body.dseg - 1.0
+        values = self._evaluate(
+            self.path.name,
+            ipl,
+            iseg,
+            x,
+            body.dseg,
+            velocity,
+            lambda s: np.array(body.coeffs[s]),
+        )
+        if not velocity:
+            return values, None
+        return values[:, :3], values[:, 3:]
+
+    def emrat(self) -> float:
+        return self._emrat
+
+    def flags(self, ipl: int) -> int:
+        return self._body(ipl).flags
+
+
+def load_ephemeris(
+    path: Union[str, Path, None] = None, cache_size: int = 4096
+) -> Ephemeris:
+    """
+    Ephemeris for a directory of .se1 files or a bundle file. Without a path,
+    the EPHEMERIS_ENV environment variable, then the bundled swecli/ephe.
+    """
+    path = Path(path or os.environ.get(EPHEMERIS_ENV) or EPHE_DIR)
+    if path.is_dir():
+        return Ephemeris(path, cache_size)
+    return BundleEphemeris(path, cache_size)
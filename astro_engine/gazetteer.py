@@ -0,0 +1,184 @@
+"""
+Offline gazetteer geocoder.
+
+Built from a local GeoNames dump (https://download.geonames.org/export/dump/,
+e.g. cities15000.txt, plus countryInfo.txt for country names), so place
+lookups need no network:
+
+    from astro_engine.gazetteer import Gazetteer
+    from astro_engine.geo import configure_geocoder
+
+    configure_geocoder(Gazetteer.from_geonames("cities15000.txt", "countryInfo.txt"))
+
+A query "name, qualifier, ..." is matched on its first part: the exact
+normalized name first, then names starting with it, then the names sharing
+the most trigrams (typos). Qualifiers that are a country name or ISO code
+narrow the candidates, and the most populous candidate wins.
+"""
+
+import bisect
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from astro_engine.geo import Coordinates, normalize_place
+
+# Shortest query matched as a name prefix
+MIN_PREFIX_LENGTH = 3
+# Prefix matches looked at (in name order) before picking the most populous
+MAX_PREFIX_MATCHES = 256
+# Trigram (Jaccard) similarity a fuzzy match needs
+MIN_SIMILARITY = 0.5
+
+# (name, alternate names, latitude, longitude, country code, population)
+Place = Tuple[str, List[str], float, float, str, int]
+
+
+def _trigrams(name: str) -> List[str]:
+    padded = f"  {name} "
+    return sorted({padded[i : i + 3] for i in range(len(padded) - 2)})
+
+
+class Gazetteer:
+    """Name index over a list of places; see the module docstring."""
+
+    def __init__(
+        self,
+        places: Iterable[Place],
+        countries: Optional[Dict[str, str]] = None,
+    ):
+        latitude, longitude, population, country = [], [], [], []
+        ids: Dict[str, List[int]] = {}
+        for i, (name, alternates, lat, lon, code, people) in enumerate(places):
+            latitude.append(lat)
+            longitude.append(lon)
+            population.append(people)
+            country.append(code.upper())
+            aliases = dict.fromkeys(normalize_place(n) for n in [name, *alternates])
+            for alias in aliases:
+                if alias:
+                    ids.setdefault(alias, []).append(i)
+
+        self.latitude = np.array(latitude, dtype=float)
+        self.longitude = np.array(longitude, dtype=float)
+        self.population = np.array(population, dtype=np.int64)
+        self.country = np.array(country, dtype=str)
+        # country name (normalized) or code -> code
+        self.countries = {
+            normalize_place(k): v.upper() for k, v in (countries or {}).items()
+        }
+        self.countries.update({code.lower(): code for code in set(country)})
+
+        # names sorted for prefix search, with the places of each name
+        self.names = sorted(ids)
+        self._places = [np.array(ids[name]) for name in self.names]
+        self._index = {name: k for k, name in enumerate(self.names)}
+
+        # trigram index: (trigram code, name) pairs sorted by trigram
+        codes: Dict[str, int] = {}
+        grams, owners, counts = [], [], []
+        for k, name in enumerate(self.names):
+            trigrams = _trigrams(name)
+            grams.extend(codes.setdefault(t, len(codes)) for t in trigrams)
+            owners.extend([k] * len(trigrams))
+            counts.append(len(trigrams))
+        order = np.argsort(np.array(grams, dtype=np.int64), kind="stable")
+        self._trigram_codes = codes
+        self._gram = np.array(grams, dtype=np.int64)[order]
+        self._owner = np.array(owners, dtype=np.int64)[order]
+        self._trigram_count = np.array(counts, dtype=np.int64)
+
+        # the geocode cache keeps the answers of each distinct gazetteer apart
+        digest = hashlib.sha1("\n".join(self.names).encode())
+        sizes = np.array([len(p) for p in self._places], dtype=np.int64)
+        ids_by_name = np.concatenate(self._places) if self._places else sizes
+        for array in (self.latitude, self.longitude, self.population):
+            digest.update(array.tobytes())
+        digest.update(sizes.tobytes())
+        digest.update(ids_by_name.tobytes())
+        digest.update(",".join(self.country).encode())
+        digest.update(repr(sorted(self.countries.items())).encode())
+        self.source = f"{type(self).__name__}:{digest.hexdigest()}"
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    @classmethod
+    def from_geonames(
+        cls,
+        path: Union[str, Path],
+        country_info: Optional[Union[str, Path]] = None,
+        min_population: int = 0,
+        alternate_names: bool = True,
+    ) -> "Gazetteer":
+        """Index a GeoNames dump (tab-separated, 19 columns)."""
+        countries = {}
+        if country_info is not None:
+            with open(country_info, encoding="utf-8") as fp:
+                for line in fp:
+                    if line.startswith("#") or not line.strip():
+                        continue
+                    row = line.rstrip("\n").split("\t")
+                    countries[row[4]] = row[0]  # Country -> ISO
+
+        def places():
+            with open(path, encoding="utf-8") as fp:
+                for line in fp:
+                    row = line.rstrip("\n").split("\t")
+                    if len(row) < 15:
+                        continue
+                    people = int(row[14] or 0)
+                    if people < min_population:
+                        continue
+                    alternates = [row[2]]
+                    if alternate_names and row[3]:
+                        alternates += row[3].split(",")
+                    lat, lon = float(row[4]), float(row[5])
+                    yield row[1], alternates, lat, lon, row[8], people
+
+        return cls(places(), countries)
+
+    def _prefix(self, name: str) -> List[int]:
+        if len(name) < MIN_PREFIX_LENGTH:
+            return []
+        start = bisect.bisect_left(self.names, name)
+        stop = bisect.bisect_left(self.names, name + "\uffff", start)
+        return list(range(start, min(stop, start + MAX_PREFIX_MATCHES)))
+
+    def _similar(self, name: str) -> List[int]:
+        trigrams = _trigrams(name)
+        known = [self._trigram_codes[t] for t in trigrams if t in self._trigram_codes]
+        if not known:
+            return []
+        wanted = np.array(known, dtype=np.int64)
+        start = np.searchsorted(self._gram, wanted, "left")
+        stop = np.searchsorted(self._gram, wanted, "right")
+        owners = np.concatenate([self._owner[a:b] for a, b in zip(start, stop)])
+        candidates, shared = np.unique(owners, return_counts=True)
+        total = len(trigrams) + self._trigram_count[candidates] - shared
+        similarity = shared / total
+        best = similarity.max()
+        if best < MIN_SIMILARITY:
+            return []
+        return candidates[similarity == best].tolist()
+
+    def geocode(self, query: str) -> Optional[Coordinates]:
+        name, *qualifiers = normalize_place(query).split(", ")
+        exact = self._index.get(name)
+        if exact is not None:
+            names = [exact]
+        else:
+            names = self._prefix(name) or self._similar(name)
+        if not names:
+            return None
+
+        places = np.unique(np.concatenate([self._places[k] for k in names]))
+        codes = {self.countries[q] for q in qualifiers if q in self.countries}
+        if codes:
+            in_country = places[np.isin(self.country[places], list(codes))]
+            if in_country.size:
+                places = in_country
+        best = places[np.argmax(self.population[places])]
+        return float(self.latitude[best]), float(self.longitude[best])
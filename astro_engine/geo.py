@@ -1,25 +1,318 @@
+"""
+Place name geocoding.
+
+get_place_coordinates() goes through a PlaceResolver: a persistent cache
+keyed on the normalized place string in front of a geocoder backend. The
+backend is Nominatim by default (rate limited to its usage policy), or an
+offline Gazetteer (astro_engine.gazetteer), or a MappingGeocoder stand-in
+for tests and fixed place lists:
+
+    configure_geocoder(Gazetteer.from_geonames("cities15000.txt"))
+
+The cache is an SQLite file (ASTRO_ENGINE_GEOCODE_CACHE, or
+~/.cache/astro_engine/geocode.sqlite3) loaded into a dict, so a cached place
+costs one dict lookup. Entries are kept per geocoder source (the data it
+answers from, see Geocoder), so backends sharing the file do not answer for
+each other. Places the backend
+does not know are cached too, for negative_ttl seconds. If the file cannot
+be opened, the cache logs a warning and lives in memory.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Protocol, Sequence, Tuple, Union
+
 from geopy.exc import GeopyError  # type: ignore
 from geopy.geocoders import Nominatim  # type: ignore
 
+from astro_engine.instrument import count, span
 from astro_engine.models import GeoLocation
 
-geolocator = Nominatim(user_agent="data_virgo")
+logger = logging.getLogger(__name__)
 
+CACHE_ENV = "ASTRO_ENGINE_GEOCODE_CACHE"
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "astro_engine" / "geocode.sqlite3"
 
-def get_place_coordinates(location: str) -> GeoLocation:
-    location = location.strip()
+USER_AGENT = "data_virgo"
+# Nominatim's usage policy: at most one request per second
+NOMINATIM_DELAY_SECONDS = 1.0
+# how long an unknown place stays unknown before the geocoder is asked again
+DEFAULT_NEGATIVE_TTL = 7 * 86400.0
+
+Coordinates = Tuple[float, float]
+
+
+def normalize_place(location: str) -> str:
+    """Cache key of a place string: case, accents, spacing and commas folded."""
+    text = unicodedata.normalize("NFKD", location).casefold()
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"\s*,\s*", ", ", text)
+    return re.sub(r"\s+", " ", text).strip(" ,")
+
+
+class Geocoder(Protocol):
+    """
+    A geocoder may set a `source` string naming the data it answers from;
+    the cache keeps separate entries per source. Without one, entries are
+    kept per class.
+    """
 
-    if not location:
-        raise ValueError("Location cannot be empty string")
+    def geocode(self, query: str) -> Optional[Coordinates]:
+        """(latitude, longitude) of the place, or None if it is unknown."""
+        ...
 
-    try:
-        place = geolocator.geocode(location)  # type: ignore
 
+class NominatimGeocoder:
+    """Live OpenStreetMap Nominatim lookups, at most one per `delay` seconds."""
+
+    def __init__(
+        self, user_agent: str = USER_AGENT, delay: float = NOMINATIM_DELAY_SECONDS
+    ):
+        self._geolocator = Nominatim(user_agent=user_agent)
+        self.source = f"{type(self).__name__}:{user_agent}"
+        self._delay = delay
+        self._lock = threading.Lock()
+        self._last = 0.0
+
+    def geocode(self, query: str) -> Optional[Coordinates]:
+        with self._lock:
+            wait = self._last + self._delay - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                place = self._geolocator.geocode(query)  # type: ignore
+            except GeopyError as e:
+                raise RuntimeError(f'Geocode failed for location "{query}": {e}') from e
+            finally:
+                self._last = time.monotonic()
         if place is None:
-            raise ValueError(f'"{location}" - no such place found')
-    except GeopyError as e:
-        raise RuntimeError(f'Geocode failed for location "{location}": {e}') from e
+            return None
+        return place.latitude, place.longitude  # type: ignore
+
+
+class MappingGeocoder:
+    """Fixed place -> (latitude, longitude) table; keys are normalized."""
+
+    def __init__(self, places: Mapping[str, Coordinates]):
+        self.places = {normalize_place(k): v for k, v in places.items()}
+        self.calls = 0
+        table = json.dumps(sorted(self.places.items()))
+        digest = hashlib.sha1(table.encode()).hexdigest()
+        self.source = f"{type(self).__name__}:{digest}"
+
+    def geocode(self, query: str) -> Optional[Coordinates]:
+        self.calls += 1
+        return self.places.get(normalize_place(query))
+
+
+class GeocodeCache:
+    """
+    Normalized place -> coordinates (None for unknown places) of one
+    geocoder, named by source, kept in an SQLite file and mirrored in a
+    dict. path=None keeps it in memory only. Unknown places are forgotten
+    negative_ttl seconds after they were stored (None: never).
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        source: str = "",
+        negative_ttl: Optional[float] = DEFAULT_NEGATIVE_TTL,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.source = source
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        try:
+            self._db = self._connect(self.path)
+        except (OSError, sqlite3.Error) as error:
+            logger.warning(
+                "Geocode cache %s unavailable (%s), caching in memory only",
+                self.path,
+                error,
+            )
+            self.path = None
+            self._db = self._connect(None)
+        self._entries: Dict[str, Optional[Coordinates]] = {}
+        # key -> when an unknown place was stored
+        self._unknown: Dict[str, float] = {}
+        for key, lat, lon, created in self._db.execute(
+            "SELECT key, latitude, longitude, created FROM geocodes "
+            "WHERE source = ?",
+            (source,),
+        ):
+            self._entries[key] = None if lat is None else (lat, lon)
+            if lat is None:
+                self._unknown[key] = created
+
+    @staticmethod
+    def _connect(path: Optional[Path]) -> sqlite3.Connection:
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(
+            str(path) if path is not None else ":memory:", check_same_thread=False
+        )
+        try:
+            with db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS geocodes (source TEXT, key TEXT, "
+                    "latitude REAL, longitude REAL, created REAL, "
+                    "PRIMARY KEY (source, key))"
+                )
+        except sqlite3.Error:
+            db.close()
+            raise
+        return db
+
+    def __contains__(self, key: str) -> bool:
+        if key not in self._entries:
+            return False
+        created = self._unknown.get(key)
+        return (
+            created is None
+            or self.negative_ttl is None
+            or time.time() - created <= self.negative_ttl
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Coordinates]:
+        return self._entries.get(key)
+
+    def put_many(self, entries: Mapping[str, Optional[Coordinates]]):
+        created = time.time()
+        rows = [
+            (self.source, key, *(value or (None, None)), created)
+            for key, value in entries.items()
+        ]
+        with self._lock:
+            self._entries.update(entries)
+            for key, value in entries.items():
+                if value is None:
+                    self._unknown[key] = created
+                else:
+                    self._unknown.pop(key, None)
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?)", rows
+                )
+
+    def clear(self):
+        """Forget this geocoder's places."""
+        with self._lock:
+            self._entries.clear()
+            self._unknown.clear()
+            with self._db:
+                self._db.execute(
+                    "DELETE FROM geocodes WHERE source = ?", (self.source,)
+                )
+
+    def close(self):
+        self._db.close()
+
+
+class PlaceResolver:
+    """Cached geocoding: the cache answers first, the geocoder fills it."""
+
+    def __init__(self, geocoder: Geocoder, cache: GeocodeCache):
+        self.geocoder = geocoder
+        self.cache = cache
+
+    def resolve(self, locations: Sequence[str]) -> List[Optional[Coordinates]]:
+        """Coordinates of every location (None if unknown); repeats looked up once."""
+        keys = [normalize_place(location) for location in locations]
+        first: Dict[str, str] = {}
+        for key, location in zip(keys, locations):
+            first.setdefault(key, location)
+        misses = 0
+        for key, location in first.items():
+            # stored one at a time, so a failure keeps what was already found
+            if key not in self.cache:
+                misses += 1
+                with span("geocode", geocoder=type(self.geocoder).__name__):
+                    coordinates = self.geocoder.geocode(location.strip())
+                self.cache.put_many({key: coordinates})
+        count("geocode.cache_hits", len(first) - misses)
+        count("geocode.cache_misses", misses)
+        return [self.cache.get(key) for key in keys]
+
+    def coordinates(self, locations: Sequence[str]) -> List[GeoLocation]:
+        for location in locations:
+            if not location.strip():
+                raise ValueError("Location cannot be empty string")
+        found = self.resolve(locations)
+        unknown = [loc for loc, coords in zip(locations, found) if coords is None]
+        if unknown:
+            names = ", ".join(f'"{location.strip()}"' for location in unknown)
+            raise ValueError(f"{names} - no such place found")
+        return [
+            GeoLocation(
+                place_name=location.strip(), latitude=coords[0], longitude=coords[1]
+            )
+            for location, coords in zip(locations, found)
+            if coords is not None
+        ]
+
+
+_resolver: Optional[PlaceResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def configure_geocoder(
+    geocoder: Optional[Geocoder] = None,
+    cache_path: Optional[Union[str, Path]] = None,
+    persist: bool = True,
+    negative_ttl: Optional[float] = DEFAULT_NEGATIVE_TTL,
+) -> PlaceResolver:
+    """
+    Replace the resolver used by get_place_coordinates: geocoder defaults to
+    Nominatim, cache_path to ASTRO_ENGINE_GEOCODE_CACHE or the user cache
+    directory. persist=False keeps the cache in memory. Each geocoder source
+    has its own entries in the cache file.
+    """
+    global _resolver
+    with _resolver_lock:
+        if _resolver is not None:
+            _resolver.cache.close()
+        _resolver = _make_resolver(geocoder, cache_path, persist, negative_ttl)
+        return _resolver
+
+
+def _make_resolver(
+    geocoder: Optional[Geocoder],
+    cache_path: Optional[Union[str, Path]],
+    persist: bool,
+    negative_ttl: Optional[float] = DEFAULT_NEGATIVE_TTL,
+) -> PlaceResolver:
+    if persist:
+        cache_path = Path(cache_path or os.environ.get(CACHE_ENV) or DEFAULT_CACHE_PATH)
+    geocoder = geocoder or NominatimGeocoder()
+    source = getattr(geocoder, "source", None) or type(geocoder).__name__
+    cache = GeocodeCache(cache_path if persist else None, source, negative_ttl)
+    return PlaceResolver(geocoder, cache)
+
+
+def get_resolver() -> PlaceResolver:
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = _make_resolver(None, None, True)
+        return _resolver
+
+
+def get_place_coordinates(location: str) -> GeoLocation:
+    return get_resolver().coordinates([location])[0]
+
 
-    return GeoLocation(
-        place_name=location, latitude=place.latitude, longitude=place.longitude  # type: ignore
-    )
+def get_places_coordinates(locations: Sequence[str]) -> List[GeoLocation]:
+    """Batch get_place_coordinates; repeated places are geocoded once."""
+    return get_resolver().coordinates(locations)
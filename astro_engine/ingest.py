@@ -0,0 +1,124 @@
+"""
+Reading chart JSON.
+
+Charts arrive as JSON text: the binary's output, worker replies, or NDJSON
+files with one chart per line. Three ways in, from safest to fastest:
+
+  - parse_chart / iter_charts: AstrologicalData validated by pydantic
+    straight from the bytes (model_validate_json), with no intermediate
+    dict tree. This is the mode for untrusted input, and the default.
+  - read_chart_batch(..., trusted=False): the same validated charts,
+    collected into a ChartBatch.
+  - read_chart_batch(..., trusted=True): for output we produced ourselves.
+    Lines are parsed to plain values and go straight into ChartBatch
+    columns; no model is built and nothing is validated, so malformed
+    input fails with a KeyError/TypeError or, worse, wrong values.
+
+There is no trusted AstrologicalData path: building the models without
+validation (model_construct) runs in Python and is slower than pydantic's
+validating parser. See benchmarks/bench_ingest.py.
+"""
+
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Tuple, Union
+
+from pydantic_core import from_json
+
+from astro_engine.aspects import PHASES
+from astro_engine.batch import MOTIONS, ChartBatch
+from astro_engine.instrument import span
+from astro_engine.models import AstrologicalData
+
+Source = Union[str, Path, IO[bytes], IO[str]]
+
+_MOTION_CODES = {motion: i for i, motion in enumerate(MOTIONS)}
+_PHASE_CODES = {phase: i for i, phase in enumerate(PHASES)}
+_CUSP_NAMES = [str(h + 1) for h in range(12)]
+
+
+def parse_chart(raw: Union[bytes, str]) -> AstrologicalData:
+    """A validated chart from its JSON text."""
+    with span("chart.validate"):
+        return AstrologicalData.model_validate_json(raw)
+
+
+def ndjson_lines(source: Source) -> Iterator[Union[bytes, str]]:
+    """The non-blank lines of an NDJSON file or stream, read as they come."""
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fp:
+            yield from ndjson_lines(fp)
+        return
+    for line in source:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def iter_charts(source: Source) -> Iterator[AstrologicalData]:
+    """Validated charts of an NDJSON file or stream, one at a time."""
+    for line in ndjson_lines(source):
+        yield parse_chart(line)
+
+
+def read_chart_batch(source: Source, trusted: bool = False) -> ChartBatch:
+    """
+    All charts of an NDJSON file or stream as a ChartBatch. trusted=True
+    skips validation and the models; see the module docstring.
+    """
+    if not trusted:
+        return ChartBatch.from_charts(iter_charts(source))
+
+    body_names: List[str] = []
+    threshold = 0.0
+    definitions: Dict[Tuple[str, str, int], int] = {}
+    index: Dict[str, int] = {}
+    metas, bodies, cusps, edges = [], [], [], []
+    for i, line in enumerate(ndjson_lines(source)):
+        chart = from_json(line, cache_strings="keys")
+        meta, planets, houses = chart["meta"], chart["planets"], chart["houses"]
+        if not body_names:
+            body_names = list(planets["bodies"])
+            threshold = planets["station_threshold_speed_lon_deg_per_day"]
+            index = {name: j for j, name in enumerate(body_names)}
+
+        geo = meta["geo"]
+        metas.append(
+            (
+                meta["local"],
+                meta["ut"],
+                meta["jd_ut"],
+                geo["lat"],
+                geo["lon"],
+                meta["hsys"],
+                meta["tz"]["tzid"],
+                houses["asc"]["lon"],
+                houses["mc"]["lon"],
+            )
+        )
+        chart_bodies = planets["bodies"]
+        row = []
+        for name in body_names:
+            b = chart_bodies[name]
+            row.append(
+                (b["lon"], b["lat"], b["dist_au"], b["speed_lon_deg_per_day"])
+                + (_MOTION_CODES[b["motion"]], b["house"])
+            )
+        bodies.append(row)
+        chart_cusps = houses["cusps"]
+        cusps.append([chart_cusps[h]["lon"] for h in _CUSP_NAMES])
+
+        for aspect in chart["aspects"]:
+            d = aspect["aspect"]
+            kind = definitions.setdefault(
+                (d["name"], d["symbol"], d["angle"]), len(definitions)
+            )
+            edges.append(
+                (i, index[aspect["body1"]], index[aspect["body2"]], kind)
+                + (aspect["orb"], _PHASE_CODES[aspect["phase"]])
+            )
+
+    if not metas:
+        raise ValueError("Expected at least one chart")
+    return ChartBatch._from_rows(
+        body_names, list(definitions), metas, bodies, cusps, edges, threshold
+    )
@@ -0,0 +1,369 @@
+"""
+Timing spans, counters and histograms for the chart pipeline.
+
+Instrumentation is off by default, and then every hook is a check of one
+global and returns a shared no-op. configure_instrumentation() turns it on:
+
+    spans = []
+    configure_instrumentation(exporters=[spans.append])
+    get_chart(...)
+    get_instrumentation().metrics()   # counters and duration histograms
+
+Spans are named after the stage they time:
+
+    get_chart         one get_chart call (backend attribute)
+    swecli.spawn      running the binary, until it exits
+    swecli.read_json  reading its JSON back from the temporary file
+    chart.compute     the in-process engine (charts attribute)
+    chart.validate    JSON -> AstrologicalData
+    pool.request      one worker pool round trip
+    geocode           one geocoder lookup (cache misses only)
+    tz.lookup         timezone lookups (points attribute)
+    render.draw       building a chart figure
+    render.encode     figure -> image file bytes
+    render.wheel      a chart on a WheelCache wheel
+    table.build       one table (table attribute)
+    service.request   one HTTP request to the chart service (path attribute)
+    service.batch     one ChartBatcher batch (charts attribute)
+
+Every finished span is added to the duration histogram of its name and
+handed to each exporter: any callable taking a SpanRecord, LoggingExporter,
+or OpenTelemetryExporter to replay the spans into an OpenTelemetry tracer.
+Spans nest through a context variable, so each record knows its parent.
+"""
+
+import bisect
+import contextvars
+import functools
+import itertools
+import logging
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+# upper bounds in seconds, from 10 µs to 10 s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    1e-5,
+    5e-5,
+    1e-4,
+    5e-4,
+    1e-3,
+    5e-3,
+    1e-2,
+    5e-2,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+
+
+class SpanRecord(NamedTuple):
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    start_ns: int  # wall clock, ns since the epoch
+    duration: float  # seconds
+    attributes: Dict[str, Any]
+    error: Optional[str]  # exception type that ended the span
+
+    @property
+    def end_ns(self) -> int:
+        return self.start_ns + int(self.duration * 1e9)
+
+
+Exporter = Callable[[SpanRecord], None]
+
+
+class HistogramStats(NamedTuple):
+    count: int
+    total: float
+    min: float
+    max: float
+    buckets: List[Tuple[float, int]]  # (upper bound, observations <= it)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Histogram:
+    """Observations in fixed buckets, plus their count, sum, min and max."""
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = list(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float):
+        self._counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def stats(self) -> HistogramStats:
+        cumulative = list(itertools.accumulate(self._counts))
+        return HistogramStats(
+            count=self.count,
+            total=self.total,
+            min=self.min if self.count else 0.0,
+            max=self.max if self.count else 0.0,
+            buckets=list(zip(self.bounds + [float("inf")], cumulative)),
+        )
+
+
+class Metrics(NamedTuple):
+    counters: Dict[str, float]
+    histograms: Dict[str, HistogramStats]
+
+
+_current: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "astro_engine_span", default=None
+)
+
+
+class Span:
+    """A running span; use it as a context manager."""
+
+    __slots__ = (
+        "_owner",
+        "name",
+        "attributes",
+        "span_id",
+        "_parent",
+        "_token",
+        "_start_ns",
+        "_start",
+    )
+
+    def __init__(self, owner: "Instrumentation", name: str, attributes: Dict):
+        self._owner = owner
+        self.name = name
+        self.attributes = attributes
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.span_id = next(self._owner._ids)
+        self._parent = _current.get()
+        self._token = _current.set(self.span_id)
+        self._start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start
+        _current.reset(self._token)
+        self._owner._finish(
+            SpanRecord(
+                name=self.name,
+                span_id=self.span_id,
+                parent_id=self._parent,
+                start_ns=self._start_ns,
+                duration=duration,
+                attributes=self.attributes,
+                error=exc_type.__name__ if exc_type is not None else None,
+            )
+        )
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Instrumentation:
+    """Collects spans into histograms and counters and hands them on."""
+
+    def __init__(
+        self,
+        exporters: Iterable[Exporter] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.exporters: List[Exporter] = list(exporters)
+        self.buckets = list(buckets)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        return Span(self, name, attributes if attributes is not None else {})
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def _finish(self, record: SpanRecord):
+        self.observe(record.name, record.duration)
+        if record.error is not None:
+            self.count(f"{record.name}.errors")
+        for exporter in self.exporters:
+            try:
+                exporter(record)
+            except Exception:
+                logger.exception("Span exporter %r failed", exporter)
+
+    def metrics(self) -> Metrics:
+        with self._lock:
+            return Metrics(
+                counters=dict(self._counters),
+                histograms={k: h.stats() for k, h in self._histograms.items()},
+            )
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class LoggingExporter:
+    """Logs every span at `level` on the astro_engine.instrument logger."""
+
+    def __init__(self, level: int = logging.DEBUG):
+        self.level = level
+
+    def __call__(self, record: SpanRecord):
+        if logger.isEnabledFor(self.level):
+            logger.log(
+                self.level,
+                "%s %.3f ms %s%s",
+                record.name,
+                record.duration * 1000.0,
+                record.attributes,
+                f" ({record.error})" if record.error else "",
+            )
+
+
+class OpenTelemetryExporter:
+    """
+    Replays spans into an OpenTelemetry tracer (opentelemetry-api), with
+    their own start and end times and parents. Children finish before their
+    parents, so a trace is held back until its outermost span has finished.
+    """
+
+    def __init__(self, tracer):
+        from opentelemetry import trace  # type: ignore
+
+        self._trace = trace
+        self.tracer = tracer
+        self._lock = threading.Lock()
+        self._pending: Dict[Optional[int], List[SpanRecord]] = {}
+
+    def __call__(self, record: SpanRecord):
+        with self._lock:
+            if record.parent_id is not None:
+                self._pending.setdefault(record.parent_id, []).append(record)
+                return
+            self._emit(record, None)
+
+    def _emit(self, record: SpanRecord, parent):
+        context = self._trace.set_span_in_context(parent) if parent else None
+        span = self.tracer.start_span(
+            record.name,
+            context=context,
+            attributes=record.attributes,
+            start_time=record.start_ns,
+        )
+        if record.error is not None:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+            span.set_attribute("error.type", record.error)
+        for child in self._pending.pop(record.span_id, []):
+            self._emit(child, span)
+        span.end(end_time=record.end_ns)
+
+
+_instrumentation: Optional[Instrumentation] = None
+
+
+def configure_instrumentation(
+    exporters: Iterable[Exporter] = (),
+    enabled: bool = True,
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Optional[Instrumentation]:
+    """
+    Turn instrumentation on with a fresh Instrumentation, or off with
+    enabled=False. Exporters are called with every finished SpanRecord.
+    """
+    global _instrumentation
+    _instrumentation = Instrumentation(exporters, buckets) if enabled else None
+    return _instrumentation
+
+
+def get_instrumentation() -> Optional[Instrumentation]:
+    """The active Instrumentation, None while it is off."""
+    return _instrumentation
+
+
+def span(name: str, **attributes: Any):
+    """A span context manager; a shared no-op while instrumentation is off."""
+    instrumentation = _instrumentation
+    if instrumentation is None:
+        return _NOOP
+    return Span(instrumentation, name, attributes)
+
+
+def count(name: str, value: float = 1):
+    instrumentation = _instrumentation
+    if instrumentation is not None:
+        instrumentation.count(name, value)
+
+
+def observe(name: str, value: float):
+    instrumentation = _instrumentation
+    if instrumentation is not None:
+        instrumentation.observe(name, value)
+
+
+def traced(name: str, **attributes: Any):
+    """Decorator: run the function inside span(name, **attributes)."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            instrumentation = _instrumentation
+            if instrumentation is None:
+                return func(*args, **kwargs)
+            with Span(instrumentation, name, dict(attributes)):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,285 @@
+"""
+Vectorized local time -> UT conversion.
+
+Each IANA zone gets a transition table: the UTC instants at which its
+offset changes and the offset from each instant on. The instants come from
+the zone's TZif file (the one zoneinfo reads, from the system or the tzdata
+package); past the last explicit transition, where the file's POSIX rule
+takes over, they are found by probing zoneinfo and bisecting to the second.
+The offsets themselves are always zoneinfo's, so results match
+
+    local.replace(tzinfo=ZoneInfo(tzid)).astimezone(timezone.utc)
+
+A whole array of local times is then converted with one searchsorted per
+zone. Local times in a DST gap (nonexistent) or overlap (ambiguous) follow
+explicit policies and are reported in the returned status codes. The other
+way, utc_to_local(), is always unambiguous.
+"""
+
+import os
+import struct
+import threading
+from datetime import datetime
+from importlib import resources
+from typing import Dict, List, Literal, Sequence, Tuple
+from zoneinfo import TZPATH, ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+# status codes returned with converted times
+LOCAL_OK = 0
+LOCAL_AMBIGUOUS = 1  # the wall time happened twice (clocks turned back)
+LOCAL_NONEXISTENT = 2  # the wall time was skipped (clocks turned forward)
+
+# Probe step when searching for rule-based transitions; DST rules never
+# change the offset twice within a week
+PROBE_STEP_SECONDS = 7 * 86400
+# Tables are extended this far past the latest time asked for
+EXTEND_MARGIN_SECONDS = 366 * 86400
+
+_EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+_US_PER_DAY = 86_400_000_000
+
+Ambiguous = Literal["earlier", "later", "raise"]
+Nonexistent = Literal["forward", "backward", "raise"]
+
+
+def _tzif_bytes(key: str) -> bytes:
+    """The TZif file zoneinfo uses for key: TZPATH first, then tzdata."""
+    for root in TZPATH:
+        path = os.path.join(root, key)
+        if os.path.isfile(path):
+            with open(path, "rb") as fp:
+                return fp.read()
+    try:
+        package, _, name = f"tzdata.zoneinfo.{key}".replace("/", ".").rpartition(".")
+        return resources.files(package).joinpath(name).read_bytes()
+    except (ImportError, OSError, ValueError) as e:
+        raise ZoneInfoNotFoundError(f"No time zone found with key {key}") from e
+
+
+def _tzif_transitions(data: bytes) -> Tuple[np.ndarray, str]:
+    """Transition instants (UTC seconds) and the POSIX TZ footer of a TZif file."""
+    if data[:4] != b"TZif":
+        raise ValueError("Not a TZif file")
+
+    def counts(offset: int) -> Tuple[int, ...]:
+        # isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt
+        return struct.unpack(">6l", data[offset + 20 : offset + 44])
+
+    isut, isstd, leap, time, types, chars = counts(0)
+    if data[4] < ord("2"):  # version 1: 32-bit times, no footer
+        transitions = np.frombuffer(data, ">i4", time, 44).astype(np.int64)
+        return transitions, ""
+
+    # skip the version 1 block to the 64-bit one
+    start = 44 + time * 5 + types * 6 + chars + leap * 8 + isstd + isut
+    isut, isstd, leap, time, types, chars = counts(start)
+    body = start + 44
+    transitions = np.frombuffer(data, ">i8", time, body).astype(np.int64)
+    end = body + time * 9 + types * 6 + chars + leap * 12 + isstd + isut
+    footer = data[end:].strip(b"\n").decode("ascii")
+    return transitions, footer
+
+
+class ZoneTable:
+    """Offset periods of one zone: offsets[k] applies from starts[k] (UTC seconds)."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.zone = ZoneInfo(key)
+        transitions, footer = _tzif_transitions(_tzif_bytes(key))
+        self._instants: List[int] = sorted(set(transitions.tolist()))
+        # a footer with a DST rule keeps producing transitions after the file's
+        if "," in footer:
+            self.covered_until = self._instants[-1] if self._instants else None
+        else:
+            self.covered_until = float("inf")
+        self._build()
+
+    def _offset(self, instant: int) -> int:
+        offset = datetime.fromtimestamp(instant, tz=self.zone).utcoffset()
+        return int(offset.total_seconds())  # type: ignore
+
+    def _build(self):
+        instants = np.array(self._instants, dtype=np.int64)
+        first = int(instants[0]) - 1 if instants.size else 0
+        offsets = [self._offset(first)] + [self._offset(t) for t in self._instants]
+        self.starts = np.concatenate([[np.iinfo(np.int64).min], instants])
+        self.offsets = np.array(offsets, dtype=np.int64)
+
+    def extend(self, start: int, until: int):
+        """Make sure the table is complete over [start, until] (UTC seconds)."""
+        covered = self.covered_until
+        if covered is not None and covered >= until:
+            return
+        t = start if covered is None else int(covered)
+        until += EXTEND_MARGIN_SECONDS
+        found = []
+        offset = self._offset(t)
+        while t < until:
+            probe = min(t + PROBE_STEP_SECONDS, until)
+            changed = self._offset(probe)
+            if changed != offset:
+                low, high = t, probe  # offset(low) == offset, offset(high) changed
+                while high - low > 1:
+                    mid = (low + high) // 2
+                    if self._offset(mid) == offset:
+                        low = mid
+                    else:
+                        high = mid
+                found.append(high)
+                offset = self._offset(high)
+                t = high
+            else:
+                t = probe
+        self._instants = sorted(set(self._instants).union(found))
+        self.covered_until = until
+        self._build()
+
+    def to_utc(
+        self,
+        local: np.ndarray,
+        ambiguous: Ambiguous = "earlier",
+        nonexistent: Nonexistent = "forward",
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        UTC seconds and status codes of local wall times (seconds since the
+        epoch, as if they were UTC).
+        """
+        # period k is valid for local times in [starts[k] + offsets[k],
+        # starts[k+1] + offsets[k]); after a transition the new period may
+        # start before the old one ended (overlap) or after it (gap)
+        bounds = np.iinfo(np.int64)
+        changes = self.starts[1:]
+        period_start = np.concatenate([[bounds.min], changes + self.offsets[1:]])
+        period_end = np.append(changes + self.offsets[:-1], bounds.max)
+
+        k = np.searchsorted(period_start, local, "right") - 1
+        in_period = local < period_end[k]
+        overlap = (k > 0) & (local < period_end[np.maximum(k - 1, 0)])
+        gap = ~in_period
+
+        before = self.offsets[np.maximum(k - 1, 0)]
+        own = self.offsets[k]
+        after = self.offsets[np.minimum(k + 1, self.offsets.size - 1)]
+        offset = own.copy()
+        if overlap.any():
+            if ambiguous == "raise":
+                raise ValueError(f"Ambiguous local time in {self.key}")
+            offset[overlap] = (before if ambiguous == "earlier" else own)[overlap]
+        if gap.any():
+            if nonexistent == "raise":
+                raise ValueError(f"Nonexistent local time in {self.key}")
+            offset[gap] = (own if nonexistent == "forward" else after)[gap]
+
+        status = np.where(
+            gap, LOCAL_NONEXISTENT, np.where(overlap, LOCAL_AMBIGUOUS, LOCAL_OK)
+        )
+        return local - offset, status.astype(np.int8)
+
+    def to_local(self, utc: np.ndarray) -> np.ndarray:
+        """Local wall times (seconds since the epoch, as if UTC) of UTC seconds."""
+        return utc + self.offsets[np.searchsorted(self.starts, utc, "right") - 1]
+
+
+_tables: Dict[str, ZoneTable] = {}
+_tables_lock = threading.Lock()
+
+
+def zone_table(key: str) -> ZoneTable:
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            table = _tables[key] = ZoneTable(key)
+        return table
+
+
+def local_to_utc(
+    local: np.ndarray,
+    tzids: Sequence[str],
+    ambiguous: Ambiguous = "earlier",
+    nonexistent: Nonexistent = "forward",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    UT of each local datetime64 in its zone, and LOCAL_* status codes.
+
+    ambiguous picks the "earlier" (clocks not yet turned back) or "later"
+    occurrence of a repeated wall time; nonexistent maps a skipped wall time
+    "forward" (with the offset before the transition, so 02:30 in a one hour
+    gap becomes 03:30) or "backward" (01:30). "raise" raises ValueError. The
+    defaults match datetime's fold=0.
+    """
+    local = np.asarray(local, dtype="datetime64[us]")
+    micros = local.astype(np.int64)
+    seconds, fraction = np.divmod(micros, 1_000_000)
+    zones, inverse = np.unique(np.asarray(tzids, dtype=str), return_inverse=True)
+    inverse = inverse.ravel()
+
+    utc = np.empty_like(seconds)
+    status = np.empty(seconds.size, dtype=np.int8)
+    for z, key in enumerate(zones.tolist()):
+        rows = np.flatnonzero(inverse == z)
+        table = zone_table(key)
+        local_seconds = seconds[rows]
+        with _tables_lock:
+            # UTC is within a day of the local time
+            table.extend(
+                int(local_seconds.min()) - 86400, int(local_seconds.max()) + 86400
+            )
+            utc[rows], status[rows] = table.to_utc(
+                local_seconds, ambiguous, nonexistent
+            )
+    return (utc * 1_000_000 + fraction).astype("datetime64[us]"), status
+
+
+def utc_to_local(utc: np.ndarray, tzid: str) -> np.ndarray:
+    """Local datetime64 wall times in one zone of naive UTC datetime64 values."""
+    micros = np.asarray(utc, dtype="datetime64[us]").astype(np.int64)
+    seconds, fraction = np.divmod(micros, 1_000_000)
+    table = zone_table(tzid)
+    with _tables_lock:
+        if seconds.size:
+            table.extend(int(seconds.min()), int(seconds.max()))
+        local = table.to_local(seconds)
+    return (local * 1_000_000 + fraction).astype("datetime64[us]")
+
+
+def parse_local_datetime(date: str, time: str) -> datetime:
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(f"{date.strip()} {time.strip()}", fmt)
+        except ValueError:
+            continue
+    raise ValueError(f'Failed to parse --date/--time: "{date}" "{time}"')
+
+
+def parse_local_datetimes(dates: Sequence[str], times: Sequence[str]) -> np.ndarray:
+    """datetime64[us] of "YYYY-MM-DD" dates and "HH:MM[:SS[.ffffff]]" times."""
+    text = [f"{d.strip()}T{t.strip()}" for d, t in zip(dates, times)]
+    try:
+        return np.array(text, dtype="datetime64[us]")
+    except ValueError:
+        # formats numpy does not read (single digit fields, ...) or errors
+        moments = [parse_local_datetime(d, t) for d, t in zip(dates, times)]
+        return np.array(moments, dtype="datetime64[us]")
+
+
+def julian_days(moments: np.ndarray) -> np.ndarray:
+    """Julian days of naive datetime64 values; the same floats as julian_day()."""
+    micros = np.asarray(moments, dtype="datetime64[us]").astype(np.int64)
+    days, of_day = np.divmod(micros, _US_PER_DAY)
+    seconds, us = np.divmod(of_day, 1_000_000)
+    day_fraction = (seconds + us / 1e6) / 86400.0
+    return (days + _EPOCH_ORDINAL) + 1721424.5 + day_fraction
+
+
+def format_moments(moments: np.ndarray) -> List[str]:
+    """"YYYY-MM-DD HH:MM:SS.sss" of datetime64 values, like the binary writes."""
+    micros = np.asarray(moments, dtype="datetime64[us]").astype(np.int64)
+    if micros.size == 0:
+        # np.char.replace cannot size an empty array of strings
+        return []
+    millis = (micros + 500) // 1000
+    text = np.datetime_as_string(millis.astype("datetime64[ms]"), unit="ms")
+    return np.char.replace(text, "T", " ").tolist()
@@ -26,6 +26,12 @@ class HouseSystem(Enum):
     MORINUS = "M"
 
 
+class ChartBackend(Enum):
+    SWECLI = "swecli"  # bundled swecli/main binary, one process per chart
+    PYTHON = "python"  # in-process engine reading the .se1 files directly
+    POOL = "pool"  # persistent worker processes, see astro_engine.pool
+
+
 class TZInfo(BaseModel):
     mode: Literal["tzid", "offset", "local"] | str  # allow future modes
     tzid: Optional[str] = None
@@ -99,6 +105,29 @@ class Aspect(BaseModel):
     phase: AspectPhase
 
 
+# ---------- Transits ----------
+
+
+class TransitEvent(BaseModel):
+    chart: int  # position of the natal chart in the scanned batch
+    jd_ut: float
+    ut: str
+    transit: str
+    natal: str
+    aspect: AspectDefinition
+    lon: float
+    speed_lon_deg_per_day: float
+    motion: Motion
+
+
+class StationEvent(BaseModel):
+    jd_ut: float
+    ut: str
+    body: str
+    lon: float
+    motion: Motion  # motion after the station
+
+
 # ---------- Results ----------
 
 
@@ -0,0 +1,288 @@
+"""
+Pool of long-running chart workers.
+
+Each worker is a subprocess that speaks the line-delimited JSON protocol of
+astro_engine.worker (one request per line on stdin, one reply per line on
+stdout). Workers are started once and reused, so a chart costs one round
+trip instead of a process start plus opening the ephemeris files.
+
+The pool checks a worker is alive before handing it out, restarts workers
+that crash or time out, and can ping idle workers in the background.
+"""
+
+import itertools
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from astro_engine.instrument import span
+from astro_engine.models import AstrologicalData, HouseSystem
+
+MODULE_DIR = Path(__file__).resolve().parent
+
+# The pure-Python worker shipped with the package
+PYTHON_WORKER = [sys.executable, "-m", "astro_engine.worker"]
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_TIMEOUT = 30.0
+PING_TIMEOUT = 5.0
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+class _Worker:
+    """One worker process plus a thread that turns its stdout into a queue."""
+
+    def __init__(self, command: Sequence[str]):
+        env = dict(os.environ)
+        # let `python -m astro_engine.worker` import the package from anywhere
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (str(MODULE_DIR.parent), env.get("PYTHONPATH")) if p
+        )
+        self.process = subprocess.Popen(
+            list(command),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            env=env,
+        )
+        self.replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        assert self.process.stdout is not None
+        for line in self.process.stdout:
+            self.replies.put(line)
+        self.replies.put(None)  # EOF: the process is gone
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def send(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        assert self.process.stdin is not None
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerCrashed(f"Chart worker is not accepting requests: {e}") from e
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(deadline - time.monotonic(), 0.0)
+            try:
+                line = self.replies.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError(
+                    f"Chart worker did not answer within {timeout:g}s"
+                ) from None
+            if line is None:
+                raise WorkerCrashed(
+                    f"Chart worker exited with code {self.process.wait()}"
+                )
+            try:
+                reply = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise WorkerCrashed(f"Chart worker wrote an invalid reply: {e}") from e
+            # replies to earlier, abandoned requests are skipped
+            if reply.get("id") == message["id"]:
+                return reply
+
+    def stop(self):
+        if self.process.stdin is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """
+    size workers running `command` (the pure-Python worker by default).
+    Requests block until a worker is free; each one fails with TimeoutError
+    after `timeout` seconds, and the worker that timed out is restarted.
+    With health_interval set, idle workers are pinged that often.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        command: Optional[Sequence[str]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        health_interval: Optional[float] = None,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.command = list(command or PYTHON_WORKER)
+        self.timeout = timeout
+        self.restarts = 0
+        self._restarts_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # None once the pool is closed, handed on from caller to caller
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        self._closed = threading.Event()
+        for _ in range(size):
+            self._idle.put(_Worker(self.command))
+
+        self._health_thread = None
+        if health_interval:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(health_interval,), daemon=True
+            )
+            self._health_thread.start()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _restart(self, worker: _Worker) -> _Worker:
+        worker.process.kill()
+        worker.stop()
+        with self._restarts_lock:
+            self.restarts += 1
+        return _Worker(self.command)
+
+    def _take(self) -> _Worker:
+        worker = self._idle.get()
+        if worker is None:
+            # closed while this caller waited: wake the next one too
+            self._idle.put(None)
+            raise RuntimeError("Worker pool is closed")
+        return worker
+
+    def request(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Send one protocol message and return the "result" of its reply."""
+        if self._closed.is_set():
+            raise RuntimeError("Worker pool is closed")
+        timeout = self.timeout if timeout is None else timeout
+        message = {**message, "id": next(self._ids)}
+
+        with span("pool.request", op=message.get("op")):
+            worker = self._take()
+            try:
+                if not worker.alive():
+                    worker = self._restart(worker)
+                reply = worker.send(message, timeout)
+            except (TimeoutError, WorkerCrashed):
+                worker = self._restart(worker)
+                raise
+            finally:
+                self._idle.put(worker)
+
+        if not reply.get("ok"):
+            raise RuntimeError(f"Chart worker failed: {reply.get('error')}")
+        return reply["result"]
+
+    def chart(
+        self,
+        date: str,
+        time: str,
+        latitude: float,
+        longitude: float,
+        house_system: HouseSystem,
+        timezone_IANA_id: str,
+        timeout: Optional[float] = None,
+    ) -> AstrologicalData:
+        result = self.request(
+            {
+                "op": "chart",
+                "date": date,
+                "time": time,
+                "latitude": latitude,
+                "longitude": longitude,
+                "house_system": house_system.value,
+                "timezone_IANA_id": timezone_IANA_id,
+            },
+            timeout=timeout,
+        )
+        with span("chart.validate"):
+            return AstrologicalData.model_validate(result)
+
+    def health_check(self) -> int:
+        """Ping every idle worker and restart the ones that do not answer."""
+        workers: List[_Worker] = []
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is None:
+                self._idle.put(None)
+                break
+            workers.append(worker)
+
+        restarted = 0
+        for worker in workers:
+            try:
+                ping = {"op": "ping", "id": next(self._ids)}
+                healthy = worker.alive() and worker.send(ping, PING_TIMEOUT)["ok"]
+            except (TimeoutError, WorkerCrashed):
+                healthy = False
+            if not healthy:
+                worker = self._restart(worker)
+                restarted += 1
+            self._idle.put(worker)
+        return restarted
+
+    def _health_loop(self, interval: float):
+        while not self._closed.wait(interval):
+            self.health_check()
+
+    def close(self):
+        """Stop all workers. Waits for requests in flight to hand theirs back."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        for _ in range(self.size):
+            worker = self._idle.get()
+            if worker is None:  # closed by another thread meanwhile
+                self._idle.put(None)
+                return
+            worker.stop()
+        # requests still waiting for a worker raise instead of hanging
+        self._idle.put(None)
+
+
+_default_pool: Optional[WorkerPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def configure_pool(
+    size: int = DEFAULT_POOL_SIZE,
+    command: Optional[Sequence[str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    health_interval: Optional[float] = None,
+) -> WorkerPool:
+    """Replace the pool used by get_chart(..., backend=ChartBackend.POOL)."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+        _default_pool = WorkerPool(size, command, timeout, health_interval)
+        return _default_pool
+
+
+def get_pool() -> WorkerPool:
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool()
+        return _default_pool
@@ -0,0 +1,257 @@
+"""
+Parallel batch rendering of chart images to files.
+
+render_batch() renders a stream of charts - AstrologicalData objects, or a
+JSON Lines file with one chart per line - into a directory of PNG or SVG
+files, on a pool of worker processes:
+
+    python -m astro_engine.render_batch charts.jsonl -o images/ --format png
+
+Each worker sets the Agg backend and keeps one WheelCache, so the wheel is
+set up once per worker rather than once per chart (SVG needs no matplotlib
+at all). Workers write the files themselves; the parent only reads the
+input, in chunks, and never has more than max_pending chunks in flight, so
+memory stays flat however long the stream is. Workers are replaced after
+MAX_CHUNKS_PER_WORKER chunks, which bounds what matplotlib accumulates.
+
+Images are written to a temporary file and renamed into place, so an image
+that exists is complete: with resume=True (the default), running the same
+batch again after an interruption skips the charts already rendered.
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from astro_engine.models import AstrologicalData
+from astro_engine.svg_render import write_chart_svg
+
+ImageFormat = Literal["png", "svg"]
+
+DEFAULT_TITLE = "Astrological Chart"
+# Charts per task: enough to amortize the round trip to the worker
+DEFAULT_CHUNK_SIZE = {"png": 8, "svg": 64}
+# Chunks a worker renders before it is replaced by a fresh process
+MAX_CHUNKS_PER_WORKER = 256
+PART_SUFFIX = ".part"
+
+# (file name, chart JSON)
+_Task = Tuple[str, str]
+
+
+@dataclass
+class RenderStats:
+    rendered: int = 0
+    skipped: int = 0  # already on disk (resume)
+    failed: int = 0
+    elapsed: float = 0.0  # seconds
+    errors: List[Tuple[str, str]] = field(default_factory=list)  # (file, error)
+
+    @property
+    def charts_per_second(self) -> float:
+        return self.rendered / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.rendered} rendered, {self.skipped} skipped, "
+            f"{self.failed} failed in {self.elapsed:.1f} s "
+            f"({self.charts_per_second:.1f} charts/s)"
+        )
+
+
+def default_name(index: int, fmt: ImageFormat) -> str:
+    return f"chart-{index:06d}.{fmt}"
+
+
+def read_charts(path: Union[str, Path]) -> Iterator[str]:
+    """Chart JSON texts of a JSON Lines file, skipping blank lines."""
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            line = line.strip()
+            if line:
+                yield line
+
+
+# Worker side: one wheel per process, built on first use
+_wheel = None
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _write_image(path: Path, chart: AstrologicalData, fmt: ImageFormat, title: str):
+    global _wheel
+    part = path.with_name(path.name + PART_SUFFIX)
+    if fmt == "svg":
+        with open(part, "w", encoding="utf-8") as fp:
+            write_chart_svg(chart, fp, title)
+    else:
+        if _wheel is None:
+            from astro_engine.chart_render import WheelCache
+
+            _wheel = WheelCache()
+        part.write_bytes(_wheel.render(chart, title))
+    os.replace(part, path)
+
+
+def _render_chunk(
+    tasks: Sequence[_Task], output_dir: str, fmt: ImageFormat, title: str
+) -> Tuple[int, List[Tuple[str, str]]]:
+    """Render a chunk; one bad chart does not cost the others."""
+    rendered, errors = 0, []
+    for name, text in tasks:
+        try:
+            chart = AstrologicalData.model_validate_json(text)
+            _write_image(Path(output_dir) / name, chart, fmt, title)
+            rendered += 1
+        except Exception as e:
+            errors.append((name, f"{type(e).__name__}: {e}"))
+    return rendered, errors
+
+
+def render_batch(
+    charts: Union[Iterable[Union[AstrologicalData, str]], str, Path],
+    output_dir: Union[str, Path],
+    fmt: ImageFormat = "png",
+    title: str = DEFAULT_TITLE,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    resume: bool = True,
+    name: Callable[[int, ImageFormat], str] = default_name,
+    progress: Optional[Callable[[RenderStats], None]] = None,
+) -> RenderStats:
+    """
+    Render every chart to output_dir/name(index, fmt); see the module
+    docstring. charts is an iterable of AstrologicalData or chart JSON texts,
+    or the path of a JSON Lines file. workers defaults to the CPU count
+    (0 renders in this process), max_pending to twice the workers. progress
+    is called with the running totals after each chunk. Charts that fail are
+    counted and listed in the returned stats rather than raised.
+    """
+    if fmt not in DEFAULT_CHUNK_SIZE:
+        raise ValueError(f'Unknown image format "{fmt}", expected png or svg')
+    if isinstance(charts, (str, Path)):
+        charts = read_charts(charts)
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE[fmt]
+    max_pending = max_pending or 2 * max(workers, 1)
+
+    stats = RenderStats()
+    start = time.perf_counter()
+
+    def tasks() -> Iterator[_Task]:
+        for index, chart in enumerate(charts):
+            file_name = name(index, fmt)
+            if resume and (output / file_name).exists():
+                stats.skipped += 1
+                continue
+            if isinstance(chart, AstrologicalData):
+                chart = chart.model_dump_json()
+            yield file_name, chart
+
+    def collect(rendered: int, errors: List[Tuple[str, str]]):
+        stats.rendered += rendered
+        stats.failed += len(errors)
+        stats.errors.extend(errors)
+        stats.elapsed = time.perf_counter() - start
+        if progress is not None:
+            progress(stats)
+
+    stream = iter(tasks())
+    chunks = iter(lambda: list(itertools.islice(stream, chunk_size)), [])
+
+    if workers == 0:
+        _init_worker()
+        for chunk in chunks:
+            collect(*_render_chunk(chunk, str(output), fmt, title))
+        return stats
+
+    pool = ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        max_tasks_per_child=MAX_CHUNKS_PER_WORKER,
+    )
+    pending: Set[Future] = set()
+    try:
+        for chunk in chunks:
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(*future.result())
+            pending.add(pool.submit(_render_chunk, chunk, str(output), fmt, title))
+        for future in wait(pending).done:
+            collect(*future.result())
+    finally:
+        # on an interruption, drop the queued chunks; rendered files stay
+        pool.shutdown(wait=True, cancel_futures=True)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Render a JSON Lines file of charts to PNG or SVG images."
+    )
+    parser.add_argument("charts", type=Path, help="one chart JSON per line")
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--title", default=DEFAULT_TITLE)
+    parser.add_argument("--workers", type=int, help="default: CPU count")
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help="render charts whose image already exists again",
+    )
+    args = parser.parse_args(argv)
+
+    def report(stats: RenderStats):
+        print(f"\r{stats}", end="", file=sys.stderr, flush=True)
+
+    stats = render_batch(
+        args.charts,
+        args.output,
+        fmt=args.format,
+        title=args.title,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        resume=args.resume,
+        progress=report,
+    )
+    print(file=sys.stderr)
+    print(stats)
+    for file_name, error in stats.errors:
+        print(f"{file_name}: {error}", file=sys.stderr)
+    if stats.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+"""
+Local HTTP chart service.
+
+    python -m astro_engine.service --port 8000 [--geonames cities15000.txt]
+
+The process keeps the engine, the geocode cache and the timezone index
+loaded, and answers:
+
+    GET  /chart?date=1990-04-12&time=08:15&place=Copenhagen&format=png
+    GET  /chart?date=...&time=...&lat=55.6761&lon=12.5683[&tz=Europe/Copenhagen]
+    POST /chart      the same fields as a JSON object
+    POST /charts     {"charts": [{...}, ...]} -> {"charts": [chart, ...]}
+    GET  /health
+    GET  /stats      ChartBatcher counters
+
+house_system is a HouseSystem value or name (default P), format is json
+(the AstrologicalData of get_chart), png or svg; /charts answers JSON only.
+Without tz the zone is looked up from the coordinates.
+
+Charts are computed by a ChartBatcher: requests that arrive within a few
+milliseconds of each other go to the engine as one vectorized batch, and a
+request identical to one already queued or running waits for that one.
+Connections are kept alive (HTTP/1.1), and /chart answers carry an ETag
+derived from the inputs and the engine version, so a matching
+If-None-Match is answered 304 without computing anything.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from astro_engine.astro import backend_version
+from astro_engine.chart_render import WheelCache
+from astro_engine.engine import ChartEngine, compute_charts, get_engine
+from astro_engine.gazetteer import Gazetteer
+from astro_engine.geo import configure_geocoder, get_place_coordinates, get_resolver
+from astro_engine.instrument import span
+from astro_engine.models import AstrologicalData, ChartBackend, HouseSystem
+from astro_engine.svg_render import render_chart_svg
+from astro_engine.timezone import get_IANA_tz, get_timezone_resolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8000
+# how long the first request of a batch waits for others
+DEFAULT_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 256
+DEFAULT_RENDER_THREADS = 2
+REQUEST_TIMEOUT = 60.0
+MAX_BODY_BYTES = 10 * 1024 * 1024
+TITLE = "Astrological Chart"
+
+FORMATS = {"json": "application/json", "png": "image/png", "svg": "image/svg+xml"}
+
+
+class ChartRequest(NamedTuple):
+    date: str
+    time: str
+    latitude: float
+    longitude: float
+    house_system: HouseSystem
+    tzid: str
+
+
+def _house_system(value: Any) -> HouseSystem:
+    text = str(value).strip().upper()
+    if text in HouseSystem.__members__:
+        return HouseSystem[text]
+    return HouseSystem(text)
+
+
+def parse_request(fields: Mapping[str, Any]) -> ChartRequest:
+    """
+    The chart asked for by a query string or JSON object: date, time, and
+    place or lat/lon, with optional tz and house_system. Raises ValueError.
+    """
+    missing = [name for name in ("date", "time") if not fields.get(name)]
+    if missing:
+        raise ValueError(f"Missing field(s): {', '.join(missing)}")
+    if fields.get("lat") is not None and fields.get("lon") is not None:
+        try:
+            latitude, longitude = float(fields["lat"]), float(fields["lon"])
+        except TypeError:
+            raise ValueError("Expected numbers for lat and lon") from None
+    elif fields.get("place"):
+        place = get_place_coordinates(str(fields["place"]))
+        latitude, longitude = place.latitude, place.longitude
+    else:
+        raise ValueError("Expected place, or lat and lon")
+    tzid = fields.get("tz")
+    if tzid:
+        try:
+            ZoneInfo(str(tzid))
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone {tzid!r}") from None
+    else:
+        tzid = get_IANA_tz(latitude, longitude)
+    return ChartRequest(
+        date=str(fields["date"]),
+        time=str(fields["time"]),
+        latitude=latitude,
+        longitude=longitude,
+        house_system=_house_system(fields.get("house_system", "P")),
+        tzid=str(tzid),
+    )
+
+
+class BatcherStats(NamedTuple):
+    requests: int  # charts asked for
+    coalesced: int  # answered by an identical computation already under way
+    batches: int  # engine calls
+    charts: int  # charts computed
+
+
+class ChartBatcher:
+    """
+    Groups chart requests into engine batches. The first request of a
+    batch waits up to `window` seconds for more (at most max_batch), then
+    the whole batch is computed at once on a background thread.
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        engine: Optional[ChartEngine] = None,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self.engine = engine
+        self._cond = threading.Condition()
+        self._queue: "OrderedDict[ChartRequest, Future]" = OrderedDict()
+        self._inflight: Dict[ChartRequest, Future] = {}
+        self._closed = False
+        self._requests = self._coalesced = self._batches = self._charts = 0
+        self._thread = threading.Thread(
+            target=self._loop, name="chart-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, request: ChartRequest) -> "Future[AstrologicalData]":
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Chart batcher is closed")
+            self._requests += 1
+            future = self._inflight.get(request)
+            if future is not None:
+                self._coalesced += 1
+                return future
+            future = self._inflight[request] = Future()
+            self._queue[request] = future
+            self._cond.notify()
+            return future
+
+    def chart(
+        self, request: ChartRequest, timeout: Optional[float] = REQUEST_TIMEOUT
+    ) -> AstrologicalData:
+        return self.submit(request).result(timeout)
+
+    def charts(
+        self,
+        requests: Sequence[ChartRequest],
+        timeout: Optional[float] = REQUEST_TIMEOUT,
+    ) -> List[AstrologicalData]:
+        futures = [self.submit(request) for request in requests]
+        return [future.result(timeout) for future in futures]
+
+    def _take(self) -> List[Tuple[ChartRequest, Future]]:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            deadline = time.monotonic() + self.window
+            while len(self._queue) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            count = min(len(self._queue), self.max_batch)
+            return [self._queue.popitem(last=False) for _ in range(count)]
+
+    def _loop(self):
+        while True:
+            batch = self._take()
+            if not batch:
+                return  # closed and drained
+            self._run(batch)
+
+    def _run(self, batch: List[Tuple[ChartRequest, Future]]):
+        requests = [request for request, _ in batch]
+        try:
+            with span("service.batch", charts=len(batch)):
+                charts = list(
+                    compute_charts(
+                        [r.date for r in requests],
+                        [r.time for r in requests],
+                        [r.latitude for r in requests],
+                        [r.longitude for r in requests],
+                        [r.house_system for r in requests],
+                        [r.tzid for r in requests],
+                        engine=self.engine,
+                    )
+                )
+        except Exception as e:
+            if len(batch) > 1:
+                # one bad request fails the batch; find it by going one by one
+                for item in batch:
+                    self._run([item])
+                return
+            self._settle(batch, [e])
+            return
+        self._settle(batch, charts)
+
+    def _settle(self, batch: List[Tuple[ChartRequest, Future]], results: list):
+        with self._cond:
+            self._batches += 1
+            self._charts += len(batch)
+            for request, _ in batch:
+                del self._inflight[request]
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> BatcherStats:
+        with self._cond:
+            return BatcherStats(
+                requests=self._requests,
+                coalesced=self._coalesced,
+                batches=self._batches,
+                charts=self._charts,
+            )
+
+    def close(self):
+        """Stop taking requests; the queued ones are still computed."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+class _HTTPError(Exception):
+    def __init__(
+        self,
+        status: HTTPStatus,
+        message: str,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class ChartHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # the body follows the headers in a second write; with Nagle on, it
+    # waits for the client's delayed ACK (~40 ms) on a kept-alive connection
+    disable_nagle_algorithm = True
+    server: "ChartServer"
+
+    def log_message(self, format: str, *args: Any):
+        logger.debug("%s - " + format, self.address_string(), *args)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_HEAD(self):
+        # answered as GET, without the body
+        self._handle("HEAD")
+
+    def _handle(self, method: str):
+        url = urlsplit(self.path)
+        routes = {
+            "/chart": ("GET", "POST"),
+            "/charts": ("POST",),
+            "/health": ("GET",),
+            "/stats": ("GET",),
+        }
+        try:
+            body = self._read_body()
+            allowed = routes.get(url.path)
+            if allowed is None:
+                raise _HTTPError(HTTPStatus.NOT_FOUND, f"No such endpoint: {url.path}")
+            if "GET" in allowed:
+                allowed += ("HEAD",)
+            if method not in allowed:
+                raise _HTTPError(
+                    HTTPStatus.METHOD_NOT_ALLOWED,
+                    f"{url.path} accepts {', '.join(allowed)}",
+                    {"Allow": ", ".join(allowed)},
+                )
+            with span("service.request", path=url.path):
+                if url.path == "/chart" and method == "POST":
+                    self._chart(self._json(body))
+                elif url.path == "/chart":
+                    self._chart(dict(parse_qsl(url.query)))
+                elif url.path == "/charts":
+                    self._charts(self._json(body))
+                elif url.path == "/health":
+                    self._send_json({"status": "ok"})
+                else:
+                    self._send_json(self.server.batcher.stats()._asdict())
+        except _HTTPError as e:
+            self._send_json({"error": str(e)}, e.status, e.headers)
+        except ValueError as e:
+            self._send_json({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+        except Exception as e:
+            logger.exception("%s %s failed", method, self.path)
+            self._send_json({"error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def _read_body(self) -> bytes:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # the body cannot be skipped, so the connection cannot be reused
+            self.close_connection = True
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise _HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+        return self.rfile.read(length) if length else b""
+
+    @staticmethod
+    def _json(body: bytes) -> Dict[str, Any]:
+        try:
+            fields = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {e}") from e
+        if not isinstance(fields, dict):
+            raise ValueError("Expected a JSON object")
+        return fields
+
+    def _chart(self, fields: Dict[str, Any]):
+        fmt = str(fields.get("format", "json")).lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}, expected one of {list(FORMATS)}")
+        request = parse_request(fields)
+        etag = self.server.etag(request, fmt)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send(HTTPStatus.NOT_MODIFIED, b"", None, headers)
+            return
+        chart = self.server.batcher.chart(request)
+        self._send(HTTPStatus.OK, self.server.encode(chart, fmt), FORMATS[fmt], headers)
+
+    def _charts(self, fields: Dict[str, Any]):
+        items = fields.get("charts")
+        if not isinstance(items, list):
+            raise ValueError('Expected {"charts": [...]}')
+        requests = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f"charts[{i}]: Expected a JSON object")
+            try:
+                requests.append(parse_request(item))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"charts[{i}]: {e}") from e
+        charts = self.server.batcher.charts(requests)
+        body = b'{"charts":[' + b",".join(c.model_dump_json().encode() for c in charts)
+        self._send(HTTPStatus.OK, body + b"]}", FORMATS["json"])
+
+    def _send_json(
+        self,
+        value: Any,
+        status: HTTPStatus = HTTPStatus.OK,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self._send(status, json.dumps(value).encode(), FORMATS["json"], headers)
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: Optional[str],
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.send_response(status)
+        if content_type is not None:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class ChartServer(ThreadingHTTPServer):
+    """A ThreadingHTTPServer for ChartHandler, owning the ChartBatcher."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", DEFAULT_PORT),
+        batcher: Optional[ChartBatcher] = None,
+        render_threads: int = DEFAULT_RENDER_THREADS,
+        title: str = TITLE,
+    ):
+        super().__init__(address, ChartHandler)
+        self.batcher = batcher or ChartBatcher()
+        self.title = title
+        self.version = backend_version(ChartBackend.PYTHON)
+        # a few long-lived threads, so each keeps its WheelCache wheel warm
+        self._wheel = WheelCache()
+        self._renderer = ThreadPoolExecutor(render_threads, "chart-render")
+
+    def etag(self, request: ChartRequest, fmt: str) -> str:
+        text = "|".join([self.version, fmt, self.title, *map(str, request)])
+        return f'"{hashlib.sha256(text.encode()).hexdigest()[:32]}"'
+
+    def encode(self, chart: AstrologicalData, fmt: str) -> bytes:
+        if fmt == "png":
+            future = self._renderer.submit(self._wheel.render, chart, self.title)
+            return future.result(REQUEST_TIMEOUT)
+        if fmt == "svg":
+            return render_chart_svg(chart, self.title).encode()
+        return chart.model_dump_json().encode()
+
+    def warm_up(self):
+        """Load the engine, the geocode cache and the timezone index up front."""
+        get_engine()
+        get_resolver()
+        get_timezone_resolver().precompute()
+        chart = self.batcher.chart(
+            ChartRequest("2000-01-01", "12:00", 0.0, 0.0, HouseSystem.PLACIDUS, "UTC")
+        )
+        self.encode(chart, "png")
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        self._renderer.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Serve charts over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=DEFAULT_WINDOW,
+        help="seconds a request waits for others to batch with",
+    )
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--render-threads", type=int, default=DEFAULT_RENDER_THREADS)
+    parser.add_argument(
+        "--geonames", help="geocode offline from a GeoNames dump instead of Nominatim"
+    )
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+
+    if args.geonames:
+        configure_geocoder(Gazetteer.from_geonames(args.geonames))
+    server = ChartServer(
+        (args.host, args.port),
+        batcher=ChartBatcher(args.window, args.max_batch),
+        render_threads=args.render_threads,
+    )
+    server.warm_up()
+    logger.info("Serving charts on http://%s:%d", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Chart wheel as SVG, without matplotlib.
+
+Draws the same chart as render_astrological_chart (sign ring rotated to the
+ASC, cusps, ASC/MC markers, planet glyphs stacked by cluster_by_longitude,
+aspect chords) straight into SVG text, in the coordinates of its 8 in,
+100 dpi figure:
+
+    with open("chart.svg", "w", encoding="utf-8") as fp:
+        write_chart_svg(chart, fp)
+
+The rotation-independent part (background, rings, title) and the sign
+boundaries are built once and reused; a chart adds one rotated group and a
+few dozen elements. Label boxes are sized from average glyph widths, so they
+can differ from matplotlib's by a pixel or two.
+"""
+
+import io
+import math
+from functools import lru_cache
+from typing import List, Sequence, TextIO
+from xml.sax.saxutils import escape
+
+from astro_engine.models import AstrologicalData
+from astro_engine.wheel import (
+    ASPECT_R,
+    CUSP_LABEL_R,
+    HIDDEN_BODIES,
+    MARKER_LABEL_R,
+    PLANET_GLYPH_R,
+    PLANET_GLYPHS,
+    PLANET_LINE_R,
+    PLANET_STACK_STEP,
+    SIGN_BOUNDARY_LW,
+    SIGN_GLYPHS,
+    SIGN_LABEL_R,
+    WHEEL_INNER_R,
+    WHEEL_LIMIT_R,
+    WHEEL_OUTER_R,
+    WHEEL_RING_LW,
+    RotatedChart,
+    stack_levels,
+)
+
+# The figure of render_astrological_chart after tight_layout, in pixels
+CANVAS_PX = 800
+CENTER_X = 400.0
+CENTER_Y = 421.2755
+PX_PER_R = 363.7245 / WHEEL_LIMIT_R
+TITLE_BASELINE_Y = 29.7732
+PX_PER_PT = 100 / 72
+
+FONT_FAMILY = "DejaVu Sans, Bitstream Vera Sans, Arial, sans-serif"
+
+MARKER_COLOR = "crimson"
+
+
+def _pt(points: float) -> str:
+    return f"{points * PX_PER_PT:.2f}"
+
+
+def _xy(lon: float, r: float):
+    """Pixel position of a (rotated) longitude: 0° at 9 o'clock, counter-clockwise."""
+    theta = math.radians(lon)
+    radius = r * PX_PER_R
+    return CENTER_X - radius * math.cos(theta), CENTER_Y + radius * math.sin(theta)
+
+
+def _radial(lons: Sequence[float], r0: float, r1: float) -> str:
+    parts = []
+    for lon in lons:
+        x0, y0 = _xy(lon, r0)
+        x1, y1 = _xy(lon, r1)
+        parts.append(f"M{x0:.2f} {y0:.2f}L{x1:.2f} {y1:.2f}")
+    return "".join(parts)
+
+
+def _text_width(text: str, font_px: float, bold: bool = False) -> float:
+    """Rough DejaVu Sans advance width of text."""
+    width = 0.0
+    for c in text:
+        if c.isdigit():
+            width += 0.64
+        elif c.isascii():
+            width += 0.8 if bold else 0.72
+        else:
+            width += 0.9
+    return width * font_px
+
+
+def _label(
+    x: float,
+    y: float,
+    text: str,
+    font_pt: float,
+    color: str,
+    pad: float,
+    box_alpha: float,
+    bold: bool = False,
+) -> str:
+    """Centered text on a rounded white box, like matplotlib's bbox=dict(...)."""
+    font_px = font_pt * PX_PER_PT
+    pad_px = pad * font_px
+    width = _text_width(text, font_px, bold) + 2 * pad_px
+    height = font_px + 2 * pad_px
+    weight = ' font-weight="bold"' if bold else ""
+    return (
+        f'<rect x="{x - width / 2:.2f}" y="{y - height / 2:.2f}" '
+        f'width="{width:.2f}" height="{height:.2f}" rx="{pad_px:.2f}" '
+        f'fill="white" fill-opacity="{box_alpha}"/>'
+        f'<text x="{x:.2f}" y="{y:.2f}" dominant-baseline="central" '
+        f'font-size="{font_px:.2f}"{weight} '
+        f'fill="{color}">{escape(text)}</text>'
+    )
+
+
+@lru_cache(maxsize=64)
+def _header(title: str, size: int) -> str:
+    """Everything that does not depend on the chart."""
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {CANVAS_PX} {CANVAS_PX}" font-family="{FONT_FAMILY}" '
+        f'text-anchor="middle">'
+        f'<rect width="{CANVAS_PX}" height="{CANVAS_PX}" fill="white"/>'
+        f'<circle cx="{CENTER_X}" cy="{CENTER_Y}" r="{WHEEL_OUTER_R * PX_PER_R:.2f}" '
+        f'fill="none" stroke="black" stroke-width="{_pt(WHEEL_RING_LW)}"/>'
+        f'<circle cx="{CENTER_X}" cy="{CENTER_Y}" r="{WHEEL_INNER_R * PX_PER_R:.2f}" '
+        f'fill="none" stroke="black" stroke-width="{_pt(SIGN_BOUNDARY_LW)}"/>'
+        f'<text x="{CENTER_X}" y="{TITLE_BASELINE_Y}" font-size="{_pt(14)}" '
+        f">{escape(title)}</text>"
+    )
+
+
+# Sign boundaries with the ASC at 0° Aries; charts rotate the group
+_SIGN_BOUNDARIES = (
+    f'<path d="{_radial([i * 30.0 for i in range(12)], WHEEL_INNER_R, WHEEL_OUTER_R)}" '
+    f'stroke="black" stroke-width="{_pt(SIGN_BOUNDARY_LW)}" stroke-linecap="square"/>'
+)
+_TEXT = '<text x="{:.2f}" y="{:.2f}" dominant-baseline="central" '
+_SIGN_GLYPH = _TEXT + 'font-size="' + _pt(22) + '">{}</text>'
+_PLANET_GLYPH = _TEXT + 'font-size="' + _pt(16) + '" fill="{}">{}</text>'
+_TRIANGLE_SPREAD = 1.2  # degrees
+
+
+def _chart_parts(data: AstrologicalData, title: str, size: int) -> List[str]:
+    view = RotatedChart(data)
+    parts = [_header(title, size)]
+
+    # Sign ring: boundaries as one rotated group, glyphs upright
+    offset = (-view.asc_lon) % 360.0
+    parts.append(
+        f'<g transform="rotate({-offset:.4f} {CENTER_X} {CENTER_Y})">'
+        f"{_SIGN_BOUNDARIES}</g>"
+    )
+    for i, glyph in enumerate(SIGN_GLYPHS):
+        x, y = _xy(i * 30.0 + 15.0 + offset, SIGN_LABEL_R)
+        parts.append(_SIGN_GLYPH.format(x, y, glyph))
+
+    # Cusps
+    cusp_lons = view.cusp_lons.tolist()
+    parts.append(
+        f'<path d="{_radial(cusp_lons, 0.0, WHEEL_INNER_R)}" stroke="black" '
+        f'stroke-width="{_pt(0.9)}" stroke-linecap="square"/>'
+    )
+    for lon, name in zip(cusp_lons, view.cusp_names):
+        x, y = _xy(lon, CUSP_LABEL_R)
+        parts.append(_label(x, y, str(name), 9, "black", 0.12, 0.75))
+
+    # ASC and MC markers
+    marker_lons = view.marker_lons.tolist()
+    parts.append(
+        f'<path d="{_radial(marker_lons, WHEEL_INNER_R, WHEEL_OUTER_R)}" '
+        f'stroke="{MARKER_COLOR}" stroke-width="{_pt(2.5)}" stroke-linecap="square"/>'
+    )
+    triangles = []
+    for lon in marker_lons:
+        tip = _xy(lon, WHEEL_OUTER_R + 0.1)
+        left = _xy(lon - _TRIANGLE_SPREAD, WHEEL_OUTER_R - 0.05)
+        right = _xy(lon + _TRIANGLE_SPREAD, WHEEL_OUTER_R - 0.05)
+        triangles.append(
+            f"M{tip[0]:.2f} {tip[1]:.2f}L{left[0]:.2f} {left[1]:.2f}"
+            f"L{right[0]:.2f} {right[1]:.2f}Z"
+        )
+    parts.append(
+        f'<path d="{"".join(triangles)}" fill="{MARKER_COLOR}" '
+        f'stroke="{MARKER_COLOR}" stroke-width="{_pt(1.0)}" opacity="0.9"/>'
+    )
+    for lon, name in zip(marker_lons, ["ASC", "MC"]):
+        x, y = _xy(lon, MARKER_LABEL_R)
+        parts.append(_label(x, y, name, 10, MARKER_COLOR, 0.2, 0.85, bold=True))
+
+    # Planets: leader lines grouped by color, glyphs stacked by cluster
+    bodies = data.planets.bodies
+    lons = dict(zip(view.body_names, view.body_lons.tolist()))
+    levels = stack_levels(view.body_names, list(lons.values()))
+    shown = [name for name in view.body_names if name not in HIDDEN_BODIES]
+    colors = {
+        name: "red" if bodies[name].motion == "RETRO" else "black" for name in shown
+    }
+    for color in ("black", "red"):
+        group = [lons[name] for name in shown if colors[name] == color]
+        if group:
+            parts.append(
+                f'<path d="{_radial(group, WHEEL_OUTER_R, PLANET_LINE_R)}" stroke="{color}" '
+                f'stroke-width="{_pt(1.0)}" stroke-linecap="square"/>'
+            )
+    for name in shown:
+        x, y = _xy(lons[name], PLANET_GLYPH_R + levels[name] * PLANET_STACK_STEP)
+        glyph = PLANET_GLYPHS.get(name, name[:2])
+        parts.append(_PLANET_GLYPH.format(x, y, colors[name], escape(glyph)))
+
+    # Aspect chords, on top of everything like matplotlib's overlay axes
+    chords = {"blue": [], "red": []}
+    labels = []
+    for aspect in data.aspects:
+        if aspect.aspect.name == "Conjunction":
+            continue
+        color = "blue" if aspect.aspect.name in ["Trine", "Sextile"] else "red"
+        x1, y1 = _xy(lons[aspect.body1], ASPECT_R)
+        x2, y2 = _xy(lons[aspect.body2], ASPECT_R)
+        chords[color].append(f"M{x1:.2f} {y1:.2f}L{x2:.2f} {y2:.2f}")
+        mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+        labels.append(_label(mx, my, aspect.aspect.symbol, 9, "black", 0.15, 0.8))
+    for color, paths in chords.items():
+        if paths:
+            parts.append(
+                f'<path d="{"".join(paths)}" stroke="{color}" stroke-opacity="0.7" '
+                f'stroke-width="{_pt(1.2)}" stroke-linecap="square"/>'
+            )
+    parts.extend(labels)
+    parts.append("</svg>")
+    return parts
+
+
+def write_chart_svg(
+    data: AstrologicalData,
+    stream: TextIO,
+    title: str = "Astrological Chart",
+    size: int = CANVAS_PX,
+):
+    """Write the chart wheel as an SVG document (size x size pixels) to stream."""
+    stream.write("".join(_chart_parts(data, title, size)))
+
+
+def render_chart_svg(
+    data: AstrologicalData, title: str = "Astrological Chart", size: int = CANVAS_PX
+) -> str:
+    buf = io.StringIO()
+    write_chart_svg(data, buf, title, size)
+    return buf.getvalue()
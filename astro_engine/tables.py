@@ -1,8 +1,15 @@
+from typing import Iterable, Sequence, Union
+
+import numpy as np
 import pandas as pd
 
+from astro_engine.aspects import PHASES
+from astro_engine.batch import MOTIONS, SIGNS, ChartBatch, sign_dms
+from astro_engine.instrument import traced
 from astro_engine.models import AstrologicalData, Body
 
 
+@traced("table.build", table="planets_table")
 def planets_table(chart: AstrologicalData):
     rows = []
     for name, b in chart.planets.bodies.items():
@@ -20,6 +27,7 @@ def planets_table(chart: AstrologicalData):
     return pd.DataFrame(rows)
 
 
+@traced("table.build", table="houses_table")
 def houses_table(chart: AstrologicalData):
     rows = []
 
@@ -44,6 +52,7 @@ def houses_table(chart: AstrologicalData):
     return pd.DataFrame(rows)
 
 
+@traced("table.build", table="aspects_table")
 def aspects_table(chart: AstrologicalData):
     rows = []
     for a in chart.aspects:
@@ -57,3 +66,117 @@ def aspects_table(chart: AstrologicalData):
             }
         )
     return pd.DataFrame(rows)
+
+
+# ---------- Many charts: long-format tables ----------
+
+
+def dms_text(lon: float) -> str:
+    """Position within the sign of a longitude, as in the DMS columns."""
+    if np.isnan(lon):
+        return "NaN"
+    _, deg, minutes, sec = sign_dms(round(float(lon) % 360.0, 6) % 360.0)
+    return f"{deg:02d}°{minutes:02d}'{sec:05.2f}\""
+
+
+# "DD°MM'" for every whole minute of a sign (and 30°00' where the rounding
+# carries into the next degree) and "SS.cc\"" for every centi-second
+_DEG_MIN = np.array(
+    [f"{i // 60:02d}°{i % 60:02d}'" for i in range(30 * 60 + 1)], dtype=object
+)
+_SEC = np.array([f"{i // 100:02d}.{i % 100:02d}\"" for i in range(6000)], dtype=object)
+
+
+def _near_half(x: np.ndarray) -> np.ndarray:
+    return np.abs(x - np.floor(x) - 0.5) < 1e-6
+
+
+def dms_texts(lon: np.ndarray) -> np.ndarray:
+    """
+    dms_text of every longitude, as an object array of the same strings.
+    Rounds in whole centi-seconds; values close to a rounding tie, where
+    that could differ from round(), are formatted by dms_text.
+    """
+    lon = np.asarray(lon, dtype=float).reshape(-1)
+    finite = np.isfinite(lon)
+    lon360 = np.where(finite, lon, 0.0) % 360.0
+    norm = np.round(lon360, 6) % 360.0
+    centi = (norm - 30.0 * (norm // 30.0)) * 360000.0
+    cs = np.rint(centi).astype(np.int64)
+    text = _DEG_MIN[cs // 6000] + _SEC[cs % 6000]
+    for i in np.flatnonzero(~finite | _near_half(lon360 * 1e6) | _near_half(centi)):
+        text[i] = dms_text(lon[i])
+    return text
+
+
+def _batch(charts: Union[ChartBatch, Iterable[AstrologicalData]]) -> ChartBatch:
+    return charts if isinstance(charts, ChartBatch) else ChartBatch.from_charts(charts)
+
+
+def _categorical(codes: np.ndarray, categories: Sequence[str]) -> pd.Categorical:
+    return pd.Categorical.from_codes(np.asarray(codes, dtype=np.int64), categories)
+
+
+def _signs(lon: np.ndarray) -> pd.Categorical:
+    return _categorical((lon // 30.0).astype(np.int64), SIGNS)
+
+
+@traced("table.build", table="planets_tables")
+def planets_tables(charts: Union[ChartBatch, Iterable[AstrologicalData]]):
+    """
+    planets_table of many charts as one long DataFrame, built column by
+    column: a row per chart and body, with the chart's position in a Chart
+    column. Body, Sign and Motion are categorical; DMS is the same text as
+    in planets_table.
+    """
+    batch = _batch(charts)
+    n, bodies = batch.lon.shape
+    lon = batch.lon.reshape(-1)
+    return pd.DataFrame(
+        {
+            "Chart": np.repeat(np.arange(n), bodies),
+            "Body": _categorical(np.tile(np.arange(bodies), n), batch.body_names),
+            "Sign": _signs(lon),
+            "DMS": dms_texts(lon),
+            "Lon": lon,
+            "House": batch.house.reshape(-1),
+            "Motion": _categorical(batch.motion.reshape(-1), MOTIONS),
+            "Speed (deg/day)": batch.speed.reshape(-1),
+        }
+    )
+
+
+@traced("table.build", table="houses_tables")
+def houses_tables(charts: Union[ChartBatch, Iterable[AstrologicalData]]):
+    """houses_table of many charts as one long DataFrame; see planets_tables."""
+    batch = _batch(charts)
+    n = len(batch)
+    # per chart: AC, MC, then the 12 cusps
+    lon = np.column_stack([batch.asc, batch.mc, batch.cusps]).reshape(-1)
+    labels = ["AC", "MC"] + [str(h + 1) for h in range(12)]
+    return pd.DataFrame(
+        {
+            "Chart": np.repeat(np.arange(n), len(labels)),
+            "House": _categorical(np.tile(np.arange(len(labels)), n), labels),
+            "Sign": _signs(lon),
+            "DMS": dms_texts(lon),
+            "Lon": lon,
+        }
+    )
+
+
+@traced("table.build", table="aspects_tables")
+def aspects_tables(charts: Union[ChartBatch, Iterable[AstrologicalData]]):
+    """aspects_table of many charts as one long DataFrame; see planets_tables."""
+    batch = _batch(charts)
+    kinds = [f"{d.symbol} ({d.name})" for d in batch.aspect_definitions]
+    return pd.DataFrame(
+        {
+            "Chart": batch.aspect_chart,
+            "Body 1": _categorical(batch.aspect_body1, batch.body_names),
+            "Aspect": _categorical(batch.aspect_kind, kinds),
+            "Body 2": _categorical(batch.aspect_body2, batch.body_names),
+            "Orb": batch.aspect_orb,
+            "Phase": _categorical(batch.aspect_phase, PHASES),
+        }
+    )
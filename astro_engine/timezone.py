@@ -1,8 +1,151 @@
-from timezonefinder import timezone_at
+"""
+IANA timezone lookup.
+
+Coordinates are grouped into h3 cells at timezonefinder's shortcut
+resolution. A cell that lies entirely inside one timezone answers from the
+cell -> tzid map (the fast path); only points in border cells go through the
+exact polygon test, whose answers are kept in an LRU cache.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import h3
+from timezonefinder import TimezoneFinder
+
+from astro_engine.instrument import span
+
+try:
+    from timezonefinder.configs import SHORTCUT_H3_RES as TZ_CELL_RESOLUTION
+except ImportError:  # older timezonefinder
+    TZ_CELL_RESOLUTION = 3
+
+DEFAULT_CACHE_SIZE = 65536
+
+
+class TimezoneStats(NamedTuple):
+    fast: int  # answered by the cell map
+    cached: int  # border points answered by the LRU cache
+    exact: int  # border points that needed a polygon test
+    cells: int  # cells in the map
+    currsize: int  # points in the LRU cache
+
+
+class TimezoneResolver:
+    """Cell-quantized timezone lookups; see the module docstring."""
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._finder = TimezoneFinder()
+        self._lock = threading.Lock()
+        self._cells: Dict[str, Optional[str]] = {}  # None: border cell
+        self._exact: "OrderedDict[Tuple[float, float], Optional[str]]" = OrderedDict()
+        self._fast = self._cached = self._exact_hits = 0
+
+    def _cell_zone(self, cell: str) -> Optional[str]:
+        zone = self._cells.get(cell, "")
+        if zone == "":
+            lat, lon = h3.cell_to_latlng(cell)
+            zone = self._cells[cell] = self._finder.unique_timezone_at(lng=lon, lat=lat)
+        return zone
+
+    def _point_zone(self, lat: float, lon: float) -> Optional[str]:
+        key = (lat, lon)
+        if key in self._exact:
+            self._exact.move_to_end(key)
+            self._cached += 1
+            return self._exact[key]
+        zone = self._finder.timezone_at(lng=lon, lat=lat)
+        self._exact_hits += 1
+        self._exact[key] = zone
+        if len(self._exact) > self.cache_size:
+            self._exact.popitem(last=False)
+        return zone
+
+    def _zone(self, lat: float, lon: float) -> Optional[str]:
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            raise ValueError(f"Coordinates out of range: {lat}, {lon}")
+        zone = self._cell_zone(h3.latlng_to_cell(lat, lon, TZ_CELL_RESOLUTION))
+        if zone is not None:
+            self._fast += 1
+            return zone
+        return self._point_zone(lat, lon)
+
+    def timezone(self, latitude: float, longitude: float) -> Optional[str]:
+        with span("tz.lookup", points=1), self._lock:
+            return self._zone(float(latitude), float(longitude))
+
+    def precompute(self):
+        """Fill the cell map for the whole globe up front."""
+        cells = [
+            cell
+            for base in h3.get_res0_cells()
+            for cell in h3.cell_to_children(base, TZ_CELL_RESOLUTION)
+        ]
+        with self._lock:
+            for cell in cells:
+                self._cell_zone(cell)
+
+    def resolve(
+        self, latitudes: Sequence[float], longitudes: Sequence[float]
+    ) -> List[Optional[str]]:
+        """
+        Timezone of every point (None where there is none). Each distinct
+        point is looked up, and counted in stats(), once per call.
+        """
+        zones: Dict[Tuple[float, float], Optional[str]] = {}
+        points = list(zip(map(float, latitudes), map(float, longitudes)))
+        with span("tz.lookup", points=len(points)), self._lock:
+            for point in points:
+                if point not in zones:
+                    zones[point] = self._zone(*point)
+        return [zones[point] for point in points]
+
+    def stats(self) -> TimezoneStats:
+        with self._lock:
+            return TimezoneStats(
+                fast=self._fast,
+                cached=self._cached,
+                exact=self._exact_hits,
+                cells=len(self._cells),
+                currsize=len(self._exact),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+            self._exact.clear()
+            self._fast = self._cached = self._exact_hits = 0
+
+
+_resolver: Optional[TimezoneResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_timezone_resolver() -> TimezoneResolver:
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = TimezoneResolver()
+        return _resolver
+
+
+def get_IANA_tzs(
+    latitudes: Sequence[float], longitudes: Sequence[float]
+) -> List[str]:
+    """Batch get_IANA_tz. get_timezone_resolver().stats() counts the paths taken."""
+    if len(latitudes) != len(longitudes):
+        raise ValueError("Expected as many latitudes as longitudes")
+    zones = get_timezone_resolver().resolve(latitudes, longitudes)
+    missing = [i for i, zone in enumerate(zones) if zone is None]
+    if missing:
+        raise ValueError(f"No timezone ID found for points {missing}")
+    return zones  # type: ignore
 
 
 def get_IANA_tz(latitude: float, longitude: float) -> str:
-    tz_id = timezone_at(lat=latitude, lng=longitude)
+    tz_id = get_timezone_resolver().timezone(latitude, longitude)
 
     if tz_id is None:
         raise ValueError("No timezone ID found")
@@ -0,0 +1,524 @@
+"""
+Transit and station scanner.
+
+Finds the exact times in a date range when transiting bodies form aspects to
+natal positions, and when they station retrograde or direct, for many natal
+charts at once.
+
+The transiting bodies are sampled once on a coarse grid shared by every natal
+chart. Sign changes of the speed bracket the stations, which are refined and
+added to the grid, so between two grid points a body moves in one direction
+only. A target longitude is then crossed at most once per interval and the
+intervals that cross it are found with a sorted search. Only the brackets
+that contain an event are refined, all of them together in a few vectorized
+Newton / false-position iterations, so the cost grows with the number of
+events rather than with the grid resolution.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from astro_engine.aspects import ASPECT_TYPES, MAJOR_ASPECTS, AspectType
+from astro_engine.batch import MOTIONS, ChartBatch
+from astro_engine.engine import (
+    BODY_NAMES,
+    J2000,
+    PLANETS,
+    ChartEngine,
+    _format_moment,
+    delta_t,
+    get_engine,
+    julian_day,
+    mean_node,
+    planet_positions,
+    true_node,
+)
+from astro_engine.ephemeris import Ephemeris
+from astro_engine.models import (
+    AspectDefinition,
+    AstrologicalData,
+    StationEvent,
+    TransitEvent,
+)
+
+# Grid spacing. It must be shorter than the shortest retrograde or direct
+# spell of the scanned bodies; the true node turns every few days.
+DEFAULT_STEP_DAYS = 1.0
+NODE_STEP_DAYS = 0.25
+
+# Event times are refined to about a second
+DEFAULT_TOLERANCE_DAYS = 1e-5
+MAX_ITERATIONS = 60
+
+Natal = Union[ChartBatch, AstrologicalData, Sequence[AstrologicalData]]
+Moment = Union[datetime, float]
+# evaluate(t, rows) -> (values, slopes or None), see _refine
+Evaluate = Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, Optional[np.ndarray]]]
+
+
+def _wrap(angle: np.ndarray) -> np.ndarray:
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def _jd_ut(moment: Moment) -> float:
+    """Julian day (UT) of a datetime (naive means UT) or a Julian day."""
+    if isinstance(moment, datetime):
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        return julian_day(moment)
+    return float(moment)
+
+
+def _ut_text(jd_ut: float) -> str:
+    return _format_moment(datetime(2000, 1, 1, 12) + timedelta(days=jd_ut - J2000))
+
+
+def body_positions(
+    ephem: Ephemeris, jd_ut: np.ndarray, names: Sequence[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitude and speed of the named bodies (any of BODY_NAMES): (n, len(names))."""
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    jd_tt = jd_ut + delta_t(jd_ut) / 86400.0
+    lon = np.empty((jd_ut.size, len(names)))
+    speed = np.empty((jd_ut.size, len(names)))
+
+    planets = [name for name in names if name in PLANETS]
+    positions = planet_positions(ephem, jd_tt, planets) if planets else {}
+    nodes = {}
+    for j, name in enumerate(names):
+        if name in positions:
+            lon[:, j] = positions[name]["lon"]
+            speed[:, j] = positions[name]["speed"]
+            continue
+        if name not in BODY_NAMES:
+            raise ValueError(f'Unknown body "{name}"')
+        kind = name.split()[0]  # "True" or "Mean"
+        if kind not in nodes:
+            if kind == "True":
+                node_lon, _, node_speed = true_node(ephem, jd_tt)
+            else:
+                node_lon, node_speed = mean_node(jd_tt)
+            nodes[kind] = (node_lon, node_speed)
+        node_lon, node_speed = nodes[kind]
+        south = 180.0 if name.endswith("S.Node") else 0.0
+        lon[:, j] = (node_lon + south) % 360.0
+        speed[:, j] = node_speed
+    return lon, speed
+
+
+def _refine(
+    evaluate: Evaluate,
+    a: np.ndarray,
+    b: np.ndarray,
+    fa: np.ndarray,
+    fb: np.ndarray,
+    tolerance: float,
+    guess: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Roots of many functions at once, each bracketed by [a, b] with fa and fb
+    of opposite signs (or zero). evaluate(t, rows) returns the values of the
+    functions `rows` at t and, when known, their slopes: steps are Newton
+    steps where those stay inside the bracket and Illinois false-position
+    steps otherwise. The first guess defaults to a false-position step.
+    """
+    a, b, fa, fb = (np.array(v, dtype=float) for v in (a, b, fa, fb))
+    root = np.where(fb == 0.0, b, a)
+    pending = np.flatnonzero((fa != 0.0) & (fb != 0.0))
+    if guess is None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            guess = (a * fb - b * fa) / (fb - fa)
+    guess = np.array(guess, dtype=float)
+    side = np.zeros(a.size, dtype=np.int8)  # end replaced last: -1 a, 1 b
+
+    for _ in range(MAX_ITERATIONS):
+        if not pending.size:
+            break
+        i = pending
+        t = guess[i]
+        f, slope = evaluate(t, i)
+
+        # shrink the bracket; Illinois halves the value of an end kept twice
+        move_b = np.sign(f) == np.sign(fb[i])
+        rows_b, rows_a = i[move_b], i[~move_b]
+        b[rows_b], fb[rows_b] = t[move_b], f[move_b]
+        fa[rows_b[side[rows_b] == 1]] *= 0.5
+        a[rows_a], fa[rows_a] = t[~move_b], f[~move_b]
+        fb[rows_a[side[rows_a] == -1]] *= 0.5
+        side[rows_b], side[rows_a] = 1, -1
+
+        step = (a * fb - b * fa)[i] / (fb - fa)[i]
+        if slope is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                newton = t - f / slope
+            inside = (newton > a[i]) & (newton < b[i])
+            step = np.where(inside, newton, step)
+
+        done = (f == 0.0) | (np.abs(step - t) < tolerance) | (b[i] - a[i] < tolerance)
+        root[i[done]] = np.where(f == 0.0, t, step)[done]
+        guess[i] = step
+        pending = i[~done]
+
+    root[pending] = guess[pending]
+    return root
+
+
+def _hermite_root(
+    t0: np.ndarray,
+    t1: np.ndarray,
+    y0: np.ndarray,
+    y1: np.ndarray,
+    m0: np.ndarray,
+    m1: np.ndarray,
+    iterations: int = 4,
+) -> np.ndarray:
+    """
+    Root in [t0, t1] of the cubic Hermite interpolant of values y and slopes
+    m: a first guess for _refine that costs no ephemeris evaluations.
+    """
+    h = t1 - t0
+    m0, m1 = m0 * h, m1 * h
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.clip(np.nan_to_num(y0 / (y0 - y1), nan=0.5), 0.0, 1.0)
+        for _ in range(iterations):
+            s2, s3 = s * s, s * s * s
+            p = (
+                (2 * s3 - 3 * s2 + 1) * y0
+                + (s3 - 2 * s2 + s) * m0
+                + (-2 * s3 + 3 * s2) * y1
+                + (s3 - s2) * m1
+            )
+            dp = (
+                (6 * s2 - 6 * s) * (y0 - y1)
+                + (3 * s2 - 4 * s + 1) * m0
+                + (3 * s2 - 2 * s) * m1
+            )
+            s = np.clip(np.nan_to_num(s - p / dp, nan=0.5), 0.0, 1.0)
+    return t0 + s * h
+
+
+@dataclass
+class _Scan:
+    """Grid samples of the transiting bodies plus their stations."""
+
+    names: List[str]
+    grid: np.ndarray
+    lon: np.ndarray  # (grid, bodies)
+    speed: np.ndarray
+    station_jd: np.ndarray
+    station_body: np.ndarray
+    station_lon: np.ndarray
+    station_motion: np.ndarray  # MOTIONS index of the motion after the station
+
+
+def _scan(
+    ephem: Ephemeris,
+    jd_start: float,
+    jd_end: float,
+    names: Sequence[str],
+    step: Optional[float],
+    tolerance: float,
+) -> _Scan:
+    if jd_end <= jd_start:
+        raise ValueError("Scan end must be after its start")
+    names = list(names)
+    if step is None:
+        nodes = any(name.startswith("True") for name in names)
+        step = NODE_STEP_DAYS if nodes else DEFAULT_STEP_DAYS
+    if step <= 0:
+        raise ValueError("Scan step must be positive")
+
+    grid = np.linspace(jd_start, jd_end, int(np.ceil((jd_end - jd_start) / step)) + 1)
+    lon, speed = body_positions(ephem, grid, names)
+
+    # stations: the speed changes sign between two samples
+    before, after = speed[:-1], speed[1:]
+    to_retro = (before > 0.0) & (after <= 0.0)
+    to_direct = (before < 0.0) & (after >= 0.0)
+    interval, body = np.nonzero(to_retro | to_direct)
+
+    def station_speed(t: np.ndarray, rows: np.ndarray):
+        values = np.empty(t.size)
+        for j in np.unique(body[rows]):
+            mine = body[rows] == j
+            values[mine] = body_positions(ephem, t[mine], [names[j]])[1][:, 0]
+        return values, None
+
+    station_jd = _refine(
+        station_speed,
+        grid[interval],
+        grid[interval + 1],
+        before[interval, body],
+        after[interval, body],
+        tolerance,
+    )
+    station_lon = np.empty(station_jd.size)
+    for j in np.unique(body):
+        mine = body == j
+        station_lon[mine] = body_positions(ephem, station_jd[mine], [names[j]])[0][:, 0]
+
+    return _Scan(
+        names=names,
+        grid=grid,
+        lon=lon,
+        speed=speed,
+        station_jd=station_jd,
+        station_body=body,
+        station_lon=station_lon,
+        station_motion=np.where(to_retro[interval, body], 1, 0),
+    )
+
+
+def _crossings(
+    knots: np.ndarray, lon: np.ndarray, targets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (interval, target) of every target longitude crossed between consecutive
+    knots, where the body moves one way only. A target at a knot counts for
+    the interval ending there.
+    """
+    order = np.argsort(targets)
+    sorted_targets = targets[order]
+    doubled = np.concatenate([sorted_targets, sorted_targets + 360.0])
+
+    delta = _wrap(lon[1:] - lon[:-1])
+    direct = delta >= 0.0
+    # direct motion crosses (lon0, lon1], retrograde motion [lon1, lon0)
+    low = np.where(direct, lon[:-1], lon[1:]) % 360.0
+    high = low + np.abs(delta)
+    left = np.where(
+        direct,
+        np.searchsorted(doubled, low, "right"),
+        np.searchsorted(doubled, low, "left"),
+    )
+    right = np.where(
+        direct,
+        np.searchsorted(doubled, high, "right"),
+        np.searchsorted(doubled, high, "left"),
+    )
+
+    counts = right - left
+    interval = np.repeat(np.arange(counts.size), counts)
+    first = np.repeat(left - (np.cumsum(counts) - counts), counts)
+    position = first + np.arange(counts.sum())
+    return interval, order[position % targets.size]
+
+
+@dataclass
+class StationEvents:
+    """Stations as columns in time order; body indexes body_names, motion MOTIONS."""
+
+    body_names: List[str]
+    jd_ut: np.ndarray
+    body: np.ndarray
+    lon: np.ndarray
+    motion: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.jd_ut)
+
+    def __iter__(self) -> Iterator[StationEvent]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> StationEvent:
+        return StationEvent(
+            jd_ut=round(float(self.jd_ut[i]), 8),
+            ut=_ut_text(float(self.jd_ut[i])),
+            body=self.body_names[self.body[i]],
+            lon=round(float(self.lon[i]), 6),
+            motion=MOTIONS[self.motion[i]],
+        )
+
+
+@dataclass
+class TransitEvents:
+    """
+    Exact transits as columns, sorted by natal chart and time. chart is the
+    natal chart's position in the input, transit and natal index body_names,
+    aspect indexes aspect_definitions; lon and speed belong to the
+    transiting body.
+    """
+
+    body_names: List[str]
+    aspect_definitions: List[AspectDefinition]
+    chart: np.ndarray
+    jd_ut: np.ndarray
+    transit: np.ndarray
+    natal: np.ndarray
+    aspect: np.ndarray
+    lon: np.ndarray
+    speed: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.jd_ut)
+
+    def __iter__(self) -> Iterator[TransitEvent]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> TransitEvent:
+        speed = float(self.speed[i])
+        return TransitEvent(
+            chart=int(self.chart[i]),
+            jd_ut=round(float(self.jd_ut[i]), 8),
+            ut=_ut_text(float(self.jd_ut[i])),
+            transit=self.body_names[self.transit[i]],
+            natal=self.body_names[self.natal[i]],
+            aspect=self.aspect_definitions[self.aspect[i]],
+            lon=round(float(self.lon[i]), 6),
+            speed_lon_deg_per_day=round(speed, 6),
+            motion="RETRO" if speed < 0 else "DIRECT",
+        )
+
+
+def _natal_longitudes(natal: Natal, names: Sequence[str]) -> np.ndarray:
+    if isinstance(natal, ChartBatch):
+        return natal.lon[:, [natal.body_names.index(name) for name in names]]
+    if isinstance(natal, AstrologicalData):
+        natal = [natal]
+    return np.array(
+        [[chart.planets.bodies[name].lon for name in names] for chart in natal],
+        dtype=float,
+    ).reshape(-1, len(names))
+
+
+def find_stations(
+    start: Moment,
+    end: Moment,
+    bodies: Optional[Sequence[str]] = None,
+    step: Optional[float] = None,
+    tolerance: float = DEFAULT_TOLERANCE_DAYS,
+    engine: Optional[ChartEngine] = None,
+) -> StationEvents:
+    """
+    Times between start and end (datetimes, naive meaning UT, or Julian days
+    UT) when the bodies (the planets by default) turn retrograde or direct.
+    """
+    names = list(bodies or PLANETS)
+    ephem = (engine or get_engine()).ephemeris
+    scan = _scan(ephem, _jd_ut(start), _jd_ut(end), names, step, tolerance)
+    order = np.argsort(scan.station_jd, kind="stable")
+    return StationEvents(
+        body_names=names,
+        jd_ut=scan.station_jd[order],
+        body=scan.station_body[order],
+        lon=scan.station_lon[order],
+        motion=scan.station_motion[order],
+    )
+
+
+def find_transits(
+    natal: Natal,
+    start: Moment,
+    end: Moment,
+    transiting: Optional[Sequence[str]] = None,
+    natal_bodies: Optional[Sequence[str]] = None,
+    aspects: Optional[Sequence[Union[str, AspectType]]] = None,
+    step: Optional[float] = None,
+    tolerance: float = DEFAULT_TOLERANCE_DAYS,
+    engine: Optional[ChartEngine] = None,
+) -> TransitEvents:
+    """
+    Exact times between start and end when a transiting body (the planets by
+    default) makes one of the aspects (all major aspects by default) to a
+    natal body (every body of the chart by default), for each natal chart.
+    natal is a ChartBatch, an AstrologicalData or a sequence of them;
+    aspects are AspectTypes or names from ASPECT_TYPES.
+    """
+    transiting = list(transiting or PLANETS)
+    natal_bodies = list(natal_bodies or BODY_NAMES)
+    unknown = [a for a in aspects or [] if isinstance(a, str) and a not in ASPECT_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown aspects: {unknown}")
+    definitions = [
+        ASPECT_TYPES[a] if isinstance(a, str) else a
+        for a in (MAJOR_ASPECTS if aspects is None else aspects)
+    ]
+    body_names = list(dict.fromkeys(transiting + natal_bodies))
+
+    natal_lon = _natal_longitudes(natal, natal_bodies)
+    ephem = (engine or get_engine()).ephemeris
+    scan = _scan(ephem, _jd_ut(start), _jd_ut(end), transiting, step, tolerance)
+
+    # one target longitude per chart, natal body, aspect and side
+    charts, bodies = np.indices(natal_lon.shape)
+    target_chart, target_natal, target_aspect, target_lon = [], [], [], []
+    for k, angle in enumerate(a.angle for a in definitions):
+        for side in (1.0, -1.0) if 0 < angle < 180 else (1.0,):
+            target_chart.append(charts.ravel())
+            target_natal.append(bodies.ravel())
+            target_aspect.append(np.full(natal_lon.size, k))
+            target_lon.append((natal_lon.ravel() + side * angle) % 360.0)
+    target_chart, target_natal, target_aspect, target_lon = (
+        np.concatenate(column) if column else np.empty(0, dtype=int)
+        for column in (target_chart, target_natal, target_aspect, target_lon)
+    )
+
+    natal_index = np.array([body_names.index(name) for name in natal_bodies])
+    index, value = np.empty(0, dtype=int), np.empty(0)
+    columns = [(index, value, index, index, index, value, value)]
+    for j, name in enumerate(transiting):
+        if not target_lon.size:
+            break
+        # the grid plus the stations: the body moves one way between knots
+        station = scan.station_body == j
+        knots = np.concatenate([scan.grid, scan.station_jd[station]])
+        knot_lon = np.concatenate([scan.lon[:, j], scan.station_lon[station]])
+        knot_speed = np.concatenate([scan.speed[:, j], np.zeros(station.sum())])
+        order = np.argsort(knots, kind="stable")
+        knots, knot_lon, knot_speed = knots[order], knot_lon[order], knot_speed[order]
+
+        interval, target = _crossings(knots, knot_lon, target_lon)
+        if not interval.size:
+            continue
+        goal = target_lon[target]
+        before = _wrap(knot_lon[interval] - goal)
+        after = before + _wrap(knot_lon[interval + 1] - knot_lon[interval])
+        # speed at the last evaluation, within the tolerance of the event;
+        # events found exactly on a knot keep the knot's speed
+        speed = knot_speed[interval + 1].copy()
+
+        def offset(t: np.ndarray, rows: np.ndarray, name: str = name):
+            lon, now = body_positions(ephem, t, [name])
+            speed[rows] = now[:, 0]
+            return _wrap(lon[:, 0] - goal[rows]), now[:, 0]
+
+        t0, t1 = knots[interval], knots[interval + 1]
+        guess = _hermite_root(
+            t0, t1, before, after, knot_speed[interval], knot_speed[interval + 1]
+        )
+        jd = _refine(offset, t0, t1, before, after, tolerance, guess)
+        columns.append(
+            (
+                target_chart[target],
+                jd,
+                np.full(jd.size, body_names.index(name)),
+                natal_index[target_natal[target]],
+                target_aspect[target],
+                goal,
+                speed,
+            )
+        )
+
+    chart, jd, transit, natal, aspect, lon, speed = (
+        np.concatenate(column) for column in zip(*columns)
+    )
+    order = np.lexsort((jd, chart))
+    return TransitEvents(
+        body_names=body_names,
+        aspect_definitions=[
+            AspectDefinition(name=a.name, symbol=a.symbol, angle=a.angle)
+            for a in definitions
+        ],
+        chart=chart[order],
+        jd_ut=jd[order],
+        transit=transit[order],
+        natal=natal[order],
+        aspect=aspect[order],
+        lon=lon[order],
+        speed=speed[order],
+    )
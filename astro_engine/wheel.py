@@ -0,0 +1,174 @@
+"""
+Chart wheel layout shared by the renderers: glyphs, radii (in units of the
+outer ring) and the stacking of close planets. No plotting imports, so the
+matplotlib-free SVG renderer can use it.
+"""
+
+from itertools import chain
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+from astro_engine.models import AstrologicalData, Body
+
+SIGN_GLYPHS = ["♈", "♉", "♊", "♋", "♌", "♍", "♎", "♏", "♐", "♑", "♒", "♓"]
+
+# Sign ring geometry and line widths
+WHEEL_OUTER_R = 1.0
+WHEEL_INNER_R = 0.72
+SIGN_LABEL_R = 0.86
+SIGN_BOUNDARY_LW = 1.2
+WHEEL_RING_LW = 2.0
+# Radius shown by the wheel axis
+WHEEL_LIMIT_R = WHEEL_OUTER_R * 1.3
+
+# Label radii of the ASC/MC markers and of the house cusps
+MARKER_LABEL_R = 0.85
+CUSP_LABEL_R = 0.42
+# Planet leader lines run from the outer ring out to this radius
+PLANET_LINE_R = 1.12
+# Aspect chords join points on the inner ring
+ASPECT_R = WHEEL_INNER_R
+
+# Glyph radius of the first planet of a cluster, and the step to the next
+PLANET_GLYPH_R = 1.18
+PLANET_STACK_STEP = 0.05
+# Bodies the chart wheel leaves out
+HIDDEN_BODIES = ["Mean N.Node", "Mean S.Node"]
+
+PLANET_ORDER = [
+    "Sun",
+    "Moon",
+    "Mercury",
+    "Venus",
+    "Mars",
+    "Jupiter",
+    "Saturn",
+    "Uranus",
+    "Neptune",
+    "Pluto",
+    "True N.Node",
+    "True S.Node",
+]
+
+PLANET_GLYPHS = {
+    "Sun": "☉",
+    "Moon": "☽",
+    "Mercury": "☿",
+    "Venus": "♀",
+    "Mars": "♂",
+    "Jupiter": "♃",
+    "Saturn": "♄",
+    "Uranus": "♅",
+    "Neptune": "♆",
+    "Pluto": "♇",
+    "True N.Node": "☊",
+    "True S.Node": "☋",
+}
+
+
+class RotatedChart:
+    """
+    A chart seen with its ASC at 0°, as the wheel draws it. The rotated
+    longitudes of the ASC and MC, the cusps and the bodies are computed
+    together as one array; the model itself is only read, never copied.
+    """
+
+    def __init__(self, data: AstrologicalData):
+        self.data = data
+        houses = data.houses
+        bodies = data.planets.bodies
+        self.asc_lon = houses.asc.lon
+        self.cusp_names = list(houses.cusps)
+        self.body_names = list(bodies)
+        self.index = {name: i for i, name in enumerate(self.body_names)}
+
+        n_cusps = len(self.cusp_names)
+        lons = np.fromiter(
+            chain(
+                (houses.asc.lon, houses.mc.lon),
+                (cusp.lon for cusp in houses.cusps.values()),
+                (body.lon for body in bodies.values()),
+            ),
+            dtype=float,
+            count=2 + n_cusps + len(self.body_names),
+        )
+        rotated = (lons - self.asc_lon) % 360.0
+        self.marker_lons = rotated[:2]  # ASC, MC
+        self.cusp_lons = rotated[2 : 2 + n_cusps]
+        self.body_lons = rotated[2 + n_cusps :]
+
+    def lon(self, body: str) -> float:
+        """Rotated longitude of a body."""
+        return float(self.body_lons[self.index[body]])
+
+    def lons(self, bodies: Sequence[str]) -> np.ndarray:
+        """Rotated longitudes of some bodies, in that order."""
+        return self.body_lons[[self.index[name] for name in bodies]]
+
+
+def _clusters(
+    names: Sequence[str], lons: Sequence[float], threshold_deg: float
+) -> List[List[dict]]:
+    # create list of key, value pairs for planet names and longitudes
+    k_v_pairs = [{"planet": name, "longitude": lon} for name, lon in zip(names, lons)]
+
+    # sort by longitude
+    sorted_pairs = sorted(k_v_pairs, key=lambda p: p["longitude"])
+
+    clusters = []
+
+    curr = [sorted_pairs[0]]
+
+    for prev, item in zip(sorted_pairs, sorted_pairs[1:]):
+        if (item["longitude"] - prev["longitude"]) <= threshold_deg:
+            curr.append(item)
+        else:
+            clusters.append(curr)
+            curr = [item]
+
+    clusters.append(curr)
+
+    # merge first and last if they wrap around near 0/360
+    if len(clusters) > 1:
+        first = clusters[0]
+        last = clusters[-1]
+        if (first[0]["longitude"] + 360.0) - last[-1]["longitude"] <= threshold_deg:
+            clusters[0] = last + first
+            clusters.pop()
+
+    return clusters
+
+
+## To resolve issues with conjunct planets ##
+def cluster_by_longitude(
+    planet_names: List[str],
+    planets: Union[Sequence[Body], Sequence[float]],
+    threshold_deg=3.0,
+) -> List[List[str]]:
+    """
+    items: list of Planets, or their longitudes (e.g. RotatedChart.body_lons)
+    Returns list of clusters, each a list of Planets.
+    Handles wrap-around at 0/360.
+    """
+    lons = [getattr(p, "lon", p) for p in planets]
+    return _clusters(planet_names, lons, threshold_deg)
+
+
+def get_planet_index_in_cluster(clusters, planet_name: str):
+    for cluster in clusters:
+        for i, item in enumerate(cluster):
+            if item["planet"] == planet_name:
+                return i
+
+
+def stack_levels(
+    names: Sequence[str], lons: Sequence[float], threshold_deg: float = 3.0
+) -> Dict[str, int]:
+    """Position of each planet in its cluster (see cluster_by_longitude)."""
+    return {
+        item["planet"]: i
+        for cluster in _clusters(names, lons, threshold_deg)
+        for i, item in enumerate(cluster)
+    }
+
@@ -0,0 +1,72 @@
+"""
+Pure-Python chart worker.
+
+Reads one JSON request per line on stdin and writes one JSON reply per line
+on stdout, so a WorkerPool can keep it running and send it many charts:
+
+  {"id": 1, "op": "chart", "date": "2026-01-02", "time": "15:30",
+   "latitude": 55.6761, "longitude": 12.5683, "house_system": "R",
+   "timezone_IANA_id": "Europe/Copenhagen"}
+  {"id": 2, "op": "ping"}
+
+Replies echo the id:
+
+  {"id": 1, "ok": true, "result": {...AstrologicalData...}}
+  {"id": 2, "ok": true, "result": "pong"}
+  {"id": 3, "ok": false, "error": "..."}
+
+Run with: python -m astro_engine.worker
+"""
+
+import json
+import sys
+from typing import IO, Any, Dict
+
+from astro_engine.engine import ChartEngine, compute_chart
+from astro_engine.models import HouseSystem
+
+
+def handle(request: Dict[str, Any], engine: ChartEngine) -> str:
+    """Reply line (without newline) for one decoded request."""
+    request_id = json.dumps(request.get("id"))
+    op = request.get("op", "chart")
+
+    if op == "ping":
+        return f'{{"id": {request_id}, "ok": true, "result": "pong"}}'
+    if op != "chart":
+        raise ValueError(f'Unknown op "{op}"')
+
+    data = compute_chart(
+        date=request["date"],
+        time=request["time"],
+        latitude=float(request["latitude"]),
+        longitude=float(request["longitude"]),
+        house_system=HouseSystem(request["house_system"]),
+        timezone_IANA_id=request["timezone_IANA_id"],
+        engine=engine,
+    )
+    return f'{{"id": {request_id}, "ok": true, "result": {data.model_dump_json()}}}'
+
+
+def serve(stdin: IO[str], stdout: IO[str]) -> None:
+    # one engine for the worker's lifetime: files are opened once
+    engine = ChartEngine()
+    for line in stdin:
+        if not line.strip():
+            continue
+        request: Dict[str, Any] = {}
+        try:
+            parsed = json.loads(line)
+            if not isinstance(parsed, dict):
+                raise ValueError("Request must be a JSON object")
+            request = parsed
+            reply = handle(request, engine)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            reply = json.dumps({"id": request.get("id"), "ok": False, "error": error})
+        stdout.write(reply + "\n")
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    serve(sys.stdin, sys.stdout)
@@ -0,0 +1,165 @@
+"""
+Accuracy check: the in-process engine against Swiss Ephemeris reference
+positions from 1600 to 2500 (swe_reference.json), offline.
+
+    make accuracy                    # compare, exit status 1 past a tolerance
+    PYTHONPATH=. python benchmarks/accuracy.py --generate   # needs pyswisseph
+
+The reference holds swe_deltat, swe_calc_ut (default flags: apparent,
+geocentric, true equinox of date) for the ten planets and both north nodes,
+and swe_houses_ex for one place per chart, all from the bundled .se1 files.
+--generate recomputes it; the dates and places are fixed below.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from astro_engine.engine import BODY_NAMES, ChartEngine, delta_t
+from astro_engine.ephemeris import EPHE_DIR
+
+REFERENCE = Path(__file__).with_name("swe_reference.json")
+
+# year, month, day, UT hour, latitude, longitude, house system
+CASES = [
+    (1600, 1, 1, 2.75, 52.2297, 21.0122, "P"),
+    (1650, 6, 8, 6.25, 51.5074, -0.1278, "R"),
+    (1700, 11, 15, 9.75, -33.8688, 151.2093, "E"),
+    (1750, 4, 22, 13.25, 40.7128, -74.006, "W"),
+    (1800, 9, 1, 16.75, 64.1466, -21.9426, "T"),
+    (1850, 2, 8, 20.25, 35.6762, 139.6503, "M"),
+    (1900, 7, 15, 23.75, -22.9068, -43.1729, "P"),
+    (1950, 12, 22, 3.25, 1.3521, 103.8198, "R"),
+    (2000, 5, 1, 6.75, 69.6492, 18.9553, "E"),
+    (2050, 10, 8, 10.25, -54.8019, -68.303, "T"),
+    (2100, 3, 15, 13.75, 52.2297, 21.0122, "P"),
+    (2150, 8, 22, 17.25, 51.5074, -0.1278, "R"),
+    (2200, 1, 1, 20.75, -33.8688, 151.2093, "E"),
+    (2250, 6, 8, 0.25, 40.7128, -74.006, "W"),
+    (2300, 11, 15, 3.75, 64.1466, -21.9426, "T"),
+    (2350, 4, 22, 7.25, 35.6762, 139.6503, "M"),
+    (2400, 9, 1, 10.75, -22.9068, -43.1729, "P"),
+    (2450, 2, 8, 14.25, 1.3521, 103.8198, "R"),
+    (2500, 7, 15, 17.75, 69.6492, 18.9553, "E"),
+]
+
+# planets and the north nodes; the south nodes are their opposites
+BODIES = {name: BODY_NAMES.index(name) for name in BODY_NAMES if "S.Node" not in name}
+
+# arcseconds, seconds of time for Delta T
+TOLERANCE = {
+    "delta_t": 1e-6,
+    "planets": 0.05,
+    "nodes": 1.0,
+    "houses": 0.05,
+}
+
+
+def generate() -> List[Dict]:
+    try:
+        import swisseph as swe
+    except ImportError:
+        raise RuntimeError("--generate needs pyswisseph: pip install pyswisseph")
+
+    swe.set_ephe_path(str(EPHE_DIR))
+    # swe numbers the planets in BODY_NAMES order
+    ipl = dict(zip(BODIES, range(swe.SUN, swe.PLUTO + 1)))
+    ipl.update({"True N.Node": swe.TRUE_NODE, "Mean N.Node": swe.MEAN_NODE})
+    charts = []
+    for year, month, day, hour, lat, lon, hsys in CASES:
+        jd_ut = swe.julday(year, month, day, hour)
+        cusps, ascmc = swe.houses_ex(jd_ut, lat, lon, hsys.encode())
+        charts.append(
+            dict(
+                date=f"{year}-{month:02d}-{day:02d} {hour:05.2f}h UT",
+                jd_ut=jd_ut,
+                latitude=lat,
+                longitude=lon,
+                house_system=hsys,
+                delta_t=round(swe.deltat(jd_ut) * 86400.0, 9),
+                bodies={
+                    name: [round(x, 9) for x in swe.calc_ut(jd_ut, ipl[name])[0][:2]]
+                    for name in BODIES
+                },
+                asc=round(ascmc[0], 9),
+                mc=round(ascmc[1], 9),
+                cusps=[round(c, 9) for c in cusps],
+            )
+        )
+    return charts
+
+
+def _arcsec(a, b) -> np.ndarray:
+    return np.abs((np.asarray(a) - np.asarray(b) + 180.0) % 360.0 - 180.0) * 3600.0
+
+
+def compare(charts: List[Dict]) -> Dict[str, np.ndarray]:
+    """The engine's worst difference per chart, by TOLERANCE group."""
+    n = len(charts)
+    batch = ChartEngine().charts(
+        np.array([c["jd_ut"] for c in charts]),
+        np.array([c["latitude"] for c in charts]),
+        np.array([c["longitude"] for c in charts]),
+        np.array([c["house_system"] for c in charts]),
+        np.full(n, ""),
+        np.full(n, ""),
+        np.full(n, ""),
+    )
+    worst = {group: np.zeros(n) for group in TOLERANCE}
+    worst["delta_t"] = np.abs(
+        delta_t(batch.jd_ut) - np.array([c["delta_t"] for c in charts])
+    )
+    for i, chart in enumerate(charts):
+        for name, (lon, lat) in chart["bodies"].items():
+            j = BODIES[name]
+            group = "nodes" if "Node" in name else "planets"
+            worst[group][i] = max(
+                worst[group][i],
+                _arcsec(batch.lon[i, j], lon),
+                abs(batch.lat[i, j] - lat) * 3600.0,
+            )
+        worst["houses"][i] = _arcsec(
+            np.append(batch.cusps[i], [batch.asc[i], batch.mc[i]]),
+            chart["cusps"] + [chart["asc"], chart["mc"]],
+        ).max()
+    return worst
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--generate",
+        action="store_true",
+        help=f"recompute {REFERENCE.name} with pyswisseph",
+    )
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        charts = generate()
+        REFERENCE.write_text(json.dumps(charts, indent=1) + "\n")
+        print(f"wrote {len(charts)} reference charts to {REFERENCE}")
+        return
+    charts = json.loads(REFERENCE.read_text())
+
+    worst = compare(charts)
+    print(f"{'':20}  " + "  ".join(f"{group:>8}" for group in TOLERANCE))
+    for i, chart in enumerate(charts):
+        print(
+            f"{chart['date']:20}  "
+            + "  ".join(f"{worst[g][i]:8.4f}" for g in TOLERANCE)
+        )
+    failed = [g for g, limit in TOLERANCE.items() if worst[g].max() > limit]
+    for group in failed:
+        print(
+            f"{group}: {worst[group].max():.4f} > {TOLERANCE[group]}",
+            file=sys.stderr,
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Chart JSON ingestion: json.load + model_validate (the old get_chart path)
+against model_validate_json on the raw bytes and the trusted NDJSON reader.
+
+    PYTHONPATH=. python benchmarks/bench_ingest.py --charts 2000
+"""
+
+import argparse
+import io
+import json
+import time
+from collections import deque
+
+from astro_engine.engine import compute_charts
+from astro_engine.ingest import iter_charts, parse_chart, read_chart_batch
+from astro_engine.models import AstrologicalData, HouseSystem
+
+
+def sample_outputs(n: int):
+    """Each chart as the binary writes it (indented) and as NDJSON."""
+    dates = [f"{1900 + i % 150}-{1 + i % 12:02d}-{1 + i % 28:02d}" for i in range(n)]
+    batch = compute_charts(
+        dates, "12:00", 52.2297, 21.0122, HouseSystem.PLACIDUS, "Europe/Warsaw"
+    )
+    files = [chart.model_dump_json(indent=2).encode() for chart in batch]
+    ndjson = b"".join(chart.model_dump_json().encode() + b"\n" for chart in batch)
+    return files, ndjson
+
+
+def rate(n: int, run) -> float:
+    start = time.perf_counter()
+    run()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--charts", type=int, default=2000)
+    args = parser.parse_args()
+
+    files, ndjson = sample_outputs(args.charts)
+    n = len(files)
+
+    def json_load():
+        for raw in files:
+            AstrologicalData.model_validate(json.load(io.BytesIO(raw)))
+
+    def validate_json():
+        for raw in files:
+            parse_chart(raw)
+
+    results = {
+        "json.load + model_validate": rate(n, json_load),
+        "model_validate_json": rate(n, validate_json),
+        "iter_charts (NDJSON)": rate(
+            n, lambda: deque(iter_charts(io.BytesIO(ndjson)), maxlen=0)
+        ),
+        "read_chart_batch (NDJSON)": rate(
+            n, lambda: read_chart_batch(io.BytesIO(ndjson))
+        ),
+        "read_chart_batch trusted (NDJSON)": rate(
+            n, lambda: read_chart_batch(io.BytesIO(ndjson), trusted=True)
+        ),
+    }
+    baseline = next(iter(results.values()))
+    for name, charts_per_second in results.items():
+        print(
+            f"{name:<40} {charts_per_second:9.0f} charts/s "
+            f"({charts_per_second / baseline:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
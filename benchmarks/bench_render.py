@@ -0,0 +1,53 @@
+"""
+Chart rendering throughput: render_to_bytes (a new figure per chart) against
+the cached wheel (WheelCache).
+
+    PYTHONPATH=. python benchmarks/bench_render.py --charts 50
+"""
+
+import argparse
+import time
+
+from astro_engine.chart_render import WheelCache, render_to_bytes
+from astro_engine.engine import compute_charts
+from astro_engine.models import HouseSystem
+
+
+def sample_charts(n: int):
+    dates = [f"{1950 + i % 70}-{1 + i % 12:02d}-{1 + i % 28:02d}" for i in range(n)]
+    batch = compute_charts(
+        dates, "12:00", 52.2297, 21.0122, HouseSystem.PLACIDUS, "Europe/Warsaw"
+    )
+    return list(batch)
+
+
+def rate(charts, render) -> float:
+    render(charts[0])  # warm-up: fonts, caches
+    start = time.perf_counter()
+    for chart in charts:
+        render(chart)
+    return len(charts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--charts", type=int, default=50)
+    args = parser.parse_args()
+
+    charts = sample_charts(args.charts)
+    cache = WheelCache()
+    results = {
+        "render_to_bytes (png)": rate(charts, render_to_bytes),
+        "WheelCache.render (png)": rate(charts, cache.render),
+        "WheelCache.render_rgba": rate(charts, cache.render_rgba),
+    }
+    baseline = next(iter(results.values()))
+    for name, charts_per_second in results.items():
+        print(
+            f"{name:<45} {charts_per_second:8.1f} charts/s "
+            f"({charts_per_second / baseline:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
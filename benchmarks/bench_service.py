@@ -0,0 +1,110 @@
+"""
+Load test for the HTTP chart service: client threads on keep-alive
+connections send GET /chart requests to a ChartServer in this process.
+
+    PYTHONPATH=. python benchmarks/bench_service.py --clients 16 --requests 50
+
+Every `--repeat`-th request asks for a chart another client asks for too,
+so the batcher has identical requests to merge. `--window 0` turns waiting
+for a batch off, to compare against.
+"""
+
+import argparse
+import http.client
+import threading
+import time
+from typing import List
+from urllib.parse import urlencode
+
+from astro_engine.service import ChartBatcher, ChartServer
+
+LATITUDE, LONGITUDE, TZID = 52.2297, 21.0122, "Europe/Warsaw"
+
+
+def query(client: int, i: int, repeat: int, fmt: str) -> str:
+    # every `repeat`-th request is the same for all clients
+    n = i if repeat and i % repeat == 0 else client * 100_003 + i
+    return "/chart?" + urlencode(
+        {
+            "date": f"{1950 + n % 70}-{1 + n % 12:02d}-{1 + n % 28:02d}",
+            "time": f"{n % 24:02d}:{n % 60:02d}",
+            "lat": LATITUDE,
+            "lon": LONGITUDE,
+            "tz": TZID,
+            "format": fmt,
+        }
+    )
+
+
+def client(
+    port: int, client_id: int, args: argparse.Namespace, latencies: List[float]
+):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        for i in range(args.requests):
+            start = time.perf_counter()
+            connection.request("GET", query(client_id, i, args.repeat, args.format))
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status} from the chart service")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        connection.close()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="per client")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--window", type=float, default=0.002)
+    parser.add_argument("--format", default="json", choices=["json", "png", "svg"])
+    args = parser.parse_args()
+
+    server = ChartServer(("127.0.0.1", 0), batcher=ChartBatcher(args.window))
+    server.warm_up()
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies: List[float] = []
+    clients = [
+        threading.Thread(target=client, args=(port, i, args, latencies))
+        for i in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = server.batcher.stats()
+    server.shutdown()
+    server.server_close()
+
+    print(
+        f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f} s: "
+        f"{len(latencies) / elapsed:.1f} requests/s"
+    )
+    print(
+        "latency ms: "
+        + "  ".join(
+            f"p{int(q * 100)} {percentile(latencies, q) * 1000:.1f}"
+            for q in (0.5, 0.9, 0.99)
+        )
+    )
+    # warm_up's chart is in the counts too
+    print(
+        f"batcher: {stats.requests} requests, {stats.coalesced} coalesced, "
+        f"{stats.charts} charts in {stats.batches} batches "
+        f"({stats.charts / max(stats.batches, 1):.1f} per batch)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Offline check of the batch chart API on edge cases (empty batches,
+aspect policies that can find no aspects) and against the single-chart
+tables.
+
+    make check
+    PYTHONPATH=. python benchmarks/check_batch.py
+
+Exits with status 1 and names the failed checks if any.
+"""
+
+import sys
+from typing import Callable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from astro_engine import get_charts, houses_tables, planets_tables
+from astro_engine.aspects import AspectPolicy, chart_aspects
+from astro_engine.localtime import format_moments
+from astro_engine.tables import houses_table, planets_table
+
+
+def empty_batch():
+    assert format_moments(np.array([], dtype="datetime64[us]")) == []
+    batch = get_charts([], [], [], [], [], [])
+    assert len(batch) == 0, f"{len(batch)} charts in an empty batch"
+    assert list(batch) == []
+
+
+def empty_policy():
+    batch = get_charts(
+        ["1990-06-15", "2001-01-01"], "12:00", 52.2297, 21.0122, "P", "Europe/Warsaw"
+    )
+    none = AspectPolicy(aspects=[])
+    assert chart_aspects(batch[0], none) == []
+    found = batch.with_aspects(none)
+    assert len(found.aspect_chart) == 0, "aspects found under an empty policy"
+    assert found.aspect_orb.dtype == float
+    alone = AspectPolicy(bodies=["Sun"])
+    assert len(batch.with_aspects(alone).aspect_chart) == 0, "aspects of one body"
+
+
+def batch_tables():
+    dates = [f"{1900 + 7 * i}-{1 + i % 12:02d}-{1 + i % 28:02d}" for i in range(30)]
+    batch = get_charts(dates, "06:45", 52.2297, 21.0122, "P", "Europe/Warsaw")
+    for many, one in ((planets_tables, planets_table), (houses_tables, houses_table)):
+        table = many(batch)
+        single = pd.concat([one(chart) for chart in batch], ignore_index=True)
+        assert list(table.DMS) == list(single.DMS), f"{many.__name__} DMS differs"
+        assert table.to_dict("records")[0]["DMS"] == single.DMS[0]
+
+
+CHECKS: List[Tuple[str, Callable[[], None]]] = [
+    ("empty batch", empty_batch),
+    ("empty policy", empty_policy),
+    ("batch tables", batch_tables),
+]
+
+
+def main():
+    failed = []
+    for name, check in CHECKS:
+        try:
+            check()
+        except AssertionError as error:
+            failed.append(name)
+            print(f"FAIL {name}: {error}")
+        else:
+            print(f"ok   {name}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Offline check of the geocode cache: a MappingGeocoder stands in for
+Nominatim, and the cache files live in a temporary directory.
+
+    make check
+    PYTHONPATH=. python benchmarks/check_geocode.py
+
+Exits with status 1 and names the failed checks if any.
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from astro_engine.gazetteer import Gazetteer
+from astro_engine.geo import (
+    GeocodeCache,
+    MappingGeocoder,
+    PlaceResolver,
+    configure_geocoder,
+)
+
+WARSAW = (52.2297, 21.0122)
+KRAKOW = (50.0647, 19.9450)
+
+
+class OtherGeocoder(MappingGeocoder):
+    """A second backend, to share a cache file with MappingGeocoder."""
+
+
+def _resolver(geocoder: MappingGeocoder, path: Path, **options) -> PlaceResolver:
+    cache = GeocodeCache(path, geocoder.source, **options)
+    return PlaceResolver(geocoder, cache)
+
+
+def cached_places(workdir: Path):
+    places = {"Warsaw, Poland": WARSAW, "Kraków, Poland": KRAKOW}
+    geocoder = MappingGeocoder(places)
+    resolver = _resolver(geocoder, workdir / "places.sqlite3")
+    found = resolver.resolve(
+        ["Warsaw, Poland", "  warsaw ,poland", "KRAKOW, POLAND", "Warsaw, Poland"]
+    )
+    assert found == [WARSAW, WARSAW, KRAKOW, WARSAW], found
+    assert geocoder.calls == 2, f"{geocoder.calls} geocoder calls for 2 places"
+    assert [g.latitude for g in resolver.coordinates(["Kraków, Poland"])] == [
+        KRAKOW[0]
+    ]
+    assert geocoder.calls == 2, "a cached place reached the geocoder"
+    resolver.cache.close()
+
+    # a new process finds them in the file
+    geocoder = MappingGeocoder(places)
+    resolver = _resolver(geocoder, workdir / "places.sqlite3")
+    assert resolver.resolve(["warsaw, poland"]) == [WARSAW]
+    assert geocoder.calls == 0, "the file was not read back"
+    resolver.cache.close()
+
+
+def unknown_places(workdir: Path):
+    geocoder = MappingGeocoder({})
+    resolver = _resolver(geocoder, workdir / "unknown.sqlite3", negative_ttl=0.05)
+    assert resolver.resolve(["Atlantis"]) == [None]
+    assert resolver.resolve(["Atlantis"]) == [None]
+    assert geocoder.calls == 1, "an unknown place was not cached"
+    try:
+        resolver.coordinates(["Atlantis"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("an unknown place resolved")
+    resolver.cache.close()
+
+    # later the geocoder knows it, and the unknown entry has expired
+    time.sleep(0.1)
+    geocoder = MappingGeocoder({})
+    resolver = _resolver(geocoder, workdir / "unknown.sqlite3", negative_ttl=0.05)
+    geocoder.places["atlantis"] = WARSAW
+    assert resolver.resolve(["Atlantis"]) == [WARSAW]
+    assert geocoder.calls == 1
+    resolver.cache.close()
+
+
+def geocoders_apart(workdir: Path):
+    path = workdir / "shared.sqlite3"
+    first = _resolver(MappingGeocoder({"Warsaw, Poland": WARSAW}), path)
+    assert first.resolve(["Warsaw, Poland", "Kraków, Poland"]) == [WARSAW, None]
+
+    other = OtherGeocoder({"Kraków, Poland": KRAKOW})
+    second = _resolver(other, path)
+    assert second.resolve(["Kraków, Poland"]) == [KRAKOW], "got the other's miss"
+    assert other.calls == 1
+    second.cache.clear()
+    first.cache.close()
+    second.cache.close()
+
+    geocoder = MappingGeocoder({"Warsaw, Poland": WARSAW})
+    first = _resolver(geocoder, path)
+    assert first.resolve(["Warsaw, Poland"]) == [WARSAW]
+    assert geocoder.calls == 0, "clear() reached another"
+    first.cache.close()
+
+
+def unwritable_file(workdir: Path):
+    # a directory where the file should be: sqlite3 cannot open it
+    path = workdir / "directory.sqlite3"
+    path.mkdir()
+    geocoder = MappingGeocoder({"Warsaw, Poland": WARSAW})
+    resolver = _resolver(geocoder, path)
+    assert resolver.cache.path is None, "the cache did not fall back to memory"
+    assert resolver.resolve(["Warsaw, Poland"] * 2) == [WARSAW] * 2
+    assert geocoder.calls == 1
+    resolver.cache.close()
+
+
+def shared_database(workdir: Path):
+    # a database of the user's that already has a places table
+    path = workdir / "user.sqlite3"
+    with sqlite3.connect(str(path)) as db:
+        db.execute("CREATE TABLE places (name TEXT)")
+        db.execute("INSERT INTO places VALUES ('home')")
+    db.close()
+    resolver = _resolver(MappingGeocoder({"Warsaw, Poland": WARSAW}), path)
+    assert resolver.resolve(["Warsaw, Poland"]) == [WARSAW]
+    resolver.cache.close()
+    db = sqlite3.connect(str(path))
+    try:
+        rows = db.execute("SELECT name FROM places").fetchall()
+    except sqlite3.Error as error:
+        raise AssertionError(f"the places table is gone ({error})")
+    finally:
+        db.close()
+    assert rows == [("home",)], rows
+
+
+def _geonames(path: Path, places: List[Tuple[str, Tuple[float, float]]]) -> Path:
+    # the columns from_geonames reads: name, ascii name, alternates,
+    # latitude, longitude, country code and population
+    with open(path, "w", encoding="utf-8") as fp:
+        for i, (name, (lat, lon)) in enumerate(places):
+            row = [""] * 19
+            row[:6] = [str(i), name, name, "", str(lat), str(lon)]
+            row[8], row[14] = "PL", "1000"
+            fp.write("\t".join(row) + "\n")
+    return path
+
+
+def gazetteers_apart(workdir: Path):
+    # a larger dump replaces a smaller one, in the same cache file
+    path = workdir / "places.sqlite3"
+    small = _geonames(workdir / "small.txt", [("Warsaw", WARSAW)])
+    large = _geonames(workdir / "large.txt", [("Warsaw", WARSAW), ("Kraków", KRAKOW)])
+    resolver = configure_geocoder(Gazetteer.from_geonames(small), path)
+    assert resolver.resolve(["Kraków, Poland"]) == [None]
+    resolver = configure_geocoder(Gazetteer.from_geonames(large), path)
+    try:
+        found = resolver.resolve(["Kraków, Poland"])
+    finally:
+        resolver.cache.close()
+    assert found == [KRAKOW], "the larger dump got the smaller one's miss"
+
+
+CHECKS: List[Tuple[str, Callable[[Path], None]]] = [
+    ("cached places", cached_places),
+    ("unknown places", unknown_places),
+    ("geocoders apart", geocoders_apart),
+    ("unwritable file", unwritable_file),
+    ("shared database", shared_database),
+    ("gazetteers apart", gazetteers_apart),
+]
+
+
+def main():
+    failed = []
+    for name, check in CHECKS:
+        with tempfile.TemporaryDirectory() as workdir:
+            try:
+                check(Path(workdir))
+            except AssertionError as error:
+                failed.append(name)
+                print(f"FAIL {name}: {error}")
+            else:
+                print(f"ok   {name}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Fixed inputs and offline stand-ins for the benchmark suite (suite.py).
+
+Every corpus comes from a seeded generator, so each run and each machine
+measures the same inputs:
+
+  - births: dates from 1200 to 2399, places from the tropics to beyond the
+    polar circles in both hemispheres, and every HouseSystem in turn
+  - conjunction sets: bodies packed into a few tight clusters, some across
+    0°/360°, to drive cluster_by_longitude and stack_levels
+  - place names: many spellings (case, accents, spacing) of a fixed list
+
+Nothing goes to the network or needs the swecli binary: places resolve
+through a MappingGeocoder instead of Nominatim, and StandInSwecli writes the
+in-process engine's output where the binary would.
+"""
+
+import hashlib
+import os
+import random
+import stat
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from astro_engine.engine import BODY_NAMES
+from astro_engine.geo import MappingGeocoder
+from astro_engine.models import AstrologicalData, HouseSystem
+
+SEED = 20240601
+
+# name, latitude, longitude, IANA zone
+PLACES: List[Tuple[str, float, float, str]] = [
+    ("Warsaw, Poland", 52.2297, 21.0122, "Europe/Warsaw"),
+    ("Kraków, Poland", 50.0647, 19.9450, "Europe/Warsaw"),
+    ("London, United Kingdom", 51.5074, -0.1278, "Europe/London"),
+    ("Reykjavík, Iceland", 64.1466, -21.9426, "Atlantic/Reykjavik"),
+    ("Tromsø, Norway", 69.6492, 18.9553, "Europe/Oslo"),
+    ("Murmansk, Russia", 68.9585, 33.0827, "Europe/Moscow"),
+    ("Utqiagvik, Alaska", 71.2906, -156.7886, "America/Anchorage"),
+    ("New York, USA", 40.7128, -74.0060, "America/New_York"),
+    ("Mexico City, Mexico", 19.4326, -99.1332, "America/Mexico_City"),
+    ("Quito, Ecuador", -0.1807, -78.4678, "America/Guayaquil"),
+    ("Lima, Peru", -12.0464, -77.0428, "America/Lima"),
+    ("São Paulo, Brazil", -23.5505, -46.6333, "America/Sao_Paulo"),
+    ("Ushuaia, Argentina", -54.8019, -68.3030, "America/Argentina/Ushuaia"),
+    ("Cape Town, South Africa", -33.9249, 18.4241, "Africa/Johannesburg"),
+    ("Nairobi, Kenya", -1.2921, 36.8219, "Africa/Nairobi"),
+    ("Cairo, Egypt", 30.0444, 31.2357, "Africa/Cairo"),
+    ("Mumbai, India", 19.0760, 72.8777, "Asia/Kolkata"),
+    ("Kathmandu, Nepal", 27.7172, 85.3240, "Asia/Kathmandu"),
+    ("Singapore", 1.3521, 103.8198, "Asia/Singapore"),
+    ("Tokyo, Japan", 35.6762, 139.6503, "Asia/Tokyo"),
+    ("Sydney, Australia", -33.8688, 151.2093, "Australia/Sydney"),
+    ("Hobart, Australia", -42.8821, 147.3272, "Australia/Hobart"),
+    ("Auckland, New Zealand", -36.8485, 174.7633, "Pacific/Auckland"),
+    ("McMurdo Station, Antarctica", -77.8419, 166.6863, "Antarctica/McMurdo"),
+]
+
+FIRST_YEAR = 1200
+LAST_YEAR = 2399
+
+
+class Birth(NamedTuple):
+    date: str
+    time: str
+    latitude: float
+    longitude: float
+    house_system: HouseSystem
+    tzid: str
+
+
+def births(n: int, seed: int = SEED) -> List[Birth]:
+    """n birth records, spread evenly over the centuries and the places."""
+    rng = random.Random(seed)
+    systems = list(HouseSystem)
+    span = LAST_YEAR - FIRST_YEAR + 1
+    records = []
+    for i in range(n):
+        _, lat, lon, tzid = PLACES[i % len(PLACES)]
+        year = FIRST_YEAR + (i * span) // max(n, 1)
+        records.append(
+            Birth(
+                date=f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                time=f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+                latitude=lat,
+                longitude=lon,
+                house_system=systems[i % len(systems)],
+                tzid=tzid,
+            )
+        )
+    return records
+
+
+def conjunction_sets(
+    n: int, bodies: Sequence[str] = BODY_NAMES, seed: int = SEED
+) -> List[List[float]]:
+    """
+    n sets of longitudes for `bodies`, packed into two to four clusters a few
+    degrees wide; every other set has a cluster straddling 0°/360°.
+    """
+    rng = random.Random(seed)
+    sets = []
+    for i in range(n):
+        centers = [rng.uniform(0.0, 360.0) for _ in range(rng.randint(2, 4))]
+        if i % 2:
+            centers[0] = 359.5
+        sets.append(
+            [(rng.choice(centers) + rng.uniform(-2.5, 2.5)) % 360.0 for _ in bodies]
+        )
+    return sets
+
+
+def _spellings(name: str) -> List[str]:
+    return [name, name.upper(), f"  {name.lower()} ", name.replace(", ", " ,  ")]
+
+
+def place_names(n: int, seed: int = SEED) -> List[str]:
+    """n place strings: distinct made-up towns, each under several spellings."""
+    rng = random.Random(seed)
+    names = []
+    for i in range(n):
+        base, *_ = PLACES[i % len(PLACES)]
+        town, country = base.split(", ") if ", " in base else (base, base)
+        names.append(rng.choice(_spellings(f"{town} {i // len(PLACES)}, {country}")))
+    return names
+
+
+def stand_in_geocoder(names: Sequence[str]) -> MappingGeocoder:
+    """Answers for every name of place_names, in place of Nominatim."""
+    return MappingGeocoder(
+        {name: PLACES[i % len(PLACES)][1:3] for i, name in enumerate(names)}
+    )
+
+
+def _swecli_key(date: str, time: str, lat, lon, hsys: str, tzid: str) -> str:
+    text = "|".join([date, time, str(lat), str(lon), hsys, tzid])
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+_STAND_IN = """\
+#!{python}
+import hashlib, sys
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+fields = ["--date", "--time", "--lat", "--lon", "--hsys", "--tzid"]
+key = hashlib.sha1("|".join(args[f] for f in fields).encode()).hexdigest()
+with open({charts!r} + "/" + key + ".json", "rb") as src:
+    data = src.read()
+with open(args["--json"], "wb") as out:
+    out.write(data)
+print("Wrote JSON:", args["--json"])
+"""
+
+
+class StandInSwecli:
+    """
+    An executable in `root` with the swecli command line that writes the
+    stored chart (indented, as the binary does) of each argument set.
+    Point astro.SWISS_BIN at `path` to time get_chart's process, pipe and
+    parsing path without the binary.
+    """
+
+    def __init__(self, charts: Dict[Birth, AstrologicalData], root: Path):
+        (root / "charts").mkdir()
+        for b, chart in charts.items():
+            key = _swecli_key(
+                b.date, b.time, b.latitude, b.longitude, b.house_system.value, b.tzid
+            )
+            path = root / "charts" / f"{key}.json"
+            path.write_text(chart.model_dump_json(indent=2))
+        self.path = root / "main"
+        script = _STAND_IN.format(python=sys.executable, charts=str(root / "charts"))
+        self.path.write_text(script)
+        os.chmod(self.path, self.path.stat().st_mode | stat.S_IXUSR)
@@ -0,0 +1,414 @@
+"""
+Benchmark suite: chart computation, JSON parsing, rendering, tables,
+conjunction clustering and geocoding on fixed corpora (fixtures.py), offline.
+
+    make bench                       # run, compare with benchmarks/baseline.json
+    make bench-baseline              # run and store the result as the baseline
+    PYTHONPATH=. python benchmarks/suite.py --quick --only tables
+
+Each stage reports per-call latency percentiles, throughput (charts or
+places per second) and the peak memory Python allocated for a few calls
+(tracemalloc, in a second pass so the timings are not slowed down). With
+--baseline, a stage that got slower or hungrier than the tolerance allows
+is a regression and the exit status is 1. A missing baseline, or one
+recorded with other corpus sizes, is exit status 2.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import fixtures
+from astro_engine import astro
+from astro_engine.astro import get_chart, get_charts
+from astro_engine.batch import ChartBatch
+from astro_engine.cache import configure_chart_cache
+from astro_engine.chart_render import WheelCache, render_to_bytes
+from astro_engine.engine import BODY_NAMES
+from astro_engine.geo import (
+    configure_geocoder,
+    get_place_coordinates,
+    get_places_coordinates,
+)
+from astro_engine.ingest import parse_chart, read_chart_batch
+from astro_engine.models import ChartBackend
+from astro_engine.tables import (
+    aspects_table,
+    aspects_tables,
+    houses_table,
+    houses_tables,
+    planets_table,
+    planets_tables,
+)
+from astro_engine.wheel import cluster_by_longitude, stack_levels
+
+FORMAT_VERSION = 1
+# calls traced per stage for peak memory
+MEMORY_CALLS = 3
+# a memory increase below this is noise, whatever the relative change
+MEMORY_FLOOR_KIB = 256.0
+
+# corpus sizes of a full run; --quick divides them by QUICK_FACTOR
+SIZES = {
+    "births": 1200,
+    "python_charts": 120,
+    "swecli_charts": 24,
+    "renders": 24,
+    "conjunction_sets": 2000,
+    "places": 600,
+    "batch_size": 200,
+}
+QUICK_FACTOR = 5
+
+
+class Stage(NamedTuple):
+    """
+    run(item) is timed for every item; units is what one item counts for
+    in the throughput (e.g. the charts of a batch). setup runs before the
+    timed and the traced pass, warmup runs the first item before timing.
+    """
+
+    name: str
+    unit: str
+    items: Sequence[Any]
+    run: Callable[[Any], object]
+    units: int = 1
+    setup: Optional[Callable[[], None]] = None
+    warmup: bool = True
+
+
+def _chunks(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _batch(records: Sequence[fixtures.Birth]) -> ChartBatch:
+    return get_charts(
+        [b.date for b in records],
+        [b.time for b in records],
+        [b.latitude for b in records],
+        [b.longitude for b in records],
+        [b.house_system for b in records],
+        [b.tzid for b in records],
+    )
+
+
+def _get_chart(b: fixtures.Birth, backend: ChartBackend, use_cache: bool = False):
+    return get_chart(
+        b.date,
+        b.time,
+        b.latitude,
+        b.longitude,
+        b.house_system,
+        b.tzid,
+        backend=backend,
+        use_cache=use_cache,
+    )
+
+
+def build_stages(sizes: Dict[str, int], workdir: Path) -> List[Stage]:
+    records = fixtures.births(sizes["births"])
+    batch_size = sizes["batch_size"]
+    batch = _batch(records)
+    charts = list(batch)
+    chart_json = [chart.model_dump_json(indent=2).encode() for chart in charts]
+    ndjson = [
+        b"".join(chart.model_dump_json().encode() + b"\n" for chart in chunk)
+        for chunk in _chunks(charts, batch_size)
+    ]
+    batches = [ChartBatch.from_charts(chunk) for chunk in _chunks(charts, batch_size)]
+
+    swecli_records = records[: sizes["swecli_charts"]]
+    swecli = fixtures.StandInSwecli(dict(zip(swecli_records, charts)), workdir)
+    astro.SWISS_BIN = swecli.path
+
+    cached = records[: sizes["python_charts"]]
+    configure_chart_cache(persist=False)
+    for b in cached:
+        _get_chart(b, ChartBackend.PYTHON, use_cache=True)
+
+    places = fixtures.place_names(sizes["places"])
+    geocoder = fixtures.stand_in_geocoder(places)
+
+    def fresh_geocoder():
+        resolver = configure_geocoder(geocoder, cache_path=workdir / "geocode.sqlite3")
+        resolver.cache.clear()
+
+    def warm_geocoder():
+        fresh_geocoder()
+        get_places_coordinates(places)
+
+    conjunctions = fixtures.conjunction_sets(sizes["conjunction_sets"])
+    wheel = WheelCache()
+    renders = charts[: sizes["renders"]]
+
+    def all_tables(chart):
+        return planets_table(chart), houses_table(chart), aspects_table(chart)
+
+    def all_batch_tables(batch):
+        return planets_tables(batch), houses_tables(batch), aspects_tables(batch)
+
+    return [
+        Stage(
+            "get_chart (python, uncached)",
+            "charts",
+            records[: sizes["python_charts"]],
+            lambda b: _get_chart(b, ChartBackend.PYTHON),
+        ),
+        Stage(
+            "get_chart (swecli stand-in)",
+            "charts",
+            swecli_records,
+            lambda b: _get_chart(b, ChartBackend.SWECLI),
+        ),
+        Stage(
+            "get_chart (cached)",
+            "charts",
+            cached,
+            lambda b: _get_chart(b, ChartBackend.PYTHON, use_cache=True),
+        ),
+        Stage(
+            "get_charts (batch)",
+            "charts",
+            _chunks(records, batch_size),
+            _batch,
+            units=batch_size,
+        ),
+        Stage("parse_chart", "charts", chart_json, parse_chart),
+        Stage(
+            "read_chart_batch (trusted)",
+            "charts",
+            ndjson,
+            lambda raw: read_chart_batch(io.BytesIO(raw), trusted=True),
+            units=batch_size,
+        ),
+        Stage("render_to_bytes (png)", "charts", renders, render_to_bytes),
+        Stage("WheelCache.render (png)", "charts", renders, wheel.render),
+        Stage("tables (one chart)", "charts", charts, all_tables),
+        Stage(
+            "tables (batch)", "charts", batches, all_batch_tables, units=batch_size
+        ),
+        Stage(
+            "cluster_by_longitude",
+            "sets",
+            conjunctions,
+            lambda lons: cluster_by_longitude(BODY_NAMES, lons),
+        ),
+        Stage(
+            "stack_levels",
+            "sets",
+            conjunctions,
+            lambda lons: stack_levels(BODY_NAMES, lons),
+        ),
+        Stage(
+            "get_place_coordinates (cold)",
+            "places",
+            places,
+            get_place_coordinates,
+            setup=fresh_geocoder,
+            warmup=False,
+        ),
+        Stage(
+            "get_place_coordinates (cached)",
+            "places",
+            places,
+            get_place_coordinates,
+            setup=warm_geocoder,
+        ),
+    ]
+
+
+def measure(stage: Stage) -> Dict[str, Any]:
+    if stage.setup is not None:
+        stage.setup()
+    if stage.warmup:
+        stage.run(stage.items[0])
+    latencies = np.empty(len(stage.items))
+    clock = time.perf_counter
+    start = clock()
+    for i, item in enumerate(stage.items):
+        t0 = clock()
+        stage.run(item)
+        latencies[i] = clock() - t0
+    elapsed = clock() - start
+
+    if stage.setup is not None:
+        stage.setup()
+    tracemalloc.start()
+    for item in stage.items[:MEMORY_CALLS]:
+        stage.run(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000.0
+    return {
+        "unit": stage.unit,
+        "calls": len(stage.items),
+        "units": len(stage.items) * stage.units,
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(latencies.max() * 1000.0),
+        "per_second": len(stage.items) * stage.units / elapsed,
+        "peak_kib": peak / 1024.0,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    """The regressions of results against baseline, as printable lines."""
+    regressions = []
+    for name, now in results["stages"].items():
+        then = baseline["stages"].get(name)
+        if then is None:
+            continue
+        if now["p50_ms"] > then["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p50 {then['p50_ms']:.3f} -> {now['p50_ms']:.3f} ms"
+            )
+        if now["per_second"] < then["per_second"] / (1 + tolerance):
+            regressions.append(
+                f"{name}: throughput {then['per_second']:.1f} -> "
+                f"{now['per_second']:.1f}/s"
+            )
+        limit = then["peak_kib"] * (1 + memory_tolerance)
+        if now["peak_kib"] > max(limit, then["peak_kib"] + MEMORY_FLOOR_KIB):
+            regressions.append(
+                f"{name}: peak memory {then['peak_kib']:.0f} -> "
+                f"{now['peak_kib']:.0f} KiB"
+            )
+    return regressions
+
+
+def _change(now: float, then: Optional[float]) -> str:
+    if not then:
+        return ""
+    return f"{(now / then - 1) * 100:+.0f}%"
+
+
+def report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    header = (
+        f"{'stage':<32} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+        f"{'per second':>18} {'peak KiB':>9}"
+    )
+    if baseline is not None:
+        header += f" {'p50':>6} {'rate':>6} {'mem':>6}"
+    print(header)
+    for name, s in results["stages"].items():
+        line = (
+            f"{name:<32} {s['p50_ms']:9.3f} {s['p90_ms']:9.3f} {s['p99_ms']:9.3f} "
+            f"{s['per_second']:11.1f} {s['unit']:<6} {s['peak_kib']:9.0f}"
+        )
+        then = (baseline or {}).get("stages", {}).get(name)
+        if then is not None:
+            line += (
+                f" {_change(s['p50_ms'], then['p50_ms']):>6}"
+                f" {_change(s['per_second'], then['per_second']):>6}"
+                f" {_change(s['peak_kib'], then['peak_kib']):>6}"
+            )
+        print(line)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="smaller corpora")
+    parser.add_argument(
+        "--only", nargs="+", metavar="TEXT", help="stages whose name contains TEXT"
+    )
+    parser.add_argument("--baseline", type=Path, help="compare with this result")
+    parser.add_argument(
+        "--save-baseline", type=Path, metavar="PATH", help="write the result here"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown of p50 and throughput (default: 0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.10,
+        help="allowed growth of peak memory (default: 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = dict(SIZES)
+    if args.quick:
+        sizes = {k: max(v // QUICK_FACTOR, 4) for k, v in sizes.items()}
+        sizes["batch_size"] = SIZES["batch_size"] // QUICK_FACTOR
+
+    # timings are only comparable on one machine, so there is no committed
+    # baseline: asking for a comparison without a usable one is an error
+    baseline = None
+    if args.baseline is not None:
+        if not args.baseline.exists():
+            print(
+                f"No baseline at {args.baseline}; record one on this machine "
+                "with make bench-baseline",
+                file=sys.stderr,
+            )
+            return 2
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("sizes") != sizes:
+            print(
+                f"{args.baseline} was recorded with other corpus sizes (--quick?)",
+                file=sys.stderr,
+            )
+            return 2
+        if baseline.get("environment") != environment():
+            print(f"note: {args.baseline} was recorded on another setup")
+
+    with tempfile.TemporaryDirectory(prefix="astro-bench-") as workdir:
+        stages = build_stages(sizes, Path(workdir))
+        if args.only:
+            stages = [s for s in stages if any(t in s.name for t in args.only)]
+        results: Dict[str, Any] = {
+            "version": FORMAT_VERSION,
+            "environment": environment(),
+            "sizes": sizes,
+            "stages": {},
+        }
+        for stage in stages:
+            results["stages"][stage.name] = measure(stage)
+
+    report(results, baseline)
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.save_baseline}")
+    if baseline is None:
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
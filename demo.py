@@ -1,8 +1,12 @@
+from datetime import timedelta
+
 import streamlit as st
 
 from astro_engine import (
+    ChartAnimator,
     HouseSystem,
     aspects_table,
+    compute_chart_series,
     get_chart,
     get_IANA_tz,
     get_place_coordinates,
@@ -11,6 +15,44 @@ from astro_engine import (
     render_astrological_chart,
 )
 
+# the transit slider covers TRANSIT_DAYS after the chart, one frame per step
+TRANSIT_DAYS = 90
+TRANSIT_STEP_DAYS = 0.25
+
+
+@st.cache_resource(max_entries=8)
+def transit_frames(date, time, latitude, longitude, house_system, tz_id):
+    """Every frame of the slider, computed in one batch."""
+    return compute_chart_series(
+        date,
+        time,
+        latitude,
+        longitude,
+        house_system,
+        tz_id,
+        step=timedelta(days=TRANSIT_STEP_DAYS),
+        count=int(TRANSIT_DAYS / TRANSIT_STEP_DAYS) + 1,
+    )
+
+
+@st.fragment
+def transit_slider(date, time, latitude, longitude, house_system, tz_id):
+    """The sky over the place after the chart; the slider reruns only this."""
+    days = st.slider(
+        "Days after the chart",
+        0.0,
+        float(TRANSIT_DAYS),
+        0.0,
+        step=TRANSIT_STEP_DAYS,
+    )
+    frames = transit_frames(date, time, latitude, longitude, house_system, tz_id)
+    # one figure per session, moved to each chart the slider picks
+    if "animator" not in st.session_state:
+        st.session_state.animator = ChartAnimator(title="Transits")
+    frame = frames[round(days / TRANSIT_STEP_DAYS)]
+    st.image(st.session_state.animator.frame(frame), width="content")
+
+
 st.set_page_config(page_title="Astro Engine", layout="centered")
 st.title("Astro Data Calculator")
 
@@ -60,6 +102,11 @@ if run:
         fig = render_astrological_chart(data)
         st.pyplot(fig, clear_figure=True, width="content")
 
+        st.subheader("Transits")
+        transit_slider(
+            date, time, coords.latitude, coords.longitude, house_system, tz_id
+        )
+
         # tables
         st.subheader("Planets")
         st.dataframe(planets_table(data), width="content")  # type: ignore